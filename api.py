@@ -1,12 +1,16 @@
 """FastAPI backend for Budget Buddy"""
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, FileResponse
-from typing import List, Dict
+from fastapi.responses import HTMLResponse, FileResponse, StreamingResponse, Response
+from contextlib import asynccontextmanager
+from typing import List, Dict, Literal, Optional
 import pandas as pd
-from datetime import datetime
+from datetime import date, datetime
+import asyncio
+import json
 import io
+import time
 
 # Import your existing services
 import sys
@@ -15,9 +19,34 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from src.database.transaction_service import TransactionService
 from src.services.plaid_service import PlaidService
+from src.services.api_models import (
+    TransactionPage, SummaryResponse, SummaryHistoryResponse, YearOverYearResponse, compact_page
+)
 from src.utils.config import Config
+from src.utils.money import to_cents, format_cents
+from src.utils import metrics, tracing
+from src.utils.log import get_logger
+
+tracing.configure('budget-buddy-api')
+log = get_logger('api')
+
+# Initialize services
+transaction_service = TransactionService()
+plaid_service = PlaidService()
+
 
-app = FastAPI(title="Budget Rodeo API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Relay Postgres change notifications while the API runs (CHANGE_FEED_BACKEND=postgres)"""
+    listener = None
+    if not transaction_service.changes.reports_local_writes:
+        listener = asyncio.create_task(transaction_service.changes.listen(Config.DATABASE_URL))
+    yield
+    if listener:
+        listener.cancel()
+
+
+app = FastAPI(title="Budget Rodeo API", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware (allows Flet to call API)
 app.add_middleware(
@@ -28,9 +57,64 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize services
-transaction_service = TransactionService()
-plaid_service = PlaidService()
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Time every request, labelled by route template (/api/transactions, not the full URL)"""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        metrics.HTTP_REQUEST_SECONDS.labels(
+            method=request.method,
+            # Unmatched paths share one label so scanners can't blow up the series count
+            route=getattr(route, "path", "unmatched"),
+            status=status
+        ).observe(time.perf_counter() - start)
+
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """One server span per request, joined to the caller's trace via the traceparent header"""
+    with tracing.span(f"{request.method} {request.url.path}", kind='server',
+                      parent=request.headers.get("traceparent")) as span:
+        response = await call_next(request)
+        if span is not None:
+            route = request.scope.get("route")
+            span.name = f"{request.method} {getattr(route, 'path', request.url.path)}"
+            span.set_attribute('http.status_code', response.status_code)
+            if response.status_code >= 500:
+                span.error = f"HTTP {response.status_code}"
+        return response
+
+
+def read_headers(user_id: str) -> Dict[str, str]:
+    """
+    ETag and Cache-Control headers for a user's read endpoints
+    
+    The ETag follows the user's data version (bumped on every write) and the
+    current month, which the summaries depend on. Empty unless every worker
+    shares that version (CACHE_BACKEND=redis). Take it before querying, so a write landing
+    mid-request makes the response look older rather than newer.
+    """
+    validator = transaction_service.cache.validator(user_id)
+    if validator is None:
+        return {}
+    return {"ETag": f'W/"{validator}-{datetime.now():%Y%m}"', "Cache-Control": "private, no-cache"}
+
+
+def not_modified(request: Request, headers: Dict[str, str]) -> bool:
+    """True when the client's If-None-Match already names this ETag (weak comparison)"""
+    etag = headers.get("ETag")
+    if_none_match = request.headers.get("if-none-match")
+    if not etag or not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
 
 
 @app.get("/")
@@ -43,6 +127,12 @@ async def root():
     }
 
 
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus scrape endpoint"""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 @app.get("/plaid-link")
 async def serve_plaid_link():
     """Serve Plaid Link HTML page"""
@@ -68,8 +158,7 @@ async def upload_csv(file: UploadFile = File(...), user_id: str = "demo"):
         contents = await file.read()
         df = pd.read_csv(io.BytesIO(contents))
         
-        print(f"Received CSV with {len(df)} rows")
-        print(f"Columns: {list(df.columns)}")
+        log.info("📥 Received CSV", file=file.filename, rows=len(df), columns=list(df.columns))
         
         # Validate required columns
         required_cols = ['date', 'description', 'amount', 'type', 'category']
@@ -80,13 +169,17 @@ async def upload_csv(file: UploadFile = File(...), user_id: str = "demo"):
         # Process transactions
         imported = 0
         skipped = 0
+        duplicates_in_file = 0
         errors = []
+        # (date, cents, description) of rows already handled in this file, so
+        # repeated lines are skipped without a database round trip
+        seen = set()
         
-        print(f"📊 Processing {len(df)} rows...")
+        started = time.perf_counter()
         
         for index, row in df.iterrows():
             try:
-                amount = float(row['amount'])
+                amount_cents = abs(to_cents(row['amount']))
                 txn_type = str(row['type']).lower().strip()
                 
                 # ALWAYS use the logged-in user's ID (ignore CSV user_id)
@@ -98,12 +191,20 @@ async def upload_csv(file: UploadFile = File(...), user_id: str = "demo"):
                 except:
                     date = datetime.now()
                 
-                print(f"  Row {index+1}: {row['description'][:30]}... ${amount} ({txn_type})")
+                fingerprint = (date.date(), amount_cents, str(row['description']))
+                if fingerprint in seen:
+                    skipped += 1
+                    duplicates_in_file += 1
+                    metrics.CSV_IMPORT_ROWS.labels(result='duplicate').inc()
+                    log.debug("CSV row", sample=True, row=index + 1, result='duplicate in file')
+                    continue
+                seen.add(fingerprint)
                 
                 # Add transaction
                 success = await transaction_service.add_transaction(
                     user_id=user_id,  # Use the logged-in user ID
-                    amount=abs(amount),
+                    amount=None,
+                    amount_cents=amount_cents,
                     transaction_type=txn_type,
                     category=str(row['category']),
                     description=str(row['description']),
@@ -112,16 +213,28 @@ async def upload_csv(file: UploadFile = File(...), user_id: str = "demo"):
                 
                 if success:
                     imported += 1
-                    print(f"  ✅ Imported")
+                    metrics.CSV_IMPORT_ROWS.labels(result='imported').inc()
                 else:
                     skipped += 1
-                    print(f"  ⚠️ Skipped (add_transaction returned False)")
+                    metrics.CSV_IMPORT_ROWS.labels(result='skipped').inc()
+                log.debug("CSV row", sample=True, row=index + 1, amount=format_cents(amount_cents),
+                          type=txn_type, result='imported' if success else 'skipped')
                     
             except Exception as e:
                 skipped += 1
+                metrics.CSV_IMPORT_ROWS.labels(result='error').inc()
                 errors.append(f"Row {index + 2}: {str(e)}")
+                log.debug("CSV row", sample=True, row=index + 1, result='error', error=str(e))
         
-        print(f"📊 Import complete: {imported} imported, {skipped} skipped/duplicates")
+        elapsed = time.perf_counter() - started
+        metrics.CSV_IMPORT_SECONDS.inc(elapsed)
+        if elapsed > 0:
+            metrics.CSV_IMPORT_ROWS_PER_SECOND.set(len(df) / elapsed)
+        log.info(
+            "📊 Import complete", file=file.filename, rows=len(df), imported=imported, skipped=skipped,
+            duplicates_in_file=duplicates_in_file, errors=len(errors), seconds=round(elapsed, 3),
+            rows_per_sec=round(len(df) / elapsed) if elapsed > 0 else None
+        )
         
         return {
             "success": True,
@@ -133,7 +246,7 @@ async def upload_csv(file: UploadFile = File(...), user_id: str = "demo"):
         }
         
     except Exception as e:
-        print(f"CSV Upload Error: {e}")
+        log.error("CSV upload failed", error=str(e))
         raise HTTPException(500, f"Failed to process CSV: {str(e)}")
 
 
@@ -152,7 +265,7 @@ async def create_plaid_link_token(user_id: str = "demo"):
             raise HTTPException(500, "Failed to create Plaid link token")
             
     except Exception as e:
-        print(f"Plaid Error: {e}")
+        log.error("Plaid link token failed", error=str(e))
         raise HTTPException(500, str(e))
 
 
@@ -167,19 +280,19 @@ async def exchange_plaid_token(request: dict):
         if not public_token:
             raise HTTPException(400, "Missing public_token in request body")
         
-        print(f"🔄 Exchanging public token: {public_token[:20]}... for user {user_id[:8]}...")
+        log.info("🔄 Exchanging Plaid public token", user=user_id[:8])
         
         # Exchange token with Plaid
         exchange_response = await plaid_service.exchange_public_token(public_token)
         
         if not exchange_response:
-            print(f"❌ Token exchange returned None")
+            log.error("❌ Plaid token exchange returned nothing")
             raise HTTPException(500, "Failed to exchange token")
         
         access_token = exchange_response.get('access_token')
         item_id = exchange_response.get('item_id', 'unknown')
         
-        print(f"✅ Token exchanged successfully! Item ID: {item_id}")
+        log.info("✅ Plaid token exchanged", item_id=item_id)
         
         # Save to database
         if transaction_service.supabase:
@@ -188,20 +301,23 @@ async def exchange_plaid_token(request: dict):
                     'user_id': user_id,
                     'access_token': access_token,
                     'item_id': item_id,
-                    'institution_name': institution_name,
-                    'last_synced_at': datetime.now().isoformat()
+                    'institution_name': institution_name
                 }
                 
                 result = transaction_service.supabase.table('plaid_items').insert(plaid_data).execute()
-                print(f"💾 Saved Plaid connection to database!")
-                
-                # Optionally: Sync transactions immediately
-                print(f"🔄 Syncing transactions from Plaid...")
-                synced_count = await plaid_service.sync_transactions(access_token, user_id, transaction_service)
-                print(f"✅ Synced {synced_count} transactions from Plaid!")
-                
+                log.info("💾 Saved Plaid connection", item_id=item_id, institution=institution_name)
             except Exception as db_error:
-                print(f"⚠️ Warning: Could not save to database: {db_error}")
+                log.warning("⚠️ Could not save Plaid connection", error=str(db_error))
+            
+            # Optionally: Sync transactions immediately (last_synced_at is only set once it succeeds)
+            try:
+                synced_count = await plaid_service.sync_transactions(
+                    access_token, user_id, transaction_service, item_id=item_id
+                )
+                await transaction_service.mark_plaid_item_synced(item_id)
+                log.info("✅ Synced transactions from Plaid", item_id=item_id, count=synced_count)
+            except Exception as sync_error:
+                log.warning("⚠️ Initial Plaid sync failed, retry with /api/plaid/sync", error=str(sync_error))
         
         return {
             "success": True,
@@ -211,33 +327,209 @@ async def exchange_plaid_token(request: dict):
         }
         
     except Exception as e:
-        print(f"❌ Plaid Token Exchange Error: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("❌ Plaid token exchange failed", error=str(e))
+        raise HTTPException(500, str(e))
+
+
+@app.post("/api/plaid/sync")
+async def sync_plaid_items(user_id: str = "demo"):
+    """Sync all of a user's linked bank connections concurrently"""
+    try:
+        result = await plaid_service.sync_user(user_id, transaction_service)
+        return {
+            "success": True,
+            **result
+        }
+    except Exception as e:
+        log.error("Plaid sync failed", error=str(e))
+        raise HTTPException(500, str(e))
+
+
+@app.get("/api/accounts/balances")
+async def get_account_balances(user_id: str = "demo", refresh: bool = False):
+    """Get cached account balances across all linked banks"""
+    try:
+        balances = await plaid_service.get_user_balances(user_id, transaction_service, force_refresh=refresh)
+        return {
+            "success": True,
+            **balances
+        }
+    except Exception as e:
+        log.error("Get balances failed", error=str(e))
+        raise HTTPException(500, str(e))
+
+
+@app.get("/api/accounts")
+async def get_accounts(user_id: str = "demo"):
+    """Get the user's persisted bank accounts"""
+    try:
+        accounts = await transaction_service.get_accounts(user_id)
+        return {
+            "success": True,
+            "accounts": accounts
+        }
+    except Exception as e:
+        log.error("Get accounts failed", error=str(e))
+        raise HTTPException(500, str(e))
+
+
+@app.get("/api/transactions", response_model=TransactionPage)
+async def get_transactions(request: Request, response: Response, 
+                           user_id: str = "demo", limit: int = Query(10, ge=1, le=1000), 
+                           cursor: Optional[str] = None, account_id: Optional[str] = None, 
+                           start_date: Optional[date] = None, end_date: Optional[date] = None, 
+                           category: Optional[List[str]] = Query(None), 
+                           transaction_type: Optional[str] = Query(None, alias="type"), 
+                           min_amount: Optional[float] = None, max_amount: Optional[float] = None, 
+                           merchant: Optional[str] = None, 
+                           format: Literal['objects', 'compact'] = 'objects'):
+    """
+    Get user transactions, newest first, filtered in the database
+    
+    Filters: account_id, start_date/end_date (inclusive, YYYY-MM-DD), category
+    (repeatable), type (income/expense), min_amount/max_amount (dollars) and
+    merchant (description substring). Pass next_cursor back as cursor for the
+    next page. format=compact returns {fields, rows} (one array per row).
+    Send the ETag back as If-None-Match to get a 304 while nothing changed.
+    """
+    try:
+        if transaction_type and transaction_type not in ('income', 'expense'):
+            raise HTTPException(400, "type must be 'income' or 'expense'")
+        headers = read_headers(user_id)
+        if not_modified(request, headers):
+            return Response(status_code=304, headers=headers)
+        response.headers.update(headers)
+        try:
+            page = await transaction_service.get_transaction_page(
+                user_id, limit, cursor=cursor, account_id=account_id,
+                start_date=start_date, end_date=end_date, categories=category,
+                transaction_type=transaction_type,
+                min_amount_cents=to_cents(min_amount) if min_amount is not None else None,
+                max_amount_cents=to_cents(max_amount) if max_amount is not None else None,
+                merchant=merchant
+            )
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+        if format == 'compact':
+            return compact_page(page['transactions'], page['next_cursor'], headers)
+        return {
+            "success": True,
+            "transactions": page['transactions'],
+            "next_cursor": page['next_cursor']
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        log.error("Get transactions failed", error=str(e))
         raise HTTPException(500, str(e))
 
 
-@app.get("/api/transactions")
-async def get_transactions(user_id: str = "demo", limit: int = 10):
-    """Get user transactions"""
+@app.get("/api/transactions/search", response_model=TransactionPage)
+async def search_transactions(request: Request, response: Response, q: str, 
+                              user_id: str = "demo", limit: int = Query(20, ge=1, le=100), 
+                              cursor: Optional[str] = None, 
+                              format: Literal['objects', 'compact'] = 'objects'):
+    """
+    Ranked search over transaction descriptions (prefix and fuzzy matching)
+    
+    Pass next_cursor back as cursor for the next page. format=compact returns
+    {fields, rows} (one array per row). Honors If-None-Match like /api/transactions.
+    """
     try:
-        transactions = await transaction_service.get_user_transactions(user_id, limit)
+        headers = read_headers(user_id)
+        if not_modified(request, headers):
+            return Response(status_code=304, headers=headers)
+        response.headers.update(headers)
+        try:
+            page = await transaction_service.search_transactions(user_id, q, limit, cursor=cursor)
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+        if format == 'compact':
+            return compact_page(page['transactions'], page['next_cursor'], headers)
         return {
             "success": True,
-            "transactions": transactions
+            "transactions": page['transactions'],
+            "next_cursor": page['next_cursor']
         }
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Get Transactions Error: {e}")
+        log.error("Search transactions failed", error=str(e))
         raise HTTPException(500, str(e))
 
 
-@app.get("/api/summary")
-async def get_summary(user_id: str = "demo"):
-    """Get monthly summary"""
+@app.post("/api/transactions")
+async def create_transaction(request: dict):
+    """Add a single transaction (manual entry)"""
     try:
+        user_id = request.get('user_id', 'demo')
+        try:
+            date = datetime.strptime(str(request.get('date')), '%Y-%m-%d')
+        except ValueError:
+            raise HTTPException(400, "date must be YYYY-MM-DD")
+        try:
+            amount_cents = abs(to_cents(request.get('amount', 0)))
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+        
+        success = await transaction_service.add_transaction(
+            user_id=user_id,
+            amount=None,
+            amount_cents=amount_cents,
+            transaction_type=str(request.get('transaction_type', 'expense')).lower(),
+            category=str(request.get('category', 'Other')),
+            description=str(request.get('description', '')),
+            date=date
+        )
+        return {
+            "success": success
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        log.error("Add transaction failed", error=str(e))
+        raise HTTPException(500, str(e))
+
+
+@app.get("/api/changes")
+async def stream_changes(user_id: str = "demo", last_event_id: Optional[str] = Header(None)):
+    """
+    Server-sent events with the user's transaction changes
+    
+    Reconnecting clients send Last-Event-ID and get what they missed, or a
+    'reset' event when that is no longer available.
+    """
+    subscription = transaction_service.changes.subscribe(user_id)
+    
+    async def events():
+        try:
+            async for event_id, event in subscription.events(last_event_id):
+                if event is None:
+                    yield ": ping\n\n"  # Keeps proxies from closing an idle stream
+                    continue
+                data = json.dumps(event, separators=(',', ':'), default=str)
+                yield f"id: {event_id}\nevent: {event['type']}\ndata: {data}\n\n"
+        finally:
+            subscription.close()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/api/summary", response_model=SummaryResponse)
+async def get_summary(request: Request, response: Response, user_id: str = "demo", account_id: Optional[str] = None):
+    """Get monthly summary, optionally for a single account (honors If-None-Match)"""
+    try:
+        headers = read_headers(user_id)
+        if not_modified(request, headers):
+            return Response(status_code=304, headers=headers)
+        response.headers.update(headers)
         now = datetime.now()
-        summary = await transaction_service.get_monthly_summary(user_id, now.year, now.month)
-        balance = await transaction_service.get_total_balance(user_id)
+        summary = await transaction_service.get_monthly_summary(user_id, now.year, now.month, account_id=account_id)
+        balance = await transaction_service.get_total_balance(user_id, account_id=account_id)
         
         return {
             "success": True,
@@ -245,7 +537,52 @@ async def get_summary(user_id: str = "demo"):
             "summary": summary
         }
     except Exception as e:
-        print(f"Get Summary Error: {e}")
+        log.error("Get summary failed", error=str(e))
+        raise HTTPException(500, str(e))
+
+
+@app.get("/api/summary/history", response_model=SummaryHistoryResponse)
+async def get_summary_history(request: Request, response: Response, user_id: str = "demo", months: int = 12, 
+                              account_id: Optional[str] = None):
+    """Get per-month summaries for the last N months (closed months come from snapshots)"""
+    try:
+        headers = read_headers(user_id)
+        if not_modified(request, headers):
+            return Response(status_code=304, headers=headers)
+        response.headers.update(headers)
+        now = datetime.now()
+        start_index = now.year * 12 + now.month - 1 - (max(months, 1) - 1)
+        start = (start_index // 12, start_index % 12 + 1)
+        history = await transaction_service.get_monthly_summaries(
+            user_id, start, (now.year, now.month), account_id=account_id
+        )
+        return {
+            "success": True,
+            "months": history
+        }
+    except Exception as e:
+        log.error("Get summary history failed", error=str(e))
+        raise HTTPException(500, str(e))
+
+
+@app.get("/api/summary/year-over-year", response_model=YearOverYearResponse)
+async def get_year_over_year(request: Request, response: Response, user_id: str = "demo", 
+                             year: Optional[int] = None, account_id: Optional[str] = None):
+    """Compare each month of a year with the previous year"""
+    try:
+        headers = read_headers(user_id)
+        if not_modified(request, headers):
+            return Response(status_code=304, headers=headers)
+        response.headers.update(headers)
+        comparison = await transaction_service.get_year_over_year(
+            user_id, year or datetime.now().year, account_id=account_id
+        )
+        return {
+            "success": True,
+            "months": comparison
+        }
+    except Exception as e:
+        log.error("Get year-over-year failed", error=str(e))
         raise HTTPException(500, str(e))
 
 
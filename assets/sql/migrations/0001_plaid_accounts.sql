@@ -0,0 +1,27 @@
+-- Plaid accounts (one row per bank account, populated during sync)
+CREATE TABLE IF NOT EXISTS accounts (
+    account_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    item_id TEXT,
+    name TEXT,
+    mask TEXT,
+    type TEXT,
+    subtype TEXT,
+    current_balance DECIMAL(12, 2),
+    available_balance DECIMAL(12, 2),
+    iso_currency_code TEXT DEFAULT 'USD',
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Match plaid_items: accessed through the service role only
+ALTER TABLE accounts DISABLE ROW LEVEL SECURITY;
+
+CREATE INDEX IF NOT EXISTS idx_accounts_user_id ON accounts(user_id);
+
+-- Scope transactions to the account they came from (NULL for CSV/manual entries)
+ALTER TABLE transactions ADD COLUMN IF NOT EXISTS account_id TEXT
+    REFERENCES accounts(account_id) ON DELETE SET NULL;
+
+-- Account-scoped listing, balance and monthly summary queries
+CREATE INDEX IF NOT EXISTS idx_transactions_user_account_date
+    ON transactions(user_id, account_id, transaction_date DESC);
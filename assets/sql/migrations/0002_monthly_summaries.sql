@@ -0,0 +1,16 @@
+-- Immutable per-user monthly summary snapshots for closed months
+-- account_id = '' is the all-accounts snapshot
+CREATE TABLE IF NOT EXISTS monthly_summaries (
+    user_id TEXT NOT NULL,
+    account_id TEXT NOT NULL DEFAULT '',
+    year SMALLINT NOT NULL,
+    month SMALLINT NOT NULL CHECK (month BETWEEN 1 AND 12),
+    income_cents BIGINT NOT NULL DEFAULT 0,
+    expenses_cents BIGINT NOT NULL DEFAULT 0,
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    computed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (user_id, account_id, year, month)
+);
+
+-- Match plaid_items: accessed through the service role only
+ALTER TABLE monthly_summaries DISABLE ROW LEVEL SECURITY;
@@ -0,0 +1,15 @@
+-- Integer cents alongside the DECIMAL amount
+-- Generated by Postgres, so it can never disagree with `amount` and existing rows are backfilled
+ALTER TABLE transactions ADD COLUMN IF NOT EXISTS amount_cents BIGINT
+    GENERATED ALWAYS AS (ROUND(amount * 100)::BIGINT) STORED;
+
+-- Duplicate detection: exact integer match on (user, date, cents), description checked on the few hits
+CREATE INDEX IF NOT EXISTS idx_transactions_dedupe
+    ON transactions(user_id, transaction_date, amount_cents);
+
+-- Monthly snapshots store cents too (existing installs; snapshots are derived data, so just rebuild them)
+ALTER TABLE monthly_summaries ADD COLUMN IF NOT EXISTS income_cents BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE monthly_summaries ADD COLUMN IF NOT EXISTS expenses_cents BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE monthly_summaries DROP COLUMN IF EXISTS income;
+ALTER TABLE monthly_summaries DROP COLUMN IF EXISTS expenses;
+TRUNCATE monthly_summaries;
@@ -0,0 +1,33 @@
+-- migrate: no-transaction
+-- Composite and covering indexes matching the TransactionService query shapes
+-- Needs amount_cents (0003) and account_id (0001).
+-- Every query filters on user_id first, so user_id leads every index.
+-- Built concurrently so inserts keep flowing while the indexes build.
+
+-- get_transaction_page: newest first, keyset on (transaction_date, id).
+-- INCLUDE makes the month totals, all-time fallback and balance reads index-only.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transactions_user_date_id
+    ON transactions(user_id, transaction_date DESC, id DESC)
+    INCLUDE (amount_cents, transaction_type, category);
+
+-- ?type=expense and ?category=... listings (budget page, leaderboard)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transactions_user_type_date
+    ON transactions(user_id, transaction_type, transaction_date DESC)
+    INCLUDE (amount_cents, category);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transactions_user_category_date
+    ON transactions(user_id, category, transaction_date DESC)
+    INCLUDE (amount_cents, transaction_type);
+
+-- Account-scoped listing, balance and month totals
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transactions_user_account_date_id
+    ON transactions(user_id, account_id, transaction_date DESC, id DESC)
+    INCLUDE (amount_cents, transaction_type);
+
+-- check_duplicate: equality on (user, date, cents); description and id come from the index
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transactions_user_date_amount
+    ON transactions(user_id, transaction_date, amount_cents)
+    INCLUDE (description, id);
+
+-- mark_plaid_item_synced looks items up by Plaid item_id
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_plaid_items_item_id ON plaid_items(item_id);
@@ -0,0 +1,7 @@
+-- migrate: no-transaction
+-- Indexes made redundant by 0004 (each is a prefix of a composite index there).
+-- Every insert maintains every index, so the duplicates only cost write time.
+-- idx_transactions_date stays: the archive job scans by date across all users.
+DROP INDEX CONCURRENTLY IF EXISTS idx_transactions_user_id;
+DROP INDEX CONCURRENTLY IF EXISTS idx_transactions_dedupe;
+DROP INDEX CONCURRENTLY IF EXISTS idx_transactions_user_account_date;
@@ -0,0 +1,7 @@
+-- migrate: no-transaction
+-- Merchant filter (description ILIKE '%...%') and fuzzy search need trigrams; a btree cannot serve them.
+-- The btree indexes behind the other /api/transactions filters are in 0004.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transactions_description_trgm
+    ON transactions USING GIN (description gin_trgm_ops);
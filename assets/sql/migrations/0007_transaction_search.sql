@@ -0,0 +1,94 @@
+-- Ranked transaction search (GET /api/transactions/search)
+-- Needs pg_trgm and the trigram index (0006)
+
+-- Word index for prefix matching; 'simple' keeps merchant names unstemmed
+ALTER TABLE transactions ADD COLUMN IF NOT EXISTS description_tsv TSVECTOR
+    GENERATED ALWAYS AS (to_tsvector('simple', COALESCE(description, ''))) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_transactions_description_tsv
+    ON transactions USING GIN (description_tsv);
+
+-- Best match first, keyset-paginated on (rank, id).
+-- Every word of the query is prefix-matched ("starbucks cof" -> starbucks:* & cof:*);
+-- trigram similarity adds typo tolerance ("starbuks").
+-- Once 0009 has created transactions_cold, the user's archived rows are searched too; they have no word index, so their vectors are built on the fly
+-- from that one user's archive.
+CREATE OR REPLACE FUNCTION search_transactions(
+    p_user_id transactions.user_id%TYPE,
+    p_query TEXT,
+    p_limit INTEGER DEFAULT 20,
+    p_after_rank REAL DEFAULT NULL,
+    p_after_id transactions.id%TYPE DEFAULT NULL
+)
+RETURNS TABLE (
+    id transactions.id%TYPE,
+    description TEXT,
+    amount NUMERIC,
+    amount_cents BIGINT,
+    category TEXT,
+    transaction_type TEXT,
+    transaction_date DATE,
+    account_id TEXT,
+    rank REAL
+)
+LANGUAGE plpgsql STABLE
+AS $$
+DECLARE
+    v_tsq TSQUERY;
+BEGIN
+    -- Built up front so the planner sees a value it can probe the GIN indexes with
+    SELECT to_tsquery('simple', string_agg(word || ':*', ' & '))
+    INTO v_tsq
+    FROM (
+        SELECT regexp_replace(w, '[^[:alnum:]]', '', 'g') AS word
+        FROM regexp_split_to_table(lower(p_query), '\s+') AS w
+    ) words
+    WHERE word <> '';
+
+    -- Statements are planned when first run, so the cold branch needs the view only if it exists
+    IF to_regclass('transactions_cold') IS NULL THEN
+        RETURN QUERY
+        SELECT r.*
+        FROM (
+            SELECT
+                t.id, t.description, t.amount, t.amount_cents, t.category::TEXT,
+                t.transaction_type::TEXT, t.transaction_date, t.account_id,
+                (COALESCE(ts_rank(t.description_tsv, v_tsq), 0)
+                    + similarity(t.description, p_query))::REAL AS rank
+            FROM transactions t
+            WHERE t.user_id = p_user_id
+              AND ((v_tsq IS NOT NULL AND t.description_tsv @@ v_tsq) OR t.description % p_query)
+        ) r
+        WHERE p_after_rank IS NULL OR (r.rank, r.id) < (p_after_rank, p_after_id)
+        ORDER BY r.rank DESC, r.id DESC
+        LIMIT p_limit;
+        RETURN;
+    END IF;
+
+    RETURN QUERY
+    SELECT r.*
+    FROM (
+        SELECT
+            t.id, t.description, t.amount, t.amount_cents, t.category::TEXT,
+            t.transaction_type::TEXT, t.transaction_date, t.account_id,
+            (COALESCE(ts_rank(t.description_tsv, v_tsq), 0)
+                + similarity(t.description, p_query))::REAL AS rank
+        FROM transactions t
+        WHERE t.user_id = p_user_id
+          AND ((v_tsq IS NOT NULL AND t.description_tsv @@ v_tsq) OR t.description % p_query)
+        UNION ALL
+        SELECT
+            c.id, c.description, c.amount, c.amount_cents, c.category,
+            c.transaction_type, c.transaction_date, c.account_id,
+            (COALESCE(ts_rank(to_tsvector('simple', COALESCE(c.description, '')), v_tsq), 0)
+                + similarity(c.description, p_query))::REAL AS rank
+        FROM transactions_cold c
+        WHERE c.user_id = p_user_id::TEXT
+          AND ((v_tsq IS NOT NULL AND to_tsvector('simple', COALESCE(c.description, '')) @@ v_tsq)
+               OR c.description % p_query)
+    ) r
+    WHERE p_after_rank IS NULL OR (r.rank, r.id) < (p_after_rank, p_after_id)
+    ORDER BY r.rank DESC, r.id DESC
+    LIMIT p_limit;
+END;
+$$;
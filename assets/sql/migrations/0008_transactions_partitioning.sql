@@ -0,0 +1,172 @@
+-- Range-partition transactions by year of transaction_date
+-- Order: after the migrations that add transaction columns and indexes (0001-0007),
+-- which the partitioned table copies, and before the triggers (0010, 0011).
+-- Triggers already on transactions (installed by hand or out of order) are
+-- recreated on the partitioned table once the rows are copied, so the copy
+-- itself fires none of them.
+-- The old heap is kept as transactions_unpartitioned until you drop it.
+
+-- Creates yearly partitions transactions_yYYYY for [p_from_year, p_to_year], skipping existing ones.
+-- Rows already in the default partition for that year (future-dated imports) are moved into the
+-- new partition first; Postgres refuses to create a partition the default still holds rows for.
+CREATE OR REPLACE FUNCTION create_transaction_partitions(p_from_year INTEGER, p_to_year INTEGER)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_year INTEGER;
+    v_created INTEGER := 0;
+    v_columns TEXT;
+    v_archiving TEXT;
+    v_stranded BOOLEAN;
+BEGIN
+    FOR v_year IN p_from_year..p_to_year LOOP
+        CONTINUE WHEN to_regclass(format('transactions_y%s', v_year)) IS NOT NULL;
+
+        v_stranded := false;
+        IF to_regclass('transactions_default') IS NOT NULL THEN
+            EXECUTE 'SELECT EXISTS (SELECT 1 FROM transactions_default WHERE transaction_date >= $1 AND transaction_date < $2)'
+            INTO v_stranded
+            USING make_date(v_year, 1, 1), make_date(v_year + 1, 1, 1);
+        END IF;
+
+        IF NOT v_stranded THEN
+            EXECUTE format(
+                'CREATE TABLE transactions_y%s PARTITION OF transactions FOR VALUES FROM (%L) TO (%L)',
+                v_year, make_date(v_year, 1, 1), make_date(v_year + 1, 1, 1)
+            );
+        ELSE
+            SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum)
+            INTO v_columns
+            FROM pg_attribute
+            WHERE attrelid = 'transactions'::regclass
+              AND attnum > 0 AND NOT attisdropped AND attgenerated = '';
+
+            -- Moving rows between partitions is not a change to report (feed, month versions)
+            v_archiving := current_setting('budgetbuddy.archiving', true);
+            PERFORM set_config('budgetbuddy.archiving', 'on', true);
+
+            -- Fill a standalone table, then attach it: indexes and triggers come from the parent
+            EXECUTE format(
+                'CREATE TABLE transactions_y%s (LIKE transactions INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING STORAGE)',
+                v_year
+            );
+            EXECUTE format(
+                'WITH moved AS (
+                     DELETE FROM transactions_default
+                     WHERE transaction_date >= %L AND transaction_date < %L
+                     RETURNING *
+                 )
+                 INSERT INTO transactions_y%s (%s) SELECT %s FROM moved',
+                make_date(v_year, 1, 1), make_date(v_year + 1, 1, 1), v_year, v_columns, v_columns
+            );
+            EXECUTE format(
+                'ALTER TABLE transactions ATTACH PARTITION transactions_y%s FOR VALUES FROM (%L) TO (%L)',
+                v_year, make_date(v_year, 1, 1), make_date(v_year + 1, 1, 1)
+            );
+
+            PERFORM set_config('budgetbuddy.archiving', COALESCE(v_archiving, ''), true);
+        END IF;
+        v_created := v_created + 1;
+    END LOOP;
+    RETURN v_created;
+END;
+$$;
+
+LOCK TABLE transactions IN ACCESS EXCLUSIVE MODE;
+
+DO $$
+DECLARE
+    v_columns TEXT;
+    v_first_year INTEGER;
+    v_index RECORD;
+    v_fk RECORD;
+    v_trigger RECORD;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'transactions'::regclass) = 'p' THEN
+        RAISE NOTICE 'transactions is already partitioned, nothing to do';
+        RETURN;
+    END IF;
+
+    ALTER TABLE transactions RENAME TO transactions_unpartitioned;
+
+    -- Free the original constraint names for the new table
+    FOR v_fk IN
+        SELECT conname
+        FROM pg_constraint
+        WHERE conrelid = 'transactions_unpartitioned'::regclass AND contype IN ('p', 'f')
+    LOOP
+        EXECUTE format(
+            'ALTER TABLE transactions_unpartitioned RENAME CONSTRAINT %I TO %I',
+            v_fk.conname, left(v_fk.conname, 55) || '_unpart'
+        );
+    END LOOP;
+
+    -- Same columns, defaults and generated columns; the primary key must include the partition key
+    CREATE TABLE transactions (
+        LIKE transactions_unpartitioned
+        INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING GENERATED INCLUDING STORAGE INCLUDING COMMENTS
+    ) PARTITION BY RANGE (transaction_date);
+    ALTER TABLE transactions ADD PRIMARY KEY (id, transaction_date);
+
+    -- Foreign keys (user, budget, account) are not copied by LIKE
+    FOR v_fk IN
+        SELECT conname, pg_get_constraintdef(oid) AS def
+        FROM pg_constraint
+        WHERE conrelid = 'transactions_unpartitioned'::regclass AND contype = 'f'
+    LOOP
+        EXECUTE format('ALTER TABLE transactions ADD CONSTRAINT %I %s', replace(v_fk.conname, '_unpart', ''), v_fk.def);
+    END LOOP;
+
+    -- Secondary indexes become partitioned indexes under their original names
+    FOR v_index IN
+        SELECT i.relname AS name, pg_get_indexdef(x.indexrelid) AS def
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        WHERE x.indrelid = 'transactions_unpartitioned'::regclass AND NOT x.indisunique
+    LOOP
+        EXECUTE format('ALTER INDEX %I RENAME TO %I', v_index.name, left(v_index.name, 55) || '_unpart');
+        EXECUTE replace(v_index.def, ' ON public.transactions_unpartitioned ', ' ON public.transactions ');
+    END LOOP;
+
+    -- Yearly partitions for the existing history plus next year; anything else lands in the default
+    SELECT COALESCE(EXTRACT(YEAR FROM MIN(transaction_date))::INTEGER, EXTRACT(YEAR FROM NOW())::INTEGER)
+    INTO v_first_year
+    FROM transactions_unpartitioned;
+    PERFORM create_transaction_partitions(v_first_year, EXTRACT(YEAR FROM NOW())::INTEGER + 1);
+    CREATE TABLE transactions_default PARTITION OF transactions DEFAULT;
+
+    -- Copy every stored (non-generated) column
+    SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum)
+    INTO v_columns
+    FROM pg_attribute
+    WHERE attrelid = 'transactions_unpartitioned'::regclass
+      AND attnum > 0 AND NOT attisdropped AND attgenerated = '';
+    EXECUTE format(
+        'INSERT INTO transactions (%s) SELECT %s FROM transactions_unpartitioned',
+        v_columns, v_columns
+    );
+
+    -- LIKE does not copy triggers (change feed, month versions, audit)
+    FOR v_trigger IN
+        SELECT pg_get_triggerdef(oid) AS def
+        FROM pg_trigger
+        WHERE tgrelid = 'transactions_unpartitioned'::regclass AND NOT tgisinternal
+    LOOP
+        EXECUTE replace(v_trigger.def, ' ON public.transactions_unpartitioned ', ' ON public.transactions ');
+    END LOOP;
+
+    -- Month snapshots are only trusted while this trigger keeps their versions moving (0011)
+    IF to_regclass('transaction_month_versions') IS NOT NULL AND NOT EXISTS (
+        SELECT 1 FROM pg_trigger
+        WHERE tgrelid = 'transactions'::regclass AND tgname = 'transactions_bump_month_version'
+    ) THEN
+        RAISE EXCEPTION 'transactions_bump_month_version trigger missing after repartitioning';
+    END IF;
+END;
+$$;
+
+-- Match reset_transactions_and_policies.sql: accessed through the service role only
+ALTER TABLE transactions DISABLE ROW LEVEL SECURITY;
+
+ANALYZE transactions;
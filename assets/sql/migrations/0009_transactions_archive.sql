@@ -0,0 +1,133 @@
+-- Cold tier for old transactions (needs the yearly partitions from 0008)
+--
+-- archive_transactions(cutoff) moves every transaction dated before the
+-- cutoff into transactions_archive: one row per user and year, holding the
+-- transactions as a JSONB array that Postgres stores compressed (TOAST; lz4 where available).
+-- Whole yearly partitions are archived and dropped; stragglers (e.g. from the
+-- default partition) are moved row by row. transactions_cold reads the
+-- archive back as ordinary rows and transactions_all spans both tiers.
+
+CREATE TABLE IF NOT EXISTS transactions_archive (
+    user_id TEXT NOT NULL,
+    year SMALLINT NOT NULL,
+    transaction_count INTEGER NOT NULL,
+    income_cents BIGINT NOT NULL,
+    expenses_cents BIGINT NOT NULL,
+    rows JSONB NOT NULL,
+    archived_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (user_id, year)
+);
+
+-- lz4 compresses faster and tighter than the default pglz; keep pglz where the server lacks lz4
+DO $$
+BEGIN
+    ALTER TABLE transactions_archive ALTER COLUMN rows SET COMPRESSION lz4;
+EXCEPTION WHEN feature_not_supported THEN
+    RAISE NOTICE 'lz4 not available, archive uses pglz compression';
+END;
+$$;
+
+-- Match plaid_items: accessed through the service role only
+ALTER TABLE transactions_archive DISABLE ROW LEVEL SECURITY;
+
+CREATE OR REPLACE VIEW transactions_cold AS
+SELECT
+    r.id, a.user_id, r.account_id, r.description, r.amount, r.amount_cents,
+    r.category, r.transaction_type, r.transaction_date, r.created_at
+FROM transactions_archive a
+CROSS JOIN LATERAL jsonb_to_recordset(a.rows) AS r(
+    id UUID, account_id TEXT, description TEXT, amount NUMERIC, amount_cents BIGINT,
+    category TEXT, transaction_type TEXT, transaction_date DATE, created_at TIMESTAMPTZ
+);
+
+CREATE OR REPLACE VIEW transactions_all AS
+SELECT id, user_id::TEXT AS user_id, account_id, description, amount, amount_cents,
+       category::TEXT AS category, transaction_type::TEXT AS transaction_type,
+       transaction_date, created_at
+FROM transactions
+UNION ALL
+SELECT id, user_id, account_id, description, amount, amount_cents,
+       category, transaction_type, transaction_date, created_at
+FROM transactions_cold;
+
+-- Merge a batch of moved rows into the archive (rows are appended to existing user-years)
+CREATE OR REPLACE FUNCTION _archive_rows(p_rows JSONB)
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    WITH moved AS (
+        SELECT value AS row,
+               value->>'user_id' AS user_id,
+               EXTRACT(YEAR FROM (value->>'transaction_date')::DATE)::SMALLINT AS year,
+               (value->>'amount_cents')::BIGINT AS cents,
+               value->>'transaction_type' AS transaction_type
+        FROM jsonb_array_elements(p_rows)
+    ),
+    grouped AS (
+        SELECT user_id, year,
+               COUNT(*)::INTEGER AS transaction_count,
+               COALESCE(SUM(cents) FILTER (WHERE transaction_type = 'income'), 0) AS income_cents,
+               COALESCE(SUM(cents) FILTER (WHERE transaction_type = 'expense'), 0) AS expenses_cents,
+               jsonb_agg(row - 'user_id' - 'description_tsv' ORDER BY row->>'transaction_date') AS rows
+        FROM moved
+        GROUP BY user_id, year
+    ),
+    upserted AS (
+        INSERT INTO transactions_archive AS a
+            (user_id, year, transaction_count, income_cents, expenses_cents, rows)
+        SELECT user_id, year, transaction_count, income_cents, expenses_cents, rows
+        FROM grouped
+        ON CONFLICT (user_id, year) DO UPDATE SET
+            transaction_count = a.transaction_count + EXCLUDED.transaction_count,
+            income_cents = a.income_cents + EXCLUDED.income_cents,
+            expenses_cents = a.expenses_cents + EXCLUDED.expenses_cents,
+            rows = a.rows || EXCLUDED.rows,
+            archived_at = NOW()
+        RETURNING 1
+    )
+    SELECT COALESCE(SUM(transaction_count), 0)::INTEGER FROM grouped;
+$$;
+
+-- Archive everything dated before p_cutoff; returns the number of rows moved
+CREATE OR REPLACE FUNCTION archive_transactions(p_cutoff DATE)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_partition RECORD;
+    v_rows JSONB;
+    v_moved INTEGER := 0;
+BEGIN
+    -- Rows moved to the archive are not changes to report on the realtime feed
+    PERFORM set_config('budgetbuddy.archiving', 'on', true);
+
+    -- Whole partitions below the cutoff: copy out, then detach and drop (no row-by-row delete)
+    FOR v_partition IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'transactions'::regclass
+          AND c.relname ~ '^transactions_y[0-9]{4}$'
+          AND make_date(substring(c.relname FROM 15)::INTEGER + 1, 1, 1) <= p_cutoff
+        ORDER BY c.relname
+    LOOP
+        EXECUTE format('SELECT jsonb_agg(to_jsonb(t)) FROM %I t', v_partition.relname) INTO v_rows;
+        IF v_rows IS NOT NULL THEN
+            v_moved := v_moved + _archive_rows(v_rows);
+        END IF;
+        EXECUTE format('ALTER TABLE transactions DETACH PARTITION %I', v_partition.relname);
+        EXECUTE format('DROP TABLE %I', v_partition.relname);
+    END LOOP;
+
+    -- Anything older still left (default partition, partial years)
+    WITH deleted AS (
+        DELETE FROM transactions WHERE transaction_date < p_cutoff RETURNING *
+    )
+    SELECT jsonb_agg(to_jsonb(deleted)) INTO v_rows FROM deleted;
+    IF v_rows IS NOT NULL THEN
+        v_moved := v_moved + _archive_rows(v_rows);
+    END IF;
+
+    RETURN v_moved;
+END;
+$$;
@@ -0,0 +1,51 @@
+-- Realtime change feed (CHANGE_FEED_BACKEND=postgres)
+-- Every insert, update and delete on transactions is sent on the
+-- transaction_changes channel; api.py relays it to the user's open clients
+-- (GET /api/changes). Payloads carry only what the UI needs and stay far
+-- below NOTIFY's 8000-byte limit.
+
+-- The row is passed as JSONB rather than the transactions row type, which would
+-- bind the function to whichever table holds that name when it is created
+CREATE OR REPLACE FUNCTION _notify_transaction_change(p_type TEXT, p_row JSONB)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    SELECT pg_notify('transaction_changes', json_build_object(
+        'type', p_type,
+        'user_id', p_row->>'user_id',
+        'row', json_build_object(
+            'id', p_row->'id',
+            'transaction_date', p_row->'transaction_date',
+            'amount_cents', p_row->'amount_cents',
+            'transaction_type', p_row->'transaction_type',
+            'category', p_row->'category',
+            'description', left(p_row->>'description', 200),
+            'account_id', p_row->'account_id'
+        )
+    )::TEXT);
+$$;
+
+CREATE OR REPLACE FUNCTION notify_transaction_change()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- archive_transactions() moves rows to the cold tier; totals do not change
+    IF current_setting('budgetbuddy.archiving', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    -- An update is sent as the old row removed and the new row added
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM _notify_transaction_change('removed', to_jsonb(OLD));
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM _notify_transaction_change('added', to_jsonb(NEW));
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS transactions_notify_change ON transactions;
+CREATE TRIGGER transactions_notify_change
+    AFTER INSERT OR UPDATE OR DELETE ON transactions
+    FOR EACH ROW EXECUTE FUNCTION notify_transaction_change();
@@ -0,0 +1,82 @@
+-- Versioned monthly summary snapshots
+-- Needs monthly_summaries (0002).
+-- Every write to a month bumps that user's month counter in the same
+-- transaction. A snapshot records the counter it was computed from and is
+-- only trusted while the counter still matches, so a snapshot computed
+-- while a backdated write was committing can never outlive that write.
+--
+-- The counters only move while the transactions_bump_month_version trigger
+-- is in place; without it every snapshot would stay "current" forever. The
+-- app reads the counters through get_transaction_month_versions(), which
+-- fails while the trigger is missing or disabled, and then computes every
+-- summary live. Repartitioning (0008) carries the trigger over and checks it.
+
+CREATE TABLE IF NOT EXISTS transaction_month_versions (
+    user_id TEXT NOT NULL,
+    year SMALLINT NOT NULL,
+    month SMALLINT NOT NULL CHECK (month BETWEEN 1 AND 12),
+    version BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, year, month)
+);
+
+-- Match monthly_summaries: accessed through the service role only
+ALTER TABLE transaction_month_versions DISABLE ROW LEVEL SECURITY;
+
+-- NULL for snapshots saved before this migration, which are never trusted
+ALTER TABLE monthly_summaries ADD COLUMN IF NOT EXISTS source_version BIGINT;
+
+CREATE OR REPLACE FUNCTION _bump_transaction_month(p_user_id TEXT, p_date DATE)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    INSERT INTO transaction_month_versions (user_id, year, month, version)
+    VALUES (p_user_id, EXTRACT(YEAR FROM p_date), EXTRACT(MONTH FROM p_date), 1)
+    ON CONFLICT (user_id, year, month)
+    DO UPDATE SET version = transaction_month_versions.version + 1;
+$$;
+
+CREATE OR REPLACE FUNCTION bump_transaction_month_version()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- archive_transactions() moves rows to the cold tier; totals do not change
+    IF current_setting('budgetbuddy.archiving', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM _bump_transaction_month(OLD.user_id::TEXT, OLD.transaction_date);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM _bump_transaction_month(NEW.user_id::TEXT, NEW.transaction_date);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS transactions_bump_month_version ON transactions;
+CREATE TRIGGER transactions_bump_month_version
+    AFTER INSERT OR UPDATE OR DELETE ON transactions
+    FOR EACH ROW EXECUTE FUNCTION bump_transaction_month_version();
+
+-- A user's counters for [p_from_year, p_to_year]; raises if the trigger that moves them is gone
+CREATE OR REPLACE FUNCTION get_transaction_month_versions(p_user_id TEXT, p_from_year INTEGER, p_to_year INTEGER)
+RETURNS TABLE (year SMALLINT, month SMALLINT, version BIGINT)
+LANGUAGE plpgsql STABLE
+AS $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_trigger
+        WHERE tgrelid = 'transactions'::regclass
+          AND tgname = 'transactions_bump_month_version'
+          AND tgenabled <> 'D'
+    ) THEN
+        RAISE EXCEPTION 'transactions_bump_month_version trigger is missing or disabled; month snapshots cannot be trusted';
+    END IF;
+
+    RETURN QUERY
+    SELECT v.year, v.month, v.version
+    FROM transaction_month_versions v
+    WHERE v.user_id = p_user_id AND v.year BETWEEN p_from_year AND p_to_year;
+END;
+$$;
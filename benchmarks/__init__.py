@@ -0,0 +1 @@
+"""Offline benchmarks for Budget Buddy hot paths"""
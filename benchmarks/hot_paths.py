@@ -0,0 +1,334 @@
+"""Offline benchmarks for ingest, aggregation and rendering hot paths
+
+Runs entirely in-process: Supabase is the in-memory stand-in
+(src/database/supabase_standin.py) and Plaid data comes from FakePlaid.
+
+Usage:
+    python -m benchmarks.hot_paths                        # full suite (CSV parse up to 1M rows)
+    python -m benchmarks.hot_paths --quick                # small sizes, for a fast check
+    python -m benchmarks.hot_paths --only csv_parse,summary --output results.json
+
+Benchmarks: csv_parse, csv_upload, summary, plaid_transform, page_build.
+
+--output writes a JSON document for comparing runs:
+
+    {"suite": "hot_paths", "schema": 1, "git_commit": ..., "python": ..., "platform": ...,
+     "results": [{"id": "csv_parse[rows=1000]", "benchmark": "csv_parse", "params": {"rows": 1000},
+                  "repeat": 5, "seconds": {"median": ..., "min": ..., "max": ..., "mean": ..., "samples": [...]},
+                  "items": 1000, "items_per_sec": ...}, ...]}
+
+A benchmark that cannot run in this environment (e.g. page_build on a flet
+whose controls it cannot build) records {"id": ..., "skipped": "..."}; one
+that fails records {"id": ..., "error": "..."}.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.config import Config
+
+SCHEMA = 1
+CATEGORIES = ['Food & Dining', 'Groceries', 'Transportation', 'Entertainment', 'Shopping', 'Bills & Utilities', 'Rent']
+MERCHANTS = ['Starbucks Coffee', 'Whole Foods Market', 'Shell Gas', 'Netflix', 'Amazon',
+             'Uber Trip', 'Target', 'Chipotle', 'Spotify', 'Payroll Deposit']
+
+
+class SkipBenchmark(Exception):
+    """Raised by a benchmark that cannot run in this environment"""
+
+
+def measure(run: Callable[[], object], repeat: int, setup: Optional[Callable[[], None]] = None) -> Dict:
+    """Seconds per call over `repeat` calls; setup() runs untimed before each call
+
+    Coroutines returned by run() are awaited on one event loop.
+    """
+    loop = asyncio.new_event_loop()
+    timings = []
+    try:
+        for _ in range(repeat):
+            if setup:
+                setup()
+            start = time.perf_counter()
+            result = run()
+            if asyncio.iscoroutine(result):
+                loop.run_until_complete(result)
+            timings.append(time.perf_counter() - start)
+    finally:
+        loop.close()
+    return {
+        'median': statistics.median(timings),
+        'min': min(timings),
+        'max': max(timings),
+        'mean': statistics.fmean(timings),
+        'samples': timings,
+    }
+
+
+def history_rows(count: int, user_id: str, years: int = 3, seed: int = 7) -> List[Dict]:
+    """Transaction rows spread over the last `years` years, about 1 in 12 income"""
+    rng = random.Random(seed)
+    today = date.today()
+    return [
+        {
+            'user_id': user_id,
+            'amount': f"{rng.randint(100, 25000) / 100:.2f}",
+            'transaction_type': 'income' if i % 12 == 0 else 'expense',
+            'category': rng.choice(CATEGORIES),
+            'description': f"{rng.choice(MERCHANTS)} #{rng.randint(1, 97)}",
+            'transaction_date': (today - timedelta(days=rng.randrange(365 * years))).isoformat(),
+        }
+        for i in range(count)
+    ]
+
+
+def csv_frame(rows: int, seed: int = 7) -> pd.DataFrame:
+    """Upload-format CSV rows (date, description, amount, type, category), built vectorized"""
+    rng = np.random.default_rng(seed)
+    days = rng.integers(0, 365 * 3, rows)
+    dates = (np.datetime64(date.today()) - days.astype('timedelta64[D]')).astype(str)
+    merchants = np.array(MERCHANTS)[rng.integers(0, len(MERCHANTS), rows)]
+    return pd.DataFrame({
+        'date': dates,
+        'description': np.char.add(np.char.add(merchants, ' #'), np.arange(rows).astype(str)),
+        'amount': (rng.integers(100, 25000, rows) / 100).round(2),
+        'type': np.where(np.arange(rows) % 12 == 0, 'income', 'expense'),
+        'category': np.array(CATEGORIES)[rng.integers(0, len(CATEGORIES), rows)],
+    })
+
+
+# --- Benchmarks: each yields result dicts ---
+
+def bench_csv_parse(args, workdir: str):
+    from src.services.csv_parser import CSVParser
+
+    sizes = [1_000, 10_000] if args.quick else [1_000, 100_000, 1_000_000]
+    for rows in sizes:
+        path = os.path.join(workdir, f"parse_{rows}.csv")
+        csv_frame(rows).to_csv(path, index=False)
+        repeat = args.repeat if rows <= 10_000 else 1
+        seconds = measure(lambda: CSVParser.parse_generic_csv(path), repeat)
+        yield 'csv_parse', {'rows': rows}, repeat, seconds, rows
+
+
+def bench_csv_upload(args, workdir: str):
+    from fastapi.testclient import TestClient
+    from src.database.supabase_standin import FakeSupabase
+    import api
+
+    client = TestClient(api.app)
+    for rows in ([200, 1_000] if args.quick else [1_000, 5_000]):
+        buffer = io.StringIO()
+        csv_frame(rows).to_csv(buffer, index=False)
+        body = buffer.getvalue().encode()
+        repeat = max(1, args.repeat // 2)
+
+        def fresh_database():
+            api.transaction_service.supabase = FakeSupabase()  # Nothing is a duplicate
+
+        async def no_duplicate(*args):
+            return False
+
+        # The stand-in answers check_duplicate by scanning the user's rows, so it would dominate
+        # and grow with the table; Postgres serves it from idx_transactions_user_date_amount.
+        # Nothing is a duplicate in a fresh database anyway, so time the upload without it.
+        api.transaction_service.check_duplicate = no_duplicate
+
+        def upload():
+            response = client.post('/api/csv/upload', params={'user_id': 'bench-user'},
+                                   files={'file': ('bench.csv', body, 'text/csv')})
+            assert response.json()['imported'] == rows, response.text
+
+        try:
+            seconds = measure(upload, repeat, setup=fresh_database)
+        finally:
+            del api.transaction_service.check_duplicate
+        yield 'csv_upload', {'rows': rows}, repeat, seconds, rows
+
+
+def bench_summary(args, workdir: str):
+    from src.database.cache import ReadThroughCache
+    from src.database.supabase_standin import FakeSupabase
+    from src.database.transaction_service import TransactionService
+
+    service = TransactionService()
+    service.cache = ReadThroughCache(None, 0)  # Measure the queries, not the cache
+    now = datetime.now()
+    for history in ([1_000, 10_000] if args.quick else [1_000, 10_000, 100_000]):
+        service.supabase = FakeSupabase()
+        service.supabase.seed('transactions', history_rows(history, 'bench-user'))
+        seconds = measure(lambda: service.get_monthly_summary('bench-user', now.year, now.month), args.repeat)
+        yield 'monthly_summary', {'history': history}, args.repeat, seconds, None
+        seconds = measure(lambda: service.get_total_balance('bench-user'), args.repeat)
+        yield 'total_balance', {'history': history}, args.repeat, seconds, history
+
+
+def bench_plaid_transform(args, workdir: str):
+    Config.PLAID_ENV = 'local'
+    from src.services.plaid_service import PlaidService
+    from src.services.plaid_standin import FakePlaid
+
+    service = PlaidService()
+    count = 2_000 if args.quick else 20_000
+    transactions = FakePlaid(transactions_per_item=count, history_days=365)._item('access-bench')['transactions']
+
+    seconds = measure(lambda: [service._transform_transaction(t) for t in transactions], args.repeat)
+    yield 'plaid_transform', {'transactions': count}, args.repeat, seconds, count
+
+    def batched():
+        categories = service.category_mapper.map_many(transactions)
+        return [service._transform_transaction(t, c) for t, c in zip(transactions, categories)]
+    seconds = measure(batched, args.repeat)
+    yield 'plaid_transform_batched', {'transactions': count}, args.repeat, seconds, count
+
+
+class _HeadlessPage:
+    """Just enough of ft.Page for the pages' constructors"""
+
+    is_dark_mode = False
+
+    def run_task(self, handler, *args):
+        pass  # Data loading is benchmarked separately
+
+    def update(self, *controls):
+        pass
+
+
+def bench_page_build(args, workdir: str):
+    from importlib.metadata import version
+    flet_version = version('flet')
+    if tuple(int(part) for part in flet_version.split('.')[:2]) >= (0, 80):
+        # The pages assign Control.page, which flet 0.80+ made read-only
+        raise SkipBenchmark(f"pages need flet<0.80, found {flet_version}")
+    
+    from src.ui.pages.budget import BudgetsPage
+    from src.ui.pages.transactions_page import TransactionsPage
+    from src.utils.transaction_frame import TransactionFrame
+
+    auth = SimpleNamespace(supabase=None, current_user=None)
+    rows = history_rows(TransactionsPage.PAGE_SIZE, 'bench-user')
+    for row in rows:
+        row['id'] = os.urandom(8).hex()
+        row['amount_cents'] = round(float(row['amount']) * 100)
+    frame = TransactionFrame.from_records(rows)
+
+    def transactions_page():
+        page = TransactionsPage(_HeadlessPage(), auth)
+        page.transactions_column.update = lambda: None  # Not attached to a live page
+        page.transactions = frame
+        page.update_transactions_list()
+
+    seconds = measure(transactions_page, args.repeat)
+    yield 'page_build_transactions', {'rows': len(rows)}, args.repeat, seconds, len(rows)
+
+    categories = {name: 100.0 * (i + 1) for i, name in enumerate(CATEGORIES * 3)}
+
+    def budgets_page():
+        page = BudgetsPage(_HeadlessPage(), auth)
+        page.category_totals = categories
+        page.update_budget_display()
+
+    seconds = measure(budgets_page, args.repeat)
+    yield 'page_build_budgets', {'categories': len(categories)}, args.repeat, seconds, None
+
+
+BENCHMARKS = {
+    'csv_parse': bench_csv_parse,
+    'csv_upload': bench_csv_upload,
+    'summary': bench_summary,
+    'plaid_transform': bench_plaid_transform,
+    'page_build': bench_page_build,
+}
+
+
+def result_id(benchmark: str, params: Dict) -> str:
+    return f"{benchmark}[{','.join(f'{k}={v}' for k, v in params.items())}]"
+
+
+def run_suite(args) -> Dict:
+    results = []
+    with tempfile.TemporaryDirectory(prefix='bench-') as workdir:
+        for name in args.only:
+            try:
+                for benchmark, params, repeat, seconds, items in BENCHMARKS[name](args, workdir):
+                    result = {
+                        'id': result_id(benchmark, params),
+                        'benchmark': benchmark,
+                        'params': params,
+                        'repeat': repeat,
+                        'seconds': seconds,
+                        'items': items,
+                        'items_per_sec': items / seconds['median'] if items and seconds['median'] else None,
+                    }
+                    results.append(result)
+                    rate = f"{result['items_per_sec']:>14,.0f}/s" if result['items_per_sec'] else ''
+                    print(f"{result['id']:<44}{seconds['median'] * 1000:>12.2f} ms{rate}", flush=True)
+            except SkipBenchmark as e:
+                results.append({'id': name, 'benchmark': name, 'skipped': str(e)})
+                print(f"{name:<44} ⏭️ skipped: {e}", flush=True)
+            except Exception as e:
+                results.append({'id': name, 'benchmark': name, 'error': f"{e.__class__.__name__}: {e}"})
+                print(f"{name:<44} ❌ {e.__class__.__name__}: {e}", flush=True)
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'suite': 'hot_paths',
+        'schema': SCHEMA,
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'quick': args.quick,
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="small sizes only")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per benchmark (median reported)")
+    parser.add_argument("--only", default=','.join(BENCHMARKS),
+                        help=f"comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--output", help="write the JSON results here")
+    args = parser.parse_args()
+    args.only = [name.strip() for name in args.only.split(',') if name.strip()]
+    unknown = set(args.only) - set(BENCHMARKS)
+    if unknown:
+        raise SystemExit(f"❌ Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    # Keep per-row debug logging and tracing out of the measurements
+    Config.LOG_LEVEL = 'WARNING'
+    Config.TRACE_EXPORTER = 'none'
+
+    print(f"{'benchmark':<44}{'median':>15}{'throughput':>16}")
+    report = run_suite(args)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
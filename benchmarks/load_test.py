@@ -0,0 +1,287 @@
+"""HTTP load test: replays UI sessions against one api.py worker
+
+Each virtual user loops over sessions the Flet app would produce:
+
+    health check, dashboard load (summary, balances, recent transactions),
+    transactions page plus 0-2 more pages, budgets (this year's expenses),
+    leaderboard (all expenses), a search in some sessions, and a CSV import
+    (followed by a summary reload) in --import-rate of them
+
+Transaction lists are requested in the compact encoding, as APIClient does.
+
+Usage:
+    # Start a worker on the in-memory Supabase stand-in and test it
+    python -m benchmarks.load_test --spawn --users 50 --concurrency 1,10,50 --duration 30
+    # Or test a running API started with SUPABASE_BACKEND=memory SUPABASE_FAKE_USERS=50
+    python -m benchmarks.load_test --url http://localhost:8000 --users 50 --concurrency 20
+
+Reports per endpoint and concurrency level: requests, errors, throughput and
+p50/p95/p99 latency. --output writes them as JSON, with the same document
+layout as benchmarks.hot_paths.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.synthetic import generate, user_ids
+
+SCHEMA = 1
+RECENT_LIMIT = 10    # TransactionStore's recent_limit
+PAGE_SIZE = 100      # TransactionsPage.PAGE_SIZE
+SEARCH_TERMS = ['coffee', 'grocery', 'gas', 'uber', 'amazon', 'netflix', 'pharm']
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def csv_bodies(count: int, seed: int) -> List[bytes]:
+    """Small statement exports (about a month each) for the occasional import"""
+    bodies = []
+    for frame in generate(user_ids(count, seed + 1), years=0.08, seed=seed):
+        buffer = io.StringIO()
+        frame.drop(columns='user_id').assign(amount=frame['amount'] / 100).to_csv(buffer, index=False, float_format='%.2f')
+        bodies.append(buffer.getvalue().encode())
+    return bodies
+
+
+class LoadTest:
+    """Virtual users for one concurrency level, recording (endpoint, seconds, ok) per request"""
+
+    def __init__(self, client: httpx.AsyncClient, users: List[str], args):
+        self.client = client
+        self.users = users
+        self.args = args
+        self.bodies = csv_bodies(8, args.seed)
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.sessions = 0
+        self.recording = False
+
+    async def call(self, endpoint: str, method: str, path: str, **kwargs) -> Optional[Dict]:
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, **kwargs)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            response, ok = None, False
+        elapsed = time.perf_counter() - start
+        if self.recording:
+            self.samples.setdefault(endpoint, []).append(elapsed)
+            if not ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+        return response.json() if ok else None
+
+    async def session(self, rng: random.Random):
+        user = rng.choice(self.users)
+        await self.call('health', 'GET', '/')
+
+        # Dashboard (TransactionStore.load)
+        await self.call('summary', 'GET', '/api/summary', params={'user_id': user})
+        await self.call('balances', 'GET', '/api/accounts/balances', params={'user_id': user})
+        await self.call('recent', 'GET', '/api/transactions',
+                        params={'user_id': user, 'format': 'compact', 'limit': RECENT_LIMIT})
+
+        # Transactions page, scrolled a little
+        page = await self.call('transactions_page', 'GET', '/api/transactions',
+                               params={'user_id': user, 'format': 'compact', 'limit': PAGE_SIZE})
+        for _ in range(rng.randint(0, 2)):
+            if not page or not page.get('next_cursor'):
+                break
+            page = await self.call('transactions_next', 'GET', '/api/transactions',
+                                   params={'user_id': user, 'format': 'compact', 'limit': PAGE_SIZE, 'cursor': page['next_cursor']})
+        if rng.random() < 0.3:
+            await self.call('search', 'GET', '/api/transactions/search',
+                            params={'user_id': user, 'format': 'compact', 'q': rng.choice(SEARCH_TERMS)})
+
+        # Budgets and leaderboard pages
+        await self.call('budgets', 'GET', '/api/transactions',
+                        params={'user_id': user, 'format': 'compact', 'limit': 1000, 'type': 'expense',
+                                'start_date': date(datetime.now().year, 1, 1).isoformat()})
+        await self.call('leaderboard', 'GET', '/api/transactions',
+                        params={'user_id': user, 'format': 'compact', 'limit': 1000, 'type': 'expense'})
+
+        if rng.random() < self.args.import_rate:
+            await self.call('csv_upload', 'POST', '/api/csv/upload', params={'user_id': user},
+                            files={'file': ('statement.csv', rng.choice(self.bodies), 'text/csv')})
+            await self.call('summary', 'GET', '/api/summary', params={'user_id': user})
+
+        if self.recording:
+            self.sessions += 1
+
+    async def virtual_user(self, index: int, deadline: float):
+        rng = random.Random(self.args.seed * 1000 + index)
+        while time.perf_counter() < deadline:
+            await self.session(rng)
+            if self.args.think_ms:
+                await asyncio.sleep(rng.expovariate(1000 / self.args.think_ms))
+
+    async def run(self, concurrency: int) -> float:
+        """Warm up, then record for --duration seconds; returns the recorded wall time"""
+        deadline = time.perf_counter() + self.args.warmup + self.args.duration
+        tasks = [asyncio.create_task(self.virtual_user(i, deadline)) for i in range(concurrency)]
+        await asyncio.sleep(self.args.warmup)
+        self.recording = True
+        started = time.perf_counter()
+        await asyncio.gather(*tasks)  # Sessions in flight at the deadline finish and are counted
+        return time.perf_counter() - started
+
+
+def summarize(test: LoadTest, concurrency: int, elapsed: float) -> List[Dict]:
+    results = []
+    for endpoint in sorted(test.samples):
+        ordered = sorted(test.samples[endpoint])
+        results.append({
+            'id': f"{endpoint}[concurrency={concurrency}]",
+            'benchmark': endpoint,
+            'params': {'concurrency': concurrency},
+            'requests': len(ordered),
+            'errors': test.errors.get(endpoint, 0),
+            'requests_per_sec': len(ordered) / elapsed,
+            'latency_ms': {
+                'p50': percentile(ordered, 50) * 1000,
+                'p95': percentile(ordered, 95) * 1000,
+                'p99': percentile(ordered, 99) * 1000,
+                'mean': sum(ordered) / len(ordered) * 1000,
+                'max': ordered[-1] * 1000,
+            },
+        })
+    total = sum(len(samples) for samples in test.samples.values())
+    results.append({
+        'id': f"sessions[concurrency={concurrency}]",
+        'benchmark': 'sessions',
+        'params': {'concurrency': concurrency},
+        'sessions': test.sessions,
+        'sessions_per_sec': test.sessions / elapsed,
+        'requests': total,
+        'errors': sum(test.errors.values()),
+        'requests_per_sec': total / elapsed,
+    })
+    return results
+
+
+def print_stage(concurrency: int, results: List[Dict]):
+    print(f"\nconcurrency {concurrency}")
+    print(f"{'endpoint':<20}{'requests':>10}{'errors':>8}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for result in results:
+        if 'latency_ms' in result:
+            latency = result['latency_ms']
+            print(f"{result['benchmark']:<20}{result['requests']:>10}{result['errors']:>8}"
+                  f"{result['requests_per_sec']:>9.1f}{latency['p50']:>10.1f}{latency['p95']:>10.1f}{latency['p99']:>10.1f}")
+        else:
+            print(f"{'total':<20}{result['requests']:>10}{result['errors']:>8}{result['requests_per_sec']:>9.1f}"
+                  f"   ({result['sessions_per_sec']:.2f} sessions/s)")
+
+
+def spawn_api(args) -> Tuple[subprocess.Popen, str]:
+    """One uvicorn worker on a free port, backed by the seeded in-memory stand-in"""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    env = {
+        **os.environ,
+        'SUPABASE_BACKEND': 'memory',
+        'SUPABASE_FAKE_USERS': str(args.users),
+        'SUPABASE_FAKE_LATENCY_MS': str(args.db_latency_ms),
+        'LOG_LEVEL': 'WARNING',
+    }
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'api:app', '--host', '127.0.0.1', '--port', str(port),
+         '--log-level', 'warning', '--no-access-log'],
+        cwd=ROOT, env=env
+    )
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(240):
+        if process.poll() is not None:
+            raise SystemExit("❌ api.py exited during startup")
+        try:
+            if httpx.get(url + '/', timeout=1).status_code == 200:
+                return process, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise SystemExit("❌ api.py did not become ready within 120s")
+
+
+async def run_levels(url: str, args) -> List[Dict]:
+    users = user_ids(args.users, 0)  # The ids SUPABASE_FAKE_USERS seeds
+    results = []
+    for concurrency in args.concurrency:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limits) as client:
+            test = LoadTest(client, users, args)
+            elapsed = await test.run(concurrency)
+        stage = summarize(test, concurrency, elapsed)
+        print_stage(concurrency, stage)
+        results.extend(stage)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="running API to test")
+    target.add_argument("--spawn", action="store_true", help="start a local api.py worker on the Supabase stand-in")
+    parser.add_argument("--users", type=int, default=20, help="synthetic users (SUPABASE_FAKE_USERS on the server)")
+    parser.add_argument("--concurrency", default="1,10,25", help="comma-separated virtual user counts, one stage each")
+    parser.add_argument("--duration", type=float, default=20, help="seconds recorded per stage")
+    parser.add_argument("--warmup", type=float, default=3, help="unrecorded seconds before each stage")
+    parser.add_argument("--think-ms", type=float, default=0, help="mean pause between sessions (0 = closed loop)")
+    parser.add_argument("--import-rate", type=float, default=0.1, help="share of sessions that import a CSV")
+    parser.add_argument("--db-latency-ms", type=float, default=2, help="stand-in latency per query with --spawn")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the JSON results here")
+    args = parser.parse_args()
+    args.concurrency = [int(level) for level in args.concurrency.split(',') if level.strip()]
+
+    process, url = spawn_api(args) if args.spawn else (None, args.url.rstrip('/'))
+    try:
+        print(f"🚀 {url}: {args.users} users, concurrency {args.concurrency}, {args.duration:.0f}s per stage")
+        results = asyncio.run(run_levels(url, args))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+
+    if args.output:
+        report = {
+            'suite': 'load_test',
+            'schema': SCHEMA,
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'target': 'spawned api.py (memory backend)' if args.spawn else url,
+            'settings': {key: getattr(args, key) for key in
+                         ('users', 'duration', 'warmup', 'think_ms', 'import_rate', 'db_latency_ms', 'seed')},
+            'results': results,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
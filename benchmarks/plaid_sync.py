@@ -0,0 +1,118 @@
+"""End-to-end Plaid sync throughput against the local Plaid and Supabase stand-ins
+
+Rows go through the real TransactionService insert path (cache invalidation,
+change feed) into an in-memory FakeSupabase. The duplicate check is left out
+unless --dedupe is given: the stand-in answers it by scanning the user's rows,
+which Postgres serves from idx_transactions_user_date_amount, so it would make
+the rate quadratic in the history size.
+
+Usage:
+    python -m benchmarks.plaid_sync --transactions 5000 --latency-ms 20
+    python -m benchmarks.plaid_sync --transactions 1000 --dedupe       # include the stand-in's dedupe scan
+    python -m benchmarks.plaid_sync --host http://127.0.0.1:8100   # stand-in server
+        (start it with --history-days 30 so every row falls inside the sync window)
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.config import Config
+
+
+async def no_duplicate(*args) -> bool:
+    return False
+
+
+async def run(args) -> dict:
+    """Exchange a public token, then time a full sync of the linked item"""
+    # Point PlaidService at the stand-in before it reads Config
+    Config.PLAID_ENV = 'local'
+    Config.PLAID_HOST = args.host or ''
+    Config.PLAID_FAKE_TRANSACTIONS = args.transactions
+    Config.PLAID_FAKE_LATENCY_MS = args.latency_ms
+    Config.PLAID_FAKE_ERROR_RATE = args.error_rate
+    # sync_transactions pulls the last 30 days, so keep the whole history inside that window
+    Config.PLAID_FAKE_HISTORY_DAYS = 30
+    Config.PLAID_BACKOFF_BASE = 0.01
+
+    from src.database.supabase_standin import FakeSupabase
+    from src.database.transaction_service import TransactionService
+    from src.services.plaid_service import PlaidService
+
+    plaid_service = PlaidService()
+    
+    def transaction_service() -> TransactionService:
+        service = TransactionService()
+        service.supabase = FakeSupabase()
+        if not args.dedupe:
+            service.check_duplicate = no_duplicate  # Fresh database: nothing is a duplicate
+        return service
+    
+    sink = transaction_service()
+
+    start = time.perf_counter()
+    exchange = await plaid_service.exchange_public_token(f"public-local-{args.seed}")
+    exchange_seconds = time.perf_counter() - start
+    if not exchange:
+        raise SystemExit("Token exchange failed; is the stand-in reachable?")
+
+    start = time.perf_counter()
+    transactions = await plaid_service.get_transactions(
+        exchange['access_token'],
+        datetime.now() - timedelta(days=30),
+        datetime.now()
+    )
+    fetch_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    synced = await plaid_service.sync_transactions(exchange['access_token'], 'bench-user', sink)
+    sync_seconds = time.perf_counter() - start
+
+    # Per-user fan-out across several linked items
+    items = []
+    for i in range(args.items):
+        linked = await plaid_service.exchange_public_token(f"public-local-{args.seed}-{i}")
+        items.append({'item_id': linked['item_id'], 'access_token': linked['access_token']})
+    multi_sink = transaction_service()
+    multi_sink.supabase.seed('plaid_items', [{**item, 'user_id': 'bench-user'} for item in items])
+    start = time.perf_counter()
+    multi = await plaid_service.sync_user('bench-user', multi_sink)
+    multi_seconds = time.perf_counter() - start
+
+    return {
+        'exchange_ms': exchange_seconds * 1000,
+        'fetched_rows': len(transactions),
+        'fetch_rows_per_sec': len(transactions) / fetch_seconds if fetch_seconds else 0,
+        'synced_rows': synced,
+        'sync_seconds': sync_seconds,
+        'sync_rows_per_sec': synced / sync_seconds if sync_seconds else 0,
+        'multi_items': multi['items'],
+        'multi_synced_rows': multi['synced'],
+        'multi_rows_per_sec': multi['synced'] / multi_seconds if multi_seconds else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transactions", type=int, default=5000, help="transactions generated per item")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="stand-in latency per call")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="injected error probability per call")
+    parser.add_argument("--host", default="", help="URL of a running stand-in server (default: in-process)")
+    parser.add_argument("--items", type=int, default=4, help="linked items for the per-user fan-out")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--dedupe", action="store_true", help="include the stand-in's duplicate check (slow)")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    for name, value in results.items():
+        print(f"{name:>20}: {value:,.2f}" if isinstance(value, float) else f"{name:>20}: {value:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""TransactionService query plans before and after the index migrations
+
+Seeds a scratch schema in a local Postgres with the original single-column
+indexes, runs each TransactionService query shape under EXPLAIN ANALYZE,
+applies the index migrations (assets/sql/migrations up to 0005) with the
+migration runner and runs them again.
+
+Usage:
+    python -m benchmarks.query_plans --dsn postgresql://postgres@localhost:5432/postgres
+    python -m benchmarks.query_plans --users 200 --per-user 1500 --repeat 9 --keep
+
+Needs psycopg (pip install "psycopg[binary]"). The DSN defaults to
+$BENCH_DATABASE_URL. Everything lives in the bench_query_plans schema,
+which is dropped afterwards unless --keep is given.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+from pathlib import Path
+
+try:
+    import psycopg
+    PSYCOPG_AVAILABLE = True
+except ImportError:
+    PSYCOPG_AVAILABLE = False
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.database.migrate import migrate
+
+SCHEMA = "bench_query_plans"
+# Last of the migrations that add or drop transaction indexes
+INDEX_MIGRATIONS = "0005"
+
+# Same columns the app reads and writes, with the baseline indexes from
+# budgeting_and_transactions_schema.sql and plaid_items_and_RLS.sql
+BASELINE_SQL = f"""
+DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;
+CREATE SCHEMA {SCHEMA};
+SET search_path = {SCHEMA};
+
+CREATE TABLE plaid_items (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    access_token TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    institution_name TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    last_synced_at TIMESTAMP WITH TIME ZONE
+);
+CREATE INDEX idx_plaid_items_user_id ON plaid_items(user_id);
+
+CREATE TABLE transactions (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    account_id TEXT,
+    description TEXT,
+    amount DECIMAL(10, 2) NOT NULL,
+    amount_cents BIGINT GENERATED ALWAYS AS (ROUND(amount * 100)::BIGINT) STORED,
+    category VARCHAR(100),
+    transaction_date DATE NOT NULL,
+    transaction_type VARCHAR(20) CHECK (transaction_type IN ('income', 'expense')),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+CREATE INDEX idx_transactions_user_id ON transactions(user_id);
+CREATE INDEX idx_transactions_date ON transactions(transaction_date);
+"""
+
+# Separate statements: psycopg sends parameterized queries one at a time
+SEED_SQL = [
+    "SELECT setseed(%(seed)s)",
+    """
+INSERT INTO transactions (user_id, account_id, description, amount, category, transaction_type, transaction_date)
+SELECT
+    'user-' || u,
+    'acct-' || u || '-' || (n %% 3),
+    (ARRAY['Starbucks Coffee', 'Whole Foods Market', 'Shell Gas', 'Netflix', 'Amazon',
+           'Uber Trip', 'Target', 'Chipotle', 'Spotify', 'Payroll Deposit'])[1 + (n * 7 + u) %% 10]
+        || ' #' || (n %% 97),
+    ROUND((1 + random() * 250)::NUMERIC, 2),
+    (ARRAY['Food & Dining', 'Groceries', 'Transportation', 'Entertainment',
+           'Shopping', 'Bills & Utilities'])[1 + (n * 3 + u) %% 6],
+    CASE WHEN n %% 12 = 0 THEN 'income' ELSE 'expense' END,
+    CURRENT_DATE - ((n * 37 + u * 11) %% (365 * %(years)s))
+FROM generate_series(1, %(users)s) AS u, generate_series(1, %(per_user)s) AS n
+""",
+    """
+INSERT INTO plaid_items (user_id, access_token, item_id, institution_name)
+SELECT 'user-' || u, 'access-' || u || '-' || i, 'item-' || u || '-' || i, 'Bank ' || i
+FROM generate_series(1, %(users)s) AS u, generate_series(1, 2) AS i
+""",
+]
+
+
+def query_shapes(conn, user_id: str) -> list:
+    """(name, sql, params) for each query TransactionService sends through PostgREST"""
+    rows = conn.execute(
+        "SELECT transaction_date, id, amount_cents, description, account_id "
+        "FROM transactions WHERE user_id = %s ORDER BY transaction_date DESC, id DESC LIMIT 11",
+        (user_id,)
+    ).fetchall()
+    cursor_date, cursor_id = rows[-2][0], rows[-2][1]
+    dup_date, _, dup_cents, dup_description, account_id = rows[3]
+    month_start = cursor_date.replace(day=1)
+    year_start = cursor_date.replace(month=1, day=1)
+
+    return [
+        ("page: first", "SELECT * FROM transactions WHERE user_id = %(u)s "
+         "ORDER BY transaction_date DESC, id DESC LIMIT 11", {}),
+        ("page: after cursor", "SELECT * FROM transactions WHERE user_id = %(u)s "
+         "AND (transaction_date < %(d)s OR (transaction_date = %(d)s AND id < %(id)s)) "
+         "ORDER BY transaction_date DESC, id DESC LIMIT 11", {'d': cursor_date, 'id': cursor_id}),
+        ("page: type + year", "SELECT * FROM transactions WHERE user_id = %(u)s "
+         "AND transaction_type = 'expense' AND transaction_date >= %(y)s "
+         "ORDER BY transaction_date DESC, id DESC LIMIT 1001", {'y': year_start}),
+        ("page: category + month", "SELECT * FROM transactions WHERE user_id = %(u)s "
+         "AND category IN ('Food & Dining', 'Groceries') "
+         "AND transaction_date >= %(m)s AND transaction_date <= %(d)s "
+         "ORDER BY transaction_date DESC, id DESC LIMIT 101", {'m': month_start, 'd': cursor_date}),
+        ("page: account", "SELECT * FROM transactions WHERE user_id = %(u)s AND account_id = %(a)s "
+         "ORDER BY transaction_date DESC, id DESC LIMIT 11", {'a': account_id}),
+        ("month totals", "SELECT amount_cents, transaction_type, transaction_date FROM transactions "
+         "WHERE user_id = %(u)s AND transaction_date >= %(m)s "
+         "AND transaction_date < %(m)s::DATE + INTERVAL '1 month'", {'m': month_start}),
+        ("balance", "SELECT amount_cents, transaction_type FROM transactions "
+         "WHERE user_id = %(u)s", {}),
+        ("balance: account", "SELECT amount_cents, transaction_type FROM transactions "
+         "WHERE user_id = %(u)s AND account_id = %(a)s", {'a': account_id}),
+        ("check_duplicate", "SELECT id FROM transactions WHERE user_id = %(u)s "
+         "AND amount_cents = %(c)s AND description = %(desc)s AND transaction_date = %(d)s",
+         {'c': dup_cents, 'desc': dup_description, 'd': dup_date}),
+        ("plaid items", "SELECT item_id, access_token, institution_name, last_synced_at "
+         "FROM plaid_items WHERE user_id = %(u)s", {}),
+        ("mark item synced", "UPDATE plaid_items SET last_synced_at = NOW() "
+         "WHERE item_id = %(i)s", {'i': f"item-{user_id.split('-')[1]}-1"}),
+    ]
+
+
+def _scans(plan: dict) -> list:
+    """Scan nodes of a plan tree, e.g. 'Index Only Scan idx_transactions_user_date_id'"""
+    found = []
+    if plan["Node Type"].endswith("Scan"):
+        found.append(f"{plan['Node Type']} {plan.get('Index Name', '')}".strip())
+    for child in plan.get("Plans", []):
+        found.extend(_scans(child))
+    return found
+
+
+def explain(conn, sql: str, params: dict, repeat: int) -> dict:
+    """Median execution time over `repeat` EXPLAIN ANALYZE runs (writes are rolled back)"""
+    timings = []
+    plan = None
+    for _ in range(repeat):
+        with conn.transaction(force_rollback=True):
+            (result,) = conn.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", params).fetchone()
+        plan = result[0]
+        timings.append(plan["Execution Time"])
+    return {
+        'ms': statistics.median(timings),
+        'scans': ", ".join(_scans(plan["Plan"])),
+        'buffers': plan["Plan"].get("Shared Hit Blocks", 0) + plan["Plan"].get("Shared Read Blocks", 0),
+    }
+
+
+def run_shapes(conn, shapes: list, user_id: str, repeat: int) -> dict:
+    return {
+        name: explain(conn, sql, {'u': user_id, **params}, repeat)
+        for name, sql, params in shapes
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default=os.getenv("BENCH_DATABASE_URL", ""),
+                        help="Postgres connection string (default: $BENCH_DATABASE_URL)")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--per-user", type=int, default=2000, help="transactions per user")
+    parser.add_argument("--years", type=int, default=3, help="history spread over this many years")
+    parser.add_argument("--repeat", type=int, default=5, help="EXPLAIN ANALYZE runs per query (median reported)")
+    parser.add_argument("--seed", type=float, default=0.42)
+    parser.add_argument("--keep", action="store_true", help=f"keep the {SCHEMA} schema afterwards")
+    parser.add_argument("--plans", action="store_true", help="print the scan nodes of each plan")
+    args = parser.parse_args()
+
+    if not PSYCOPG_AVAILABLE:
+        raise SystemExit('❌ psycopg not installed: pip install "psycopg[binary]"')
+    if not args.dsn:
+        raise SystemExit("❌ Pass --dsn or set BENCH_DATABASE_URL")
+
+    with psycopg.connect(args.dsn, autocommit=True) as conn:
+        print(f"🌱 Seeding {args.users * args.per_user:,} transactions into {SCHEMA}...")
+        conn.execute(BASELINE_SQL)
+        params = {'seed': args.seed, 'users': args.users, 'per_user': args.per_user, 'years': args.years}
+        for statement in SEED_SQL:
+            conn.execute(statement, params)
+        # VACUUM sets the visibility map, without which index-only scans still visit the heap
+        conn.execute("VACUUM ANALYZE transactions")
+        conn.execute("VACUUM ANALYZE plaid_items")
+
+        user_id = f"user-{max(1, args.users // 2)}"
+        shapes = query_shapes(conn, user_id)
+        before = run_shapes(conn, shapes, user_id, args.repeat)
+
+        # schema_migrations lands in the scratch schema too (search_path)
+        migrate(conn, target=INDEX_MIGRATIONS)
+        conn.execute("VACUUM ANALYZE transactions")
+        conn.execute("VACUUM ANALYZE plaid_items")
+        after = run_shapes(conn, shapes, user_id, args.repeat)
+
+        if not args.keep:
+            conn.execute(f"DROP SCHEMA {SCHEMA} CASCADE")
+
+    print(f"\n{'query':<24}{'before ms':>11}{'after ms':>10}{'speedup':>9}{'buffers':>16}")
+    for name, _, _ in shapes:
+        b, a = before[name], after[name]
+        speedup = b['ms'] / a['ms'] if a['ms'] else float('inf')
+        print(f"{name:<24}{b['ms']:>11.3f}{a['ms']:>10.3f}{speedup:>8.1f}x"
+              f"{b['buffers']:>8,} → {a['buffers']:<6,}")
+        if args.plans:
+            print(f"    before: {b['scans']}\n    after:  {a['scans']}")
+
+
+if __name__ == "__main__":
+    main()
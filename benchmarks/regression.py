@@ -0,0 +1,222 @@
+"""Benchmark regression gate against baselines stored in benchmarks/baselines
+
+Usage:
+    python -m benchmarks.regression check                 # run hot_paths, compare, exit 1 on regression
+    python -m benchmarks.regression check --threshold 0.2 --output run.json
+    python -m benchmarks.regression update                # run and record a new baseline version
+    python -m benchmarks.regression compare benchmarks/baselines/hot_paths.json run.json
+
+The baseline keeps the run settings (sizes, repeats), so check reruns the same
+benchmarks the same way; regenerate it on the machine that runs the gate
+(update), and commit it with the change that moved the numbers.
+
+Noise: each benchmark's spread is estimated from its samples (1.4826 x MAD /
+median, a robust relative standard deviation). A benchmark only regresses when
+its median slows down by more than both the threshold and three times the
+combined noise of baseline and run, so a jittery benchmark needs a bigger
+change to trip the gate than a steady one. Per-benchmark thresholds can be
+set in the baseline's "thresholds" (e.g. {"default": 0.15,
+"page_build_budgets[categories=7]": 0.3}); update keeps them.
+
+A benchmark that errors fails the gate even if it also errored in the
+baseline, and update refuses to record a baseline with errors in it
+(--allow-errors overrides). A benchmark that cannot run in this environment
+(e.g. page_build on flet 0.80+) reports itself skipped instead: it is listed
+but passes the gate, and update records it as skipped.
+
+Load test results (benchmarks.load_test --output) compare the same way, on
+p95 latency.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+from argparse import Namespace
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+DEFAULT_THRESHOLD = 0.15
+NOISE_SIGMAS = 3
+DEFAULT_SETTINGS = {'quick': True, 'repeat': 7, 'only': ['csv_parse', 'csv_upload', 'summary', 'plaid_transform', 'page_build']}
+
+
+def baseline_path(suite: str) -> str:
+    return os.path.join(BASELINE_DIR, f"{suite}.json")
+
+
+def load(path: str) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def metric(result: Dict) -> Tuple[Optional[float], List[float]]:
+    """(value where lower is better, samples) for one result; (None, []) if it has none"""
+    if 'seconds' in result:
+        return result['seconds']['median'], result['seconds'].get('samples', [])
+    if 'latency_ms' in result:
+        return result['latency_ms']['p95'] / 1000, []
+    return None, []
+
+
+def relative_noise(samples: List[float]) -> float:
+    """Robust relative standard deviation; 0 when there are too few samples to tell"""
+    if len(samples) < 3:
+        return 0.0
+    median = statistics.median(samples)
+    if median <= 0:
+        return 0.0
+    mad = statistics.median(abs(sample - median) for sample in samples)
+    return 1.4826 * mad / median
+
+
+def compare(baseline: Dict, run: Dict, threshold: Optional[float] = None) -> List[Dict]:
+    """One verdict per benchmark: ok, regression, improvement, new, missing, skipped or error"""
+    thresholds = baseline.get('thresholds', {})
+    default = threshold if threshold is not None else thresholds.get('default', DEFAULT_THRESHOLD)
+    before = {result['id']: result for result in baseline.get('results', [])}
+    after = {result['id']: result for result in run.get('results', [])}
+
+    verdicts = []
+    for result_id in list(before) + [result_id for result_id in after if result_id not in before]:
+        old, new = before.get(result_id), after.get(result_id)
+        verdict = {'id': result_id, 'baseline': None, 'current': None, 'change': None, 'tolerance': None}
+        if new is None:
+            verdict['status'] = 'missing'
+        elif 'error' in new:
+            # Also when the baseline errored: a broken benchmark guards nothing
+            verdict['status'] = 'error'
+            verdict['detail'] = new['error']
+        elif 'skipped' in new:
+            verdict['status'] = 'skipped'
+            verdict['detail'] = new['skipped']
+        elif old is None or 'error' in old or 'skipped' in old:
+            verdict['status'] = 'new'
+            verdict['current'] = metric(new)[0]
+        else:
+            base, base_samples = metric(old)
+            current, samples = metric(new)
+            if base is None or current is None:
+                verdict['status'] = 'ok'  # Summary rows without a timing
+                verdicts.append(verdict)
+                continue
+            noise = (relative_noise(base_samples) ** 2 + relative_noise(samples) ** 2) ** 0.5
+            tolerance = max(thresholds.get(result_id, default), NOISE_SIGMAS * noise)
+            change = current / base - 1 if base > 0 else 0.0
+            verdict.update(baseline=base, current=current, change=change, tolerance=tolerance)
+            if change > tolerance:
+                verdict['status'] = 'regression'
+            elif change < -tolerance:
+                verdict['status'] = 'improvement'
+            else:
+                verdict['status'] = 'ok'
+        verdicts.append(verdict)
+    return verdicts
+
+
+def report(verdicts: List[Dict], baseline: Dict, run: Dict) -> bool:
+    """Print the comparison; True when the gate passes"""
+    for key in ('platform', 'python', 'cpu_count'):
+        if baseline.get(key) != run.get(key):
+            print(f"⚠️ Baseline {key} differs ({baseline.get(key)} vs {run.get(key)}): numbers may not be comparable")
+
+    icons = {'ok': '  ', 'improvement': '✅', 'regression': '❌', 'error': '❌', 'new': '🆕', 'missing': '⚠️',
+             'skipped': '⏭️'}
+    print(f"\n{'benchmark':<46}{'baseline':>12}{'current':>12}{'change':>9}{'allowed':>9}")
+    for verdict in verdicts:
+        if verdict['change'] is not None:
+            numbers = (f"{verdict['baseline'] * 1000:>9.2f} ms{verdict['current'] * 1000:>9.2f} ms"
+                       f"{verdict['change']:>+9.1%}{verdict['tolerance']:>9.1%}")
+        elif verdict['current'] is not None:
+            numbers = f"{'':>12}{verdict['current'] * 1000:>9.2f} ms"
+        else:
+            numbers = f"  {verdict.get('detail', verdict['status'])}" if verdict['status'] != 'ok' else ''
+        print(f"{icons[verdict['status']]} {verdict['id']:<44}{numbers}")
+
+    failed = [verdict for verdict in verdicts if verdict['status'] in ('regression', 'error')]
+    counts = {status: sum(1 for verdict in verdicts if verdict['status'] == status) for status in icons}
+    print(f"\n{counts['regression']} regressions, {counts['error']} errors, {counts['improvement']} improvements, "
+          f"{counts['new']} new, {counts['missing']} missing, {counts['skipped']} skipped (baseline v{baseline.get('baseline_version', '?')})")
+    return not failed
+
+
+def run_hot_paths(settings: Dict) -> Dict:
+    from benchmarks import hot_paths
+    from src.utils.config import Config
+
+    Config.LOG_LEVEL = 'WARNING'
+    Config.TRACE_EXPORTER = 'none'
+    return hot_paths.run_suite(Namespace(**settings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    check = commands.add_parser('check', help="run the benchmarks and compare with the baseline")
+    check.add_argument("--threshold", type=float, help=f"allowed slowdown (default from the baseline, else {DEFAULT_THRESHOLD})")
+    check.add_argument("--output", help="also write this run's results here")
+    update = commands.add_parser('update', help="run the benchmarks and store them as the new baseline")
+    update.add_argument("--full", action="store_true", help="full sizes instead of --quick (slow)")
+    update.add_argument("--repeat", type=int, help=f"runs per benchmark (default {DEFAULT_SETTINGS['repeat']})")
+    update.add_argument("--allow-errors", action="store_true", help="write the baseline even if some benchmarks failed")
+    diff = commands.add_parser('compare', help="compare two result files")
+    diff.add_argument("baseline")
+    diff.add_argument("current")
+    diff.add_argument("--threshold", type=float)
+    args = parser.parse_args()
+
+    path = baseline_path('hot_paths')
+    if args.command == 'compare':
+        baseline, run = load(args.baseline), load(args.current)
+        if baseline is None or run is None:
+            raise SystemExit("❌ Result file not found")
+        sys.exit(0 if report(compare(baseline, run, args.threshold), baseline, run) else 1)
+
+    baseline = load(path)
+    if args.command == 'check':
+        if baseline is None:
+            print(f"❌ No baseline at {path}; run `python -m benchmarks.regression update` first")
+            sys.exit(2)
+        run = run_hot_paths(baseline.get('settings', DEFAULT_SETTINGS))
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(run, f, indent=2)
+        sys.exit(0 if report(compare(baseline, run, args.threshold), baseline, run) else 1)
+
+    settings = dict(baseline.get('settings', DEFAULT_SETTINGS) if baseline else DEFAULT_SETTINGS)
+    if args.full:
+        settings['quick'] = False
+    if args.repeat:
+        settings['repeat'] = args.repeat
+    run = run_hot_paths(settings)
+    for result in run['results']:
+        if 'skipped' in result:
+            print(f"⏭️ {result['id']}: {result['skipped']}")
+    errors = [result for result in run['results'] if 'error' in result]
+    for result in errors:
+        print(f"❌ {result['id']}: {result['error']}")
+    if errors and not args.allow_errors:
+        print(f"❌ Baseline not written: {len(errors)} benchmarks failed (--allow-errors to record them anyway)")
+        sys.exit(1)
+    run.update({
+        'baseline_version': (baseline or {}).get('baseline_version', 0) + 1,
+        'updated_at': datetime.now().isoformat(timespec='seconds'),
+        'settings': settings,
+        'thresholds': (baseline or {}).get('thresholds', {'default': DEFAULT_THRESHOLD}),
+    })
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(run, f, indent=2)
+        f.write('\n')
+    print(f"💾 Baseline v{run['baseline_version']} written to {path}")
+
+
+if __name__ == "__main__":
+    main()
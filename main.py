@@ -2,6 +2,7 @@
 
 import flet as ft
 from src.utils.config import Config
+from src.utils import tracing
 from src.auth.auth_service import AuthService
 from src.ui.pages.login import LoginPage
 from src.ui.pages.signup import SignupPage
@@ -98,6 +99,7 @@ class BudgetBuddyApp:
 
 def main():
     """Application entry point"""
+    tracing.configure('budget-buddy-ui')
     app = BudgetBuddyApp()
     ft.app(
         target=app.main, 
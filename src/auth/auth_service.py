@@ -1,8 +1,9 @@
 """Authentication service using Supabase"""
 
 from typing import Optional, Dict, Any
-from supabase import create_client, Client
+from supabase import Client
 from src.utils.config import Config
+from src.database.client import create_supabase_client
 
 
 class AuthService:
@@ -17,11 +18,11 @@ class AuthService:
         """Initialize Supabase client"""
         if Config.is_configured():
             try:
-                self.supabase = create_client(
-                    Config.SUPABASE_URL,
-                    Config.SUPABASE_KEY
-                )
-                print("Supabase connected successfully!")
+                self.supabase = create_supabase_client()
+                if Config.SUPABASE_BACKEND.lower() == 'memory':
+                    print("Using the in-memory Supabase stand-in")
+                else:
+                    print("Supabase connected successfully!")
             except Exception as e:
                 print(f"Failed to initialize Supabase: {e}")
         else:
@@ -0,0 +1,71 @@
+"""Transaction partition maintenance and archival job
+
+Keeps yearly partitions created ahead of time and moves transactions older
+than TRANSACTION_ARCHIVE_YEARS into the compressed transactions_archive
+table (see migrations 0008_transactions_partitioning.sql and
+0009_transactions_archive.sql). Run it daily, e.g. from cron:
+
+    python -m src.database.archive_job
+    python -m src.database.archive_job --dry-run
+"""
+
+import argparse
+from datetime import date, datetime
+from typing import Dict, Optional
+from ..utils.config import Config
+
+
+def archive_cutoff(today: Optional[date] = None) -> Optional[date]:
+    """Transactions dated before this are archived (None when archiving is off)"""
+    if Config.TRANSACTION_ARCHIVE_YEARS <= 0:
+        return None
+    today = today or datetime.now().date()
+    return date(today.year - Config.TRANSACTION_ARCHIVE_YEARS, 1, 1)
+
+
+def run(supabase, dry_run: bool = False) -> Dict:
+    """Create next year's partition and archive everything before the cutoff"""
+    year = datetime.now().year
+    cutoff = archive_cutoff()
+    result = {'partitions_created': 0, 'archived': 0, 'cutoff': cutoff.isoformat() if cutoff else None}
+
+    if dry_run:
+        if cutoff:
+            response = supabase.table('transactions')\
+                .select('id', count='exact')\
+                .lt('transaction_date', cutoff.isoformat())\
+                .limit(1)\
+                .execute()
+            result['archived'] = response.count or 0
+        print(f"🔍 Dry run: would archive {result['archived']} transactions before {result['cutoff']}")
+        return result
+
+    response = supabase.rpc('create_transaction_partitions', {
+        'p_from_year': year,
+        'p_to_year': year + 1
+    }).execute()
+    result['partitions_created'] = response.data or 0
+
+    if cutoff:
+        response = supabase.rpc('archive_transactions', {'p_cutoff': cutoff.isoformat()}).execute()
+        result['archived'] = response.data or 0
+
+    print(f"✅ Created {result['partitions_created']} partition(s), "
+          f"archived {result['archived']} transactions before {result['cutoff']}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="only count what would be archived")
+    args = parser.parse_args()
+
+    if not Config.is_configured():
+        raise SystemExit("❌ Supabase not configured")
+
+    from .client import create_supabase_client
+    run(create_supabase_client(service_role=True), dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""Read-through cache for TransactionService queries"""
+
+import asyncio
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+from ..utils.config import Config
+from ..utils.metrics import CACHE_REQUESTS
+from ..utils.tracing import set_attribute
+from ..utils.log import get_logger
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+log = get_logger('cache')
+_MISSING = object()
+
+
+class CacheBackend(ABC):
+    """Storage behind ReadThroughCache: TTL'd values plus per-user version counters
+
+    `epoch` identifies the lifetime of the version counters, so a version
+    number is never mistaken for one from before a restart or flush.
+    Backends that do network I/O set `blocking`, and ReadThroughCache calls
+    them from a worker thread instead of the event loop. `shared` backends
+    hold one set of versions for every API worker.
+    """
+
+    epoch = '0'
+    blocking = False
+    shared = False
+
+    @abstractmethod
+    def get(self, key: str) -> Any:
+        """Return the cached value or _MISSING"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_version(self, user_id: str) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def bump_version(self, user_id: str) -> int:
+        raise NotImplementedError
+
+    def get_validator(self, user_id: str) -> str:
+        """The user's version qualified by the epoch it belongs to"""
+        return f"{self.epoch}.{self.get_version(user_id)}"
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU cache with per-entry TTL"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        # Versions live outside the LRU so eviction can never roll a user back
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.epoch = format(int(time.time() * 1000), 'x')
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_version(self, user_id: str) -> int:
+        return self._versions.get(user_id, 0)
+
+    def bump_version(self, user_id: str) -> int:
+        with self._lock:
+            version = self._versions.get(user_id, 0) + 1
+            self._versions[user_id] = version
+            return version
+
+
+class RedisCache(CacheBackend):
+    """Redis-backed cache, shared by every API worker
+
+    Values are stored as JSON, never pickled: anyone able to write to a shared
+    Redis could otherwise run code in every worker. They come back as JSON
+    types (dates as ISO strings), as they would from PostgREST.
+    """
+
+    blocking = True
+    shared = True
+
+    def __init__(self, url: str, prefix: str = 'budgetbuddy:'):
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    @property
+    def epoch(self) -> str:
+        """Set by the first worker to ask; a flushed Redis gets a new one
+
+        Read from Redis every time: a worker that remembered it would keep
+        pairing the old epoch with the restarted version counters.
+        """
+        return self._read(f"{self.prefix}epoch")[0]
+
+    def _read(self, *keys: str) -> List[Any]:
+        """MGET the epoch key first plus `keys`, creating the epoch if it is missing"""
+        epoch_key = f"{self.prefix}epoch"
+        values = self.client.mget(epoch_key, *keys)
+        while values[0] is None:
+            self.client.set(epoch_key, format(int(time.time() * 1000), 'x'), nx=True)
+            values = self.client.mget(epoch_key, *keys)
+        return [values[0].decode()] + values[1:]
+
+    def get(self, key: str) -> Any:
+        raw = self.client.get(self.prefix + key)
+        return _MISSING if raw is None else _loads(raw)
+
+    def set(self, key: str, value: Any, ttl: float):
+        self.client.set(self.prefix + key, _dumps(value), px=int(ttl * 1000))
+
+    def get_version(self, user_id: str) -> int:
+        raw = self.client.get(f"{self.prefix}version:{user_id}")
+        return int(raw) if raw is not None else 0
+
+    def bump_version(self, user_id: str) -> int:
+        return int(self.client.incr(f"{self.prefix}version:{user_id}"))
+
+    def get_validator(self, user_id: str) -> str:
+        # One round trip, so the epoch and version always come from the same lifetime
+        epoch, raw = self._read(f"{self.prefix}version:{user_id}")
+        return f"{epoch}.{int(raw) if raw is not None else 0}"
+
+
+class ReadThroughCache:
+    """Caches per-user reads, keyed by user, data version and query parameters
+
+    Writes bump the user's version instead of deleting keys, so every entry
+    computed before the write becomes unreachable at once (old entries simply
+    age out of the LRU / TTL).
+    """
+
+    def __init__(self, backend: Optional[CacheBackend], ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def version(self, user_id: str) -> int:
+        """Current data version for a user (0 when caching is disabled)"""
+        if not self.enabled:
+            return 0
+        return self.backend.get_version(user_id)
+
+    def validator(self, user_id: str) -> Optional[str]:
+        """Token that changes whenever the user's data does
+
+        None unless the backend is shared: an in-process version only sees the
+        writes this worker handled, so another worker's write would go unnoticed.
+        """
+        if not self.enabled or not self.backend.shared:
+            return None
+        return self.backend.get_validator(user_id)
+
+    def invalidate_user(self, user_id: str):
+        """Make every cached read for this user stale"""
+        if self.enabled:
+            self.backend.bump_version(user_id)
+
+    def _key(self, user_id: str, name: str, params: Tuple[Hashable, ...]) -> str:
+        return f"{name}:{user_id}:v{self.version(user_id)}:{json.dumps(params, default=str)}"
+
+    async def get_or_load(self, user_id: str, name: str, params: Tuple[Hashable, ...],
+                          loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached result for (user, name, params) or load and store it"""
+        if not self.enabled:
+            return await loader()
+
+        key, value = await self._call(self._lookup, user_id, name, params)
+        if value is not _MISSING:
+            self.hits += 1
+            CACHE_REQUESTS.labels(query=name, result='hit').inc()
+            set_attribute('cache.hit', True)
+            return value
+
+        self.misses += 1
+        CACHE_REQUESTS.labels(query=name, result='miss').inc()
+        set_attribute('cache.hit', False)
+        value = await loader()
+        await self._call(self.backend.set, key, value, self.ttl)
+        return value
+
+    def _lookup(self, user_id: str, name: str, params: Tuple[Hashable, ...]) -> Tuple[str, Any]:
+        key = self._key(user_id, name, params)
+        return key, self.backend.get(key)
+
+    async def _call(self, function: Callable, *args) -> Any:
+        """Run a backend call, off the event loop when the backend does network I/O"""
+        if self.backend.blocking:
+            return await asyncio.to_thread(function, *args)
+        return function(*args)
+
+
+def _dumps(value: Any) -> bytes:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value, default=str)
+    return json.dumps(value, default=str, separators=(',', ':')).encode('utf-8')
+
+
+def _loads(raw: bytes) -> Any:
+    return orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+
+
+def create_cache() -> ReadThroughCache:
+    """Build the read-through cache selected by CACHE_BACKEND"""
+    backend_name = Config.CACHE_BACKEND.lower()
+    backend: Optional[CacheBackend] = None
+
+    if backend_name == 'redis':
+        if REDIS_AVAILABLE and Config.REDIS_URL:
+            backend = RedisCache(Config.REDIS_URL)
+        else:
+            log.warning("⚠️ Redis cache requested but redis/REDIS_URL unavailable, using in-process cache")
+            backend = MemoryCache(Config.CACHE_MAX_ENTRIES)
+    elif backend_name == 'memory':
+        backend = MemoryCache(Config.CACHE_MAX_ENTRIES)
+
+    return ReadThroughCache(backend, Config.CACHE_TTL)
@@ -0,0 +1,206 @@
+"""Per-user transaction change events for the realtime feed (GET /api/changes)
+
+Events are small dicts:
+
+    {'type': 'added',   'row': {...}}   # a transaction was inserted
+    {'type': 'removed', 'row': {...}}   # deleted (an update is removed + added)
+    {'type': 'reset'}                   # events were missed; refetch everything
+    {'type': 'ready'}                   # sent once the stream is live
+
+With CHANGE_FEED_BACKEND=memory, TransactionService reports its own writes.
+With CHANGE_FEED_BACKEND=postgres, the trigger from
+assets/sql/migrations/0010_transaction_change_notify.sql reports every write
+(other API workers, Plaid sync, SQL console) over LISTEN/NOTIFY.
+"""
+
+import asyncio
+import itertools
+import json
+import time
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, Dict, Optional, Set, Tuple
+from ..utils.config import Config
+from ..utils.log import get_logger
+
+try:
+    import psycopg
+    PSYCOPG_AVAILABLE = True
+except ImportError:
+    PSYCOPG_AVAILABLE = False
+
+
+log = get_logger('change_feed')
+CHANNEL = 'transaction_changes'
+# Fields a client needs to update its lists and totals
+ROW_FIELDS = ('id', 'transaction_date', 'amount_cents', 'transaction_type', 'category', 'description', 'account_id')
+
+
+def compact_row(row: Dict) -> Dict:
+    """The subset of a transaction row carried in change events"""
+    compact = {field: row.get(field) for field in ROW_FIELDS}
+    if compact['transaction_date'] is not None:
+        compact['transaction_date'] = str(compact['transaction_date'])[:10]
+    return compact
+
+
+class Subscription:
+    """One open stream: replayed backlog first, then live events"""
+
+    def __init__(self, feed: 'ChangeFeed', user_id: str, max_queue: int):
+        self.feed = feed
+        self.user_id = user_id
+        self.queue: "asyncio.Queue[Tuple[str, Dict]]" = asyncio.Queue(max_queue)
+
+    def push(self, event_id: str, event: Dict):
+        try:
+            self.queue.put_nowait((event_id, event))
+        except asyncio.QueueFull:
+            # Too slow to keep up: drop what is queued and make the client resync
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait((event_id, {'type': 'reset'}))
+
+    async def events(self, last_event_id: Optional[str] = None,
+                     heartbeat: float = 15.0) -> AsyncIterator[Tuple[str, Optional[Dict]]]:
+        """Yield (event_id, event); (None, None) every `heartbeat` seconds of silence"""
+        if last_event_id:
+            backlog = self.feed.replay(self.user_id, last_event_id)
+            if backlog is None:
+                yield self.feed.latest_id(self.user_id), {'type': 'reset'}
+            else:
+                for item in backlog:
+                    yield item
+        ready_id = self.feed.latest_id(self.user_id)
+        yield ready_id, {'type': 'ready'}
+
+        # Events published between subscribe() and the replay are queued as well
+        seen = int(ready_id.rpartition('-')[2])
+        while True:
+            try:
+                event_id, event = await asyncio.wait_for(self.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield None, None
+                continue
+            if int(event_id.rpartition('-')[2]) > seen or event['type'] == 'reset':
+                yield event_id, event
+
+    def close(self):
+        self.feed._unsubscribe(self)
+
+
+class ChangeFeed:
+    """In-process fan-out of per-user change events
+
+    Event ids are "<epoch>-<n>" with n counting up per user. The last `backlog`
+    events per user are kept, so a client reconnecting with Last-Event-ID gets
+    what it missed; an id from another process lifetime (different epoch) or
+    older than the backlog gets a reset instead. Call publish() from the event loop.
+    """
+
+    def __init__(self, backend: str = 'memory', backlog: int = 256, max_queue: int = 1000):
+        self.backend = backend
+        self.backlog = backlog
+        self.max_queue = max_queue
+        self.epoch = format(int(time.time() * 1000), 'x')
+        self._counters: Dict[str, 'itertools.count'] = {}
+        self._latest: Dict[str, int] = {}
+        self._history: Dict[str, Deque[Tuple[int, Dict]]] = {}
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        # Called with the user id of every write relayed from Postgres
+        self.on_external_write: Optional[Callable[[str], None]] = None
+
+    @property
+    def reports_local_writes(self) -> bool:
+        """False when the database reports changes itself (postgres backend)"""
+        return self.backend != 'postgres'
+
+    def latest_id(self, user_id: str) -> str:
+        return f"{self.epoch}-{self._latest.get(user_id, 0)}"
+
+    def publish(self, user_id: str, event: Dict) -> str:
+        """Record an event for a user and push it to their open streams"""
+        counter = self._counters.setdefault(user_id, itertools.count(1))
+        number = next(counter)
+        self._latest[user_id] = number
+        self._history.setdefault(user_id, deque(maxlen=self.backlog)).append((number, event))
+        event_id = f"{self.epoch}-{number}"
+        for subscription in list(self._subscribers.get(user_id, ())):
+            subscription.push(event_id, event)
+        return event_id
+
+    def on_write(self, user_id: str, event_type: str, row: Dict):
+        """Called by TransactionService after a write (ignored with the postgres backend)"""
+        if self.reports_local_writes:
+            self.publish(user_id, {'type': event_type, 'row': compact_row(row)})
+
+    def replay(self, user_id: str, last_event_id: str) -> Optional[list]:
+        """Events after last_event_id, or None when they are no longer available"""
+        epoch, _, number = last_event_id.partition('-')
+        if epoch != self.epoch or not number.isdigit():
+            return None
+        after = int(number)
+        history = self._history.get(user_id, ())
+        if after >= self._latest.get(user_id, 0):
+            return []
+        if not history or history[0][0] > after + 1:
+            return None
+        return [(f"{self.epoch}-{n}", event) for n, event in history if n > after]
+
+    def subscribe(self, user_id: str) -> Subscription:
+        subscription = Subscription(self, user_id, self.max_queue)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.user_id]
+
+    def reset_all(self):
+        """Tell every open stream it may have missed events"""
+        for user_id in list(self._subscribers):
+            self.publish(user_id, {'type': 'reset'})
+
+    async def listen(self, dsn: str, retry_delay: float = 1.0, max_delay: float = 30.0):
+        """Relay NOTIFY payloads from Postgres until cancelled, reconnecting on errors"""
+        delay = retry_delay
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(dsn, autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {CHANNEL}")
+                    log.info("📡 Listening for transaction changes", channel=CHANNEL)
+                    # Anything written while we were not listening is lost
+                    self.reset_all()
+                    delay = retry_delay
+                    async for notify in conn.notifies():
+                        self._relay(notify.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("⚠️ Change feed listener error, reconnecting", error=str(e), retry_in=delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, max_delay)
+
+    def _relay(self, payload: str):
+        try:
+            message = json.loads(payload)
+            user_id = str(message['user_id'])
+            event = {'type': message['type'], 'row': compact_row(message['row'])}
+        except (ValueError, KeyError, TypeError) as e:
+            log.warning("⚠️ Ignoring malformed change notification", error=str(e))
+            return
+        # Before publishing, so clients refetching on the event never get the old data back
+        if self.on_external_write:
+            self.on_external_write(user_id)
+        self.publish(user_id, event)
+
+
+def create_change_feed() -> ChangeFeed:
+    """Build the change feed selected by CHANGE_FEED_BACKEND"""
+    backend = Config.CHANGE_FEED_BACKEND.lower()
+    if backend == 'postgres' and not (PSYCOPG_AVAILABLE and Config.DATABASE_URL):
+        log.warning("⚠️ Postgres change feed requested but psycopg/DATABASE_URL unavailable, reporting local writes only")
+        backend = 'memory'
+    return ChangeFeed(backend, Config.CHANGE_FEED_BACKLOG)
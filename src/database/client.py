@@ -0,0 +1,23 @@
+"""Supabase client selected by SUPABASE_BACKEND (remote or memory)"""
+
+from typing import Optional
+from ..utils.config import Config
+
+
+def create_supabase_client(service_role: bool = False):
+    """supabase.Client for SUPABASE_URL, the shared in-memory stand-in, or None if not configured
+
+    service_role uses SUPABASE_SERVICE_KEY (bypasses RLS) when it is set.
+    """
+    backend = Config.SUPABASE_BACKEND.lower()
+    if backend == 'memory':
+        from .supabase_standin import shared
+        return shared()
+    if backend != 'remote':
+        print(f"⚠️ Unknown SUPABASE_BACKEND '{Config.SUPABASE_BACKEND}', using remote")
+    if not (Config.SUPABASE_URL and Config.SUPABASE_KEY):
+        return None
+
+    from supabase import create_client
+    key: Optional[str] = Config.SUPABASE_SERVICE_KEY if service_role and Config.SUPABASE_SERVICE_KEY else Config.SUPABASE_KEY
+    return create_client(Config.SUPABASE_URL, key)
@@ -0,0 +1,346 @@
+"""Versioned SQL migrations for Budget Buddy
+
+Migrations live in assets/sql/migrations as NNNN_description.sql, are applied
+in version order and recorded in schema_migrations. Each one runs in a single
+transaction unless its first line is
+
+    -- migrate: no-transaction
+
+in which case its statements run one at a time outside a transaction, as
+CREATE/DROP INDEX CONCURRENTLY requires. Such migrations must be safe to re-run
+(IF NOT EXISTS / IF EXISTS). Concurrent index builds on a partitioned table are
+split into one concurrent build per partition, attached to the parent index.
+
+    python -m src.database.migrate                # apply pending migrations
+    python -m src.database.migrate status
+    python -m src.database.migrate --dry-run      # run pending migrations, then roll back
+    python -m src.database.migrate --dsn postgresql://postgres@localhost:5432/postgres
+
+A dry run applies the whole pending plan in one transaction and rolls it back
+at the end, so each migration sees the ones before it. No-transaction
+migrations cannot be rolled back and are skipped (and reported); later
+migrations run without them. Dry runs still take table locks, so point them
+at a local copy rather than production.
+The scripts directly under assets/sql predate the runner and are applied by
+hand, before the migrations, when setting up a new project.
+"""
+
+import argparse
+import hashlib
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+try:
+    import psycopg
+    PSYCOPG_AVAILABLE = True
+except ImportError:
+    PSYCOPG_AVAILABLE = False
+
+from ..utils.config import Config
+
+MIGRATIONS_DIR = Config.ASSETS_DIR / "sql" / "migrations"
+NO_TRANSACTION = "-- migrate: no-transaction"
+# pg_advisory_lock key so two runners never apply migrations at the same time
+LOCK_KEY = 20_261_039
+
+TRACKING_SQL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    checksum TEXT NOT NULL,
+    duration_ms INTEGER,
+    applied_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+)
+"""
+
+FILENAME = re.compile(r"^(\d+)_(\w+)\.sql$")
+CREATE_CONCURRENTLY = re.compile(
+    r"^CREATE\s+(UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)\s+ON\s+(?:ONLY\s+)?(\w+)\s*(.*)$",
+    re.IGNORECASE | re.DOTALL
+)
+DROP_CONCURRENTLY = re.compile(r"^DROP\s+INDEX\s+CONCURRENTLY\s+(?:IF\s+EXISTS\s+)?(\w+)", re.IGNORECASE)
+CONCURRENTLY = re.compile(r"\bCONCURRENTLY\s+", re.IGNORECASE)
+
+
+def load_migrations(directory: Path = MIGRATIONS_DIR) -> List[Dict]:
+    """Migration files in version order"""
+    migrations = []
+    seen = set()
+    for path in sorted(Path(directory).glob("*.sql")):
+        match = FILENAME.match(path.name)
+        if not match:
+            raise ValueError(f"Migration file name must look like 0001_description.sql: {path.name}")
+        version, name = match.groups()
+        if version in seen:
+            raise ValueError(f"Duplicate migration version {version}")
+        seen.add(version)
+        sql = path.read_text()
+        migrations.append({
+            'version': version,
+            'name': name,
+            'sql': sql,
+            'checksum': hashlib.sha256(sql.encode()).hexdigest(),
+            'transactional': not sql.lstrip().lower().startswith(NO_TRANSACTION),
+        })
+    return migrations
+
+
+def split_statements(sql: str) -> List[str]:
+    """Split a script on top-level semicolons, dropping comments
+
+    Quotes, quoted identifiers and dollar-quoted bodies ($$ ... $$) are kept intact.
+    """
+    statements = []
+    current = []
+    i, length = 0, len(sql)
+    while i < length:
+        char = sql[i]
+        if sql.startswith("--", i):
+            end = sql.find("\n", i)
+            i = length if end == -1 else end
+            continue
+        if sql.startswith("/*", i):
+            end = sql.find("*/", i + 2)
+            i = length if end == -1 else end + 2
+            continue
+        if char in ("'", '"'):
+            end = i + 1
+            while end < length:
+                if sql[end] == char:
+                    if sql[end + 1:end + 2] == char:  # doubled quote escape
+                        end += 2
+                        continue
+                    break
+                end += 1
+            current.append(sql[i:end + 1])
+            i = end + 1
+            continue
+        if char == "$":
+            tag = re.match(r"\$(\w*)\$", sql[i:])
+            if tag:
+                end = sql.find(tag.group(0), i + len(tag.group(0)))
+                end = length if end == -1 else end + len(tag.group(0))
+                current.append(sql[i:end])
+                i = end
+                continue
+        if char == ";":
+            statement = "".join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+        else:
+            current.append(char)
+        i += 1
+    statement = "".join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
+
+
+def _relkind(conn, name: str) -> Optional[str]:
+    row = conn.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (name,)).fetchone()
+    return row[0] if row else None
+
+
+def _expand_statement(conn, statement: str) -> List[str]:
+    """Rewrite concurrent index DDL that Postgres cannot run concurrently on partitioned tables"""
+    create = CREATE_CONCURRENTLY.match(statement)
+    if create and _relkind(conn, create.group(3)) == 'p':
+        unique, name, table, definition = create.groups()
+        if _is_valid_index(conn, name):
+            return []
+        unique = unique or ""
+        partitions = [row[0] for row in conn.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(%s) ORDER BY c.relname",
+            (table,)
+        ).fetchall()]
+        # The parent index is created empty and invalid (instant), each partition is
+        # built concurrently, and the parent becomes valid once all are attached
+        statements = [f"CREATE {unique}INDEX IF NOT EXISTS {name} ON ONLY {table} {definition}"]
+        for partition in partitions:
+            child = f"{partition}_{name.removeprefix('idx_')}"[:63]
+            statements.append(f"CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {child} ON {partition} {definition}")
+            statements.append(f"ALTER INDEX {name} ATTACH PARTITION {child}")
+        return statements
+
+    drop = DROP_CONCURRENTLY.match(statement)
+    if drop and _relkind(conn, drop.group(1)) == 'I':
+        # Partitioned indexes cannot be dropped concurrently; lock_timeout bounds the wait
+        return [CONCURRENTLY.sub("", statement, count=1)]
+
+    return [statement]
+
+
+def _is_valid_index(conn, name: str) -> bool:
+    row = conn.execute("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)", (name,)).fetchone()
+    return bool(row and row[0])
+
+
+def _drop_invalid_index(conn, name: str):
+    """Remove what a failed CREATE INDEX CONCURRENTLY leaves behind so IF NOT EXISTS retries it"""
+    invalid = conn.execute(
+        "SELECT 1 FROM pg_index x JOIN pg_class c ON c.oid = x.indexrelid "
+        "WHERE c.oid = to_regclass(%s) AND c.relkind = 'i' AND NOT x.indisvalid",
+        (name,)
+    ).fetchone()
+    if invalid:
+        print(f"🧹 Dropping invalid index {name} left by an interrupted build")
+        conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def applied_migrations(conn) -> Dict[str, Dict]:
+    """version -> {'name', 'checksum', 'applied_at', 'duration_ms'}"""
+    conn.execute(TRACKING_SQL)
+    rows = conn.execute(
+        "SELECT version, name, checksum, applied_at, duration_ms FROM schema_migrations ORDER BY version"
+    ).fetchall()
+    return {
+        version: {'name': name, 'checksum': checksum, 'applied_at': applied_at, 'duration_ms': duration_ms}
+        for version, name, checksum, applied_at, duration_ms in rows
+    }
+
+
+def _record(conn, migration: Dict, duration_ms: int):
+    conn.execute(
+        "INSERT INTO schema_migrations (version, name, checksum, duration_ms) VALUES (%s, %s, %s, %s)",
+        (migration['version'], migration['name'], migration['checksum'], duration_ms)
+    )
+
+
+def _apply(conn, migration: Dict):
+    start = time.perf_counter()
+    if migration['transactional']:
+        with conn.transaction():
+            conn.execute(migration['sql'])
+            _record(conn, migration, round((time.perf_counter() - start) * 1000))
+        return
+
+    for statement in split_statements(migration['sql']):
+        for step in _expand_statement(conn, statement):
+            create = CREATE_CONCURRENTLY.match(step)
+            if create:
+                _drop_invalid_index(conn, create.group(2))
+            conn.execute(step)
+    with conn.transaction():
+        _record(conn, migration, round((time.perf_counter() - start) * 1000))
+
+
+def migrate(conn, migrations: Optional[List[Dict]] = None, dry_run: bool = False,
+            target: Optional[str] = None) -> List[str]:
+    """Apply pending migrations (up to and including `target`); returns the versions run
+
+    `conn` must be an autocommit psycopg connection. The first failure stops the run;
+    earlier migrations stay applied.
+    """
+    migrations = load_migrations() if migrations is None else migrations
+    conn.execute("SELECT set_config('lock_timeout', %s, false)", (Config.MIGRATION_LOCK_TIMEOUT,))
+    conn.execute("SELECT pg_advisory_lock(%s)", (LOCK_KEY,))
+    try:
+        applied = applied_migrations(conn)
+        _warn_changed(migrations, applied)
+        pending = [
+            m for m in migrations
+            if m['version'] not in applied and (target is None or int(m['version']) <= int(target))
+        ]
+        if not pending:
+            print("✅ Database is up to date")
+            return []
+
+        if dry_run:
+            return _dry_run(conn, pending)
+
+        done = []
+        for migration in pending:
+            label = f"{migration['version']}_{migration['name']}"
+            mode = "" if migration['transactional'] else " (no transaction)"
+            start = time.perf_counter()
+            try:
+                _apply(conn, migration)
+            except Exception as e:
+                print(f"❌ {label} failed: {e}")
+                raise
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"✅ Applied {label}{mode} in {elapsed:.0f} ms")
+            done.append(migration['version'])
+        return done
+    finally:
+        conn.execute("SELECT pg_advisory_unlock(%s)", (LOCK_KEY,))
+
+
+def _dry_run(conn, pending: List[Dict]) -> List[str]:
+    """Run the transactional migrations of the plan in one transaction, then roll it back"""
+    done = []
+    with conn.transaction(force_rollback=True):
+        for migration in pending:
+            label = f"{migration['version']}_{migration['name']}"
+            if not migration['transactional']:
+                print(f"⏭️ Dry run skips {label} (no transaction, cannot be rolled back)")
+                continue
+            start = time.perf_counter()
+            try:
+                conn.execute(migration['sql'])
+                _record(conn, migration, round((time.perf_counter() - start) * 1000))
+            except Exception as e:
+                print(f"❌ {label} failed: {e}")
+                raise
+            print(f"🔍 Dry run {label} in {(time.perf_counter() - start) * 1000:.0f} ms")
+            done.append(migration['version'])
+    print("↩️ Dry run rolled back")
+    return done
+
+
+def _warn_changed(migrations: List[Dict], applied: Dict[str, Dict]) -> Set[str]:
+    changed = {
+        m['version'] for m in migrations
+        if m['version'] in applied and applied[m['version']]['checksum'] != m['checksum']
+    }
+    for version in sorted(changed):
+        print(f"⚠️ Migration {version} was edited after it was applied; add a new migration instead")
+    return changed
+
+
+def status(conn, migrations: Optional[List[Dict]] = None) -> List[Dict]:
+    """Each migration with its state: applied, pending or changed"""
+    migrations = load_migrations() if migrations is None else migrations
+    applied = applied_migrations(conn)
+    changed = _warn_changed(migrations, applied)
+    rows = []
+    for migration in migrations:
+        record = applied.get(migration['version'])
+        state = 'changed' if migration['version'] in changed else 'applied' if record else 'pending'
+        rows.append({'version': migration['version'], 'name': migration['name'], 'state': state,
+                     'applied_at': record['applied_at'] if record else None})
+        when = f"  {record['applied_at']:%Y-%m-%d %H:%M} ({record['duration_ms']} ms)" if record else ""
+        icon = {'applied': '✅', 'pending': '⏳', 'changed': '⚠️'}[state]
+        print(f"{icon} {migration['version']}_{migration['name']}{when}")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", nargs="?", choices=["up", "status"], default="up")
+    parser.add_argument("--dsn", default=Config.DATABASE_URL, help="Postgres connection string (default: DATABASE_URL)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="run pending migrations in one rolled-back transaction (skips no-transaction ones)")
+    parser.add_argument("--target", help="stop after this version")
+    parser.add_argument("--dir", type=Path, default=MIGRATIONS_DIR, help="migrations directory")
+    args = parser.parse_args()
+
+    if not PSYCOPG_AVAILABLE:
+        raise SystemExit('❌ psycopg not installed: pip install "psycopg[binary]"')
+    if not args.dsn:
+        raise SystemExit("❌ Set DATABASE_URL or pass --dsn")
+
+    migrations = load_migrations(args.dir)
+    with psycopg.connect(args.dsn, autocommit=True) as conn:
+        if args.command == "status":
+            status(conn, migrations)
+        else:
+            migrate(conn, migrations, dry_run=args.dry_run, target=args.target)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,510 @@
+"""In-memory stand-in for the Supabase/PostgREST client
+
+Implements the query-builder chain the services and pages use
+(table().select().eq().gte().lt().in_().ilike().or_().order().limit(),
+insert/upsert/update/delete, rpc('search_transactions'),
+rpc('get_transaction_month_versions')) over plain lists of
+dicts, plus the auth calls AuthService makes, so the data paths can be
+exercised and benchmarked without a network.
+
+Set SUPABASE_BACKEND=memory and create_supabase_client() returns one shared
+instance per process, with SUPABASE_FAKE_LATENCY_MS added to every request
+a demo account (demo@budgetbuddy.local / demo1234) seeded with
+SUPABASE_FAKE_TRANSACTIONS transactions, and SUPABASE_FAKE_USERS synthetic
+users with SUPABASE_FAKE_YEARS of history each. Or use it directly:
+
+    service = TransactionService()
+    service.supabase = FakeSupabase()
+
+Columns Postgres would fill in are generated: id, created_at and amount_cents
+(from amount, like the generated column). transactions_all reads the hot
+transactions table plus transactions_cold, like the view, and writes through
+the API bump transaction_month_versions like the trigger (seed() does not).
+"""
+
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from ..utils.config import Config
+
+# Read-only views over several tables
+VIEWS = {'transactions_all': ('transactions', 'transactions_cold')}
+DATE_COLUMNS = {'transaction_date'}
+PRIMARY_KEYS = {'user_profiles': 'user_id'}  # Default upsert conflict target; everything else is keyed by id
+
+DEMO_EMAIL = 'demo@budgetbuddy.local'
+DEMO_PASSWORD = 'demo1234'
+DEMO_CATEGORIES = ['Food & Dining', 'Groceries', 'Transportation', 'Entertainment',
+                   'Shopping', 'Bills & Utilities', 'Healthcare']
+DEMO_MERCHANTS = ['Starbucks', 'Whole Foods', 'Shell', 'Netflix', 'Amazon', 'Uber', 'Target', 'CVS Pharmacy']
+
+Filter = Callable[[Dict], bool]
+
+
+class StandInError(Exception):
+    """Raised for requests PostgREST would reject (shaped like postgrest's APIError message)"""
+
+
+def _comparable(row_value: Any, value: Any) -> Tuple[Any, Any]:
+    """Compare numbers as numbers and everything else as text, like PostgREST's casts"""
+    if isinstance(row_value, (int, float, Decimal)) and not isinstance(row_value, bool):
+        try:
+            return Decimal(str(row_value)), Decimal(str(value))
+        except ArithmeticError:
+            pass
+    return str(row_value), str(value)
+
+
+def _compare(op: str) -> Callable[[Any, Any], bool]:
+    return {
+        'eq': lambda a, b: a == b,
+        'neq': lambda a, b: a != b,
+        'gt': lambda a, b: a > b,
+        'gte': lambda a, b: a >= b,
+        'lt': lambda a, b: a < b,
+        'lte': lambda a, b: a <= b,
+    }[op]
+
+
+def _condition(column: str, op: str, value: Any) -> Filter:
+    if column in DATE_COLUMNS and op not in ('in', 'is', 'like', 'ilike'):
+        value = str(value)[:10]  # '2024-05-01T00:00:00' casts to the date 2024-05-01
+    if op in ('like', 'ilike'):
+        flags = re.IGNORECASE | re.DOTALL if op == 'ilike' else re.DOTALL
+        pattern = re.compile(_like_to_regex(str(value)), flags)
+        return lambda row: row.get(column) is not None and pattern.fullmatch(str(row[column])) is not None
+    if op == 'in':
+        values = {str(v) for v in value}
+        return lambda row: row.get(column) is not None and str(row[column]) in values
+    if op == 'is':
+        return lambda row: row.get(column) is None if str(value).lower() == 'null' else row.get(column) == value
+    compare = _compare(op)
+
+    def check(row: Dict) -> bool:
+        row_value = row.get(column)
+        if row_value is None:
+            return False  # NULL never matches a comparison
+        return compare(*_comparable(row_value, value))
+    return check
+
+
+def _like_to_regex(pattern: str) -> str:
+    out, escaped = [], False
+    for ch in pattern:
+        if escaped:
+            out.append(re.escape(ch))
+            escaped = False
+        elif ch == '\\':
+            escaped = True
+        elif ch == '%':
+            out.append('.*')
+        elif ch == '_':
+            out.append('.')
+        else:
+            out.append(re.escape(ch))
+    return ''.join(out)
+
+
+def _split_top_level(expr: str) -> List[str]:
+    parts, depth, current = [], 0, []
+    for ch in expr:
+        if ch == ',' and depth == 0:
+            parts.append(''.join(current))
+            current = []
+            continue
+        depth += (ch == '(') - (ch == ')')
+        current.append(ch)
+    parts.append(''.join(current))
+    return [part.strip() for part in parts if part.strip()]
+
+
+def parse_logic(expr: str, combine: str = 'or') -> Filter:
+    """Filter for a PostgREST logic tree, e.g. 'a.lt.1,and(a.eq.1,id.lt.x)'"""
+    conditions: List[Filter] = []
+    for part in _split_top_level(expr):
+        nested = re.fullmatch(r'(and|or)\((.*)\)', part, re.DOTALL)
+        if nested:
+            conditions.append(parse_logic(nested.group(2), nested.group(1)))
+            continue
+        column, op, value = part.split('.', 2)
+        if op == 'not':
+            inner_op, inner_value = value.split('.', 1)
+            inner = _condition(column, inner_op, inner_value)
+            conditions.append(lambda row, inner=inner: not inner(row))
+        else:
+            conditions.append(_condition(column, op, value))
+    if combine == 'and':
+        return lambda row: all(condition(row) for condition in conditions)
+    return lambda row: any(condition(row) for condition in conditions)
+
+
+class FakeQuery:
+    """One PostgREST request being built; execute() runs it against the store"""
+
+    def __init__(self, db: 'FakeSupabase', table: str):
+        self.db = db
+        self.table = table
+        self.operation = 'select'
+        self.columns: Optional[List[str]] = None
+        self.payload: Any = None
+        self.on_conflict: Optional[str] = None
+        self.filters: List[Filter] = []
+        self.user_id: Optional[str] = None  # eq('user_id', ...) narrows the scan to one user's rows
+        self.ordering: List[Tuple[str, bool]] = []
+        self.row_limit: Optional[int] = None
+        self.row_offset = 0
+
+    # --- Reads ---
+
+    def select(self, columns: str = '*', count: Optional[str] = None) -> 'FakeQuery':
+        self.columns = None if columns.strip() == '*' else [c.strip() for c in columns.split(',')]
+        return self
+
+    def eq(self, column: str, value: Any) -> 'FakeQuery':
+        if column == 'user_id' and self.user_id is None:
+            self.user_id = str(value)
+        return self._filter(column, 'eq', value)
+
+    def neq(self, column: str, value: Any) -> 'FakeQuery':
+        return self._filter(column, 'neq', value)
+
+    def gt(self, column: str, value: Any) -> 'FakeQuery':
+        return self._filter(column, 'gt', value)
+
+    def gte(self, column: str, value: Any) -> 'FakeQuery':
+        return self._filter(column, 'gte', value)
+
+    def lt(self, column: str, value: Any) -> 'FakeQuery':
+        return self._filter(column, 'lt', value)
+
+    def lte(self, column: str, value: Any) -> 'FakeQuery':
+        return self._filter(column, 'lte', value)
+
+    def like(self, column: str, pattern: str) -> 'FakeQuery':
+        return self._filter(column, 'like', pattern)
+
+    def ilike(self, column: str, pattern: str) -> 'FakeQuery':
+        return self._filter(column, 'ilike', pattern)
+
+    def in_(self, column: str, values) -> 'FakeQuery':
+        return self._filter(column, 'in', list(values))
+
+    def is_(self, column: str, value: Any) -> 'FakeQuery':
+        return self._filter(column, 'is', value)
+
+    def or_(self, expr: str) -> 'FakeQuery':
+        self.filters.append(parse_logic(expr))
+        return self
+
+    def order(self, column: str, desc: bool = False) -> 'FakeQuery':
+        self.ordering.append((column, desc))
+        return self
+
+    def limit(self, count: int) -> 'FakeQuery':
+        self.row_limit = count
+        return self
+
+    def range(self, start: int, end: int) -> 'FakeQuery':
+        self.row_offset, self.row_limit = start, end - start + 1
+        return self
+
+    def _filter(self, column: str, op: str, value: Any) -> 'FakeQuery':
+        self.filters.append(_condition(column, op, value))
+        return self
+
+    # --- Writes ---
+
+    def insert(self, rows, **kwargs) -> 'FakeQuery':
+        self.operation, self.payload = 'insert', rows
+        return self
+
+    def upsert(self, rows, on_conflict: Optional[str] = None, **kwargs) -> 'FakeQuery':
+        self.operation, self.payload, self.on_conflict = 'upsert', rows, on_conflict
+        return self
+
+    def update(self, values: Dict, **kwargs) -> 'FakeQuery':
+        self.operation, self.payload = 'update', values
+        return self
+
+    def delete(self, **kwargs) -> 'FakeQuery':
+        self.operation = 'delete'
+        return self
+
+    def execute(self) -> SimpleNamespace:
+        self.db._round_trip()
+        data = self.db._run(self)
+        return SimpleNamespace(data=data, count=len(data))
+
+
+def _user_id(email: str) -> str:
+    # Stable across processes, so the UI and API stand-ins agree on who the demo user is
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"budgetbuddy:{email.lower()}"))
+
+
+class FakeAuth:
+    """Email/password accounts behind the supabase.auth calls AuthService makes"""
+
+    def __init__(self, db: 'FakeSupabase'):
+        self.db = db
+        self._accounts: Dict[str, Dict] = {}  # email -> {'password', 'user'}
+        self._session_user: Optional[SimpleNamespace] = None
+
+    def register(self, email: str, password: str) -> SimpleNamespace:
+        email = email.strip().lower()
+        user = SimpleNamespace(id=_user_id(email), email=email, created_at=datetime.now(timezone.utc).isoformat())
+        self._accounts[email] = {'password': password, 'user': user}
+        return user
+
+    def _response(self, user: Optional[SimpleNamespace]) -> SimpleNamespace:
+        session = SimpleNamespace(access_token=f"local-{user.id}", user=user) if user else None
+        return SimpleNamespace(user=user, session=session)
+
+    def sign_up(self, credentials: Dict) -> SimpleNamespace:
+        self.db._round_trip()
+        email = str(credentials.get('email', '')).strip().lower()
+        if '@' not in email:
+            raise StandInError("Unable to validate email address: invalid format")
+        if len(str(credentials.get('password', ''))) < 6:
+            raise StandInError("Password should be at least 6 characters")
+        if email in self._accounts:
+            raise StandInError("User already registered")
+        return self._response(self.register(email, credentials['password']))
+
+    def sign_in_with_password(self, credentials: Dict) -> SimpleNamespace:
+        self.db._round_trip()
+        account = self._accounts.get(str(credentials.get('email', '')).strip().lower())
+        if account is None or account['password'] != credentials.get('password'):
+            raise StandInError("Invalid login credentials")
+        self._session_user = account['user']
+        return self._response(account['user'])
+
+    def sign_out(self):
+        self.db._round_trip()
+        self._session_user = None
+
+    def get_user(self) -> Optional[SimpleNamespace]:
+        self.db._round_trip()
+        return self._response(self._session_user) if self._session_user else None
+
+
+class FakeSupabase:
+    """In-memory tables behind a supabase.Client-shaped API"""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.tables: Dict[str, List[Dict]] = {}
+        self.calls: Dict[str, int] = {}  # "table.operation" -> count
+        self.auth = FakeAuth(self)
+        self._by_user: Dict[str, Dict[str, List[Dict]]] = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_config(cls) -> 'FakeSupabase':
+        """Stand-in with the configured latency and a seeded demo account"""
+        fake = cls(latency_ms=Config.SUPABASE_FAKE_LATENCY_MS)
+        demo = fake.auth.register(DEMO_EMAIL, DEMO_PASSWORD)
+        fake.seed('transactions', demo_transactions(demo.id, Config.SUPABASE_FAKE_TRANSACTIONS))
+        if Config.SUPABASE_FAKE_USERS > 0:
+            # Load tests address these users by id: synthetic.user_ids(SUPABASE_FAKE_USERS, 0)
+            from .synthetic import generate, records, user_ids
+            for frame in generate(user_ids(Config.SUPABASE_FAKE_USERS, 0), Config.SUPABASE_FAKE_YEARS):
+                fake.seed('transactions', records(frame))
+        return fake
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def rpc(self, name: str, params: Dict) -> SimpleNamespace:
+        functions = {'search_transactions': self._search, 'get_transaction_month_versions': self._month_versions}
+        if name not in functions:
+            raise StandInError(f"Could not find the function public.{name}")
+
+        def execute() -> SimpleNamespace:
+            self._round_trip()
+            rows = functions[name](params)
+            return SimpleNamespace(data=rows, count=len(rows))
+        return SimpleNamespace(execute=execute)
+
+    def seed(self, table: str, rows: List[Dict]):
+        """Bulk-load rows (generated columns filled in) without going through the API"""
+        with self._lock:
+            for row in rows:
+                self._store(table, self._prepare(table, dict(row)))
+
+    # --- Execution ---
+
+    def _round_trip(self):
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000)  # Outside the lock: concurrent requests overlap, as over HTTP
+
+    def _run(self, query: FakeQuery) -> List[Dict]:
+        if query.table in VIEWS and query.operation != 'select':
+            raise StandInError(f"cannot {query.operation} view {query.table}")
+        with self._lock:
+            key = f"{query.table}.{query.operation}"
+            self.calls[key] = self.calls.get(key, 0) + 1
+            if query.operation == 'insert':
+                stored = [self._store(query.table, self._prepare(query.table, dict(row)))
+                          for row in self._rows_of(query.payload)]
+                self._bump_months(query.table, stored)
+                return [dict(row) for row in stored]
+            if query.operation == 'upsert':
+                stored = [self._upsert(query.table, dict(row), query.on_conflict)
+                          for row in self._rows_of(query.payload)]
+                self._bump_months(query.table, stored)
+                return [dict(row) for row in stored]
+
+            matched = [row for row in self._candidates(query) if all(f(row) for f in query.filters)]
+            if query.operation == 'update':
+                self._bump_months(query.table, matched)
+                for row in matched:
+                    row.update(query.payload)
+                self._bump_months(query.table, matched)
+                return [dict(row) for row in matched]
+            if query.operation == 'delete':
+                self._remove(query.table, matched)
+                self._bump_months(query.table, matched)
+                return [dict(row) for row in matched]
+
+        for column, desc in reversed(query.ordering):
+            # Postgres puts NULLs last ascending and first descending
+            matched.sort(key=lambda row: (row.get(column) is None, _sort_key(row.get(column))), reverse=desc)
+        end = None if query.row_limit is None else query.row_offset + query.row_limit
+        matched = matched[query.row_offset:end]
+        if query.columns is None:
+            return [dict(row) for row in matched]
+        return [{column: row.get(column) for column in query.columns} for row in matched]
+
+    def _candidates(self, query: FakeQuery) -> List[Dict]:
+        tables = VIEWS.get(query.table, (query.table,))
+        rows: List[Dict] = []
+        for table in tables:
+            if query.user_id is not None:
+                rows.extend(self._by_user.get(table, {}).get(query.user_id, ()))
+            else:
+                rows.extend(self.tables.get(table, ()))
+        return rows
+
+    @staticmethod
+    def _rows_of(payload) -> List[Dict]:
+        return payload if isinstance(payload, list) else [payload]
+
+    def _prepare(self, table: str, row: Dict) -> Dict:
+        if PRIMARY_KEYS.get(table, 'id') == 'id':
+            row.setdefault('id', str(uuid.uuid4()))
+        row.setdefault('created_at', datetime.now(timezone.utc).isoformat())
+        for column in DATE_COLUMNS & row.keys():
+            row[column] = str(row[column])[:10]
+        if 'amount' in row and row['amount'] is not None:
+            # GENERATED ALWAYS AS (ROUND(amount * 100)::BIGINT)
+            row['amount_cents'] = int((Decimal(str(row['amount'])) * 100).to_integral_value())
+        return row
+
+    def _store(self, table: str, row: Dict) -> Dict:
+        self.tables.setdefault(table, []).append(row)
+        if 'user_id' in row:
+            self._by_user.setdefault(table, {}).setdefault(str(row['user_id']), []).append(row)
+        return row
+
+    def _remove(self, table: str, rows: List[Dict]):
+        doomed = {id(row) for row in rows}
+        self.tables[table] = [row for row in self.tables.get(table, []) if id(row) not in doomed]
+        for user_rows in self._by_user.get(table, {}).values():
+            user_rows[:] = [row for row in user_rows if id(row) not in doomed]
+
+    def _bump_months(self, table: str, rows: List[Dict]):
+        """The transactions_bump_month_version trigger (migration 0011)"""
+        if table != 'transactions':
+            return
+        for row in rows:
+            day = str(row.get('transaction_date') or '')
+            if row.get('user_id') is None or len(day) < 7:
+                continue
+            user_id, year, month = str(row['user_id']), int(day[:4]), int(day[5:7])
+            versions = self._by_user.get('transaction_month_versions', {}).get(user_id, ())
+            existing = next((v for v in versions if v['year'] == year and v['month'] == month), None)
+            if existing:
+                existing['version'] += 1
+            else:
+                self._store('transaction_month_versions',
+                            {'user_id': user_id, 'year': year, 'month': month, 'version': 1})
+
+    def _upsert(self, table: str, row: Dict, on_conflict: Optional[str]) -> Dict:
+        keys = [k.strip() for k in (on_conflict or PRIMARY_KEYS.get(table, 'id')).split(',')]
+        candidates = self.tables.get(table, [])
+        if 'user_id' in keys and 'user_id' in row:
+            candidates = self._by_user.get(table, {}).get(str(row['user_id']), [])
+        for existing in candidates:
+            if all(str(existing.get(k)) == str(row.get(k)) for k in keys):
+                existing.update(row)
+                return existing
+        return self._store(table, self._prepare(table, row))
+
+    def _month_versions(self, params: Dict) -> List[Dict]:
+        """get_transaction_month_versions (the stand-in's trigger is always in place)"""
+        with self._lock:
+            versions = self._by_user.get('transaction_month_versions', {}).get(str(params['p_user_id']), ())
+            return [{'year': v['year'], 'month': v['month'], 'version': v['version']} for v in versions
+                    if params['p_from_year'] <= v['year'] <= params['p_to_year']]
+
+    def _search(self, params: Dict) -> List[Dict]:
+        """Prefix match on every query word, ranked by the share of description words matched"""
+        words = [w for w in re.split(r'\W+', str(params.get('p_query', '')).lower()) if w]
+        after_rank, after_id = params.get('p_after_rank'), params.get('p_after_id')
+        with self._lock:
+            rows = [row for table in VIEWS['transactions_all']
+                    for row in self._by_user.get(table, {}).get(str(params.get('p_user_id')), ())]
+        results = []
+        for row in rows:
+            tokens = re.split(r'\W+', str(row.get('description') or '').lower())
+            if not words or not all(any(t.startswith(w) for t in tokens) for w in words):
+                continue
+            rank = round(len(words) / max(len([t for t in tokens if t]), 1), 6)
+            if after_rank is not None and (rank, str(row['id'])) >= (float(after_rank), str(after_id)):
+                continue
+            results.append({**row, 'rank': rank})
+        results.sort(key=lambda row: (row['rank'], str(row['id'])), reverse=True)
+        return results[:int(params.get('p_limit') or 20)]
+
+
+def demo_transactions(user_id: str, count: int, years: int = 2, seed: int = 42) -> List[Dict]:
+    """Deterministic transaction rows over the last `years` years, about 1 in 10 income"""
+    rng = random.Random(seed)
+    today = date.today()
+    rows = []
+    for i in range(count):
+        income = i % 10 == 0
+        rows.append({
+            'user_id': user_id,
+            'amount': f"{rng.randint(150000, 450000) / 100 if income else rng.randint(300, 20000) / 100:.2f}",
+            'transaction_type': 'income' if income else 'expense',
+            'category': 'Salary' if income else rng.choice(DEMO_CATEGORIES),
+            'description': 'Payroll Deposit' if income else rng.choice(DEMO_MERCHANTS),
+            'transaction_date': (today - timedelta(days=rng.randrange(365 * years))).isoformat(),
+        })
+    return rows
+
+
+_shared: Optional[FakeSupabase] = None
+_shared_lock = threading.Lock()
+
+
+def shared() -> FakeSupabase:
+    """The process-wide stand-in every service gets with SUPABASE_BACKEND=memory"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = FakeSupabase.from_config()
+        return _shared
+
+
+def _sort_key(value: Any) -> Any:
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return (0, Decimal(str(value)), '')
+    return (1, Decimal(0), str(value) if value is not None else '')
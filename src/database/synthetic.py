@@ -0,0 +1,315 @@
+"""Synthetic transaction histories for scale testing
+
+Realistic multi-year histories for N users, seeded from the merchants and
+categories in assets/data/sample_transactions.csv:
+
+- salary, rent, utility bills and subscriptions recur monthly on the day they
+  fall on in the sample (bills vary a little, with a winter/summer peak)
+- discretionary spend: a Poisson number of purchases per day, busier at
+  weekends and in November/December, quieter in January; each user's merchant
+  popularity follows a power law over store-level variants of the sample
+  merchants, so a few merchants dominate and there is a long tail
+- optional exact duplicates (an overlapping re-export) and malformed rows
+  (unparseable dates or amounts, blank fields; CSV only)
+
+Output is deterministic for a given --seed:
+
+    python -m src.database.synthetic --users 100 --years 3 --out transactions.csv
+    python -m src.database.synthetic --users 1000 --format parquet --out transactions.parquet
+    python -m src.database.synthetic --format db --user-id <uuid> --user-id <uuid>    # COPY into DATABASE_URL
+    python -m src.database.synthetic --format supabase --user-id <uuid>               # batched inserts
+
+transactions.user_id references auth.users, so database loads need --user-id
+for existing accounts (or a local schema without the foreign key). About
+(daily spend x 365 + 25) rows are generated per user per year.
+"""
+
+import argparse
+import csv
+import re
+import time
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    import psycopg
+    PSYCOPG_AVAILABLE = True
+except ImportError:
+    PSYCOPG_AVAILABLE = False
+
+from ..utils.config import Config
+
+SAMPLE_CSV = Config.ASSETS_DIR / "data" / "sample_transactions.csv"
+
+# Discretionary volume by month (Jan..Dec) and on Saturdays/Sundays
+SEASONAL = np.array([0.8, 0.9, 0.95, 1.0, 1.0, 1.05, 1.1, 1.05, 0.95, 1.0, 1.15, 1.4])
+WEEKEND = 1.25
+# Utility bills by month: heating in winter, cooling in summer
+UTILITY_SEASONAL = np.array([1.3, 1.25, 1.1, 0.95, 0.9, 1.0, 1.15, 1.15, 0.95, 0.9, 1.05, 1.25])
+ZIPF_EXPONENT = 1.1
+STORES_PER_MERCHANT = 12  # "Starbucks Coffee #0007": store-level variants widen the long tail
+
+RECURRING = re.compile(r'salary|rent|bill|subscription|premium|membership|insurance', re.IGNORECASE)
+FIXED = re.compile(r'salary|rent|subscription|premium|membership|insurance', re.IGNORECASE)  # Same amount every month
+
+COLUMNS = ['date', 'description', 'amount', 'type', 'category', 'user_id']
+DB_COLUMNS = ('user_id', 'amount', 'transaction_type', 'category', 'description', 'transaction_date')
+
+
+def load_templates(path: Path = SAMPLE_CSV) -> Dict[str, List[Dict]]:
+    """Sample rows split into recurring payments, occasional income and discretionary merchants"""
+    recurring, occasional, merchants = [], [], {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            cents = abs(round(float(row['amount']) * 100))
+            day = int(row['date'][8:10])
+            template = {'description': row['description'], 'category': row['category'],
+                        'type': row['type'], 'cents': cents, 'day': day}
+            if RECURRING.search(row['description']) or row['category'] == 'Housing':
+                template['fixed'] = bool(FIXED.search(row['description'])) or row['category'] == 'Housing'
+                recurring.append(template)
+            elif row['type'] == 'income':
+                occasional.append(template)
+            else:
+                merchant = merchants.setdefault(row['description'], {**template, 'samples': []})
+                merchant['samples'].append(cents)
+
+    for merchant in merchants.values():
+        merchant['cents'] = int(np.mean(merchant.pop('samples')))
+    return {'recurring': recurring, 'occasional': occasional, 'merchants': list(merchants.values())}
+
+
+def user_ids(count: int, seed: int) -> List[str]:
+    """Deterministic user ids for generated users"""
+    return [str(uuid.uuid5(uuid.NAMESPACE_URL, f"budgetbuddy:synthetic:{seed}:{i}")) for i in range(count)]
+
+
+def generate(users: List[str], years: float = 3, end: Optional[date] = None, daily_spend: float = 1.5,
+             duplicate_rate: float = 0.0, malformed_rate: float = 0.0, seed: int = 0,
+             templates: Optional[Dict[str, List[Dict]]] = None) -> Iterator[pd.DataFrame]:
+    """One DataFrame per user, sorted by date, with COLUMNS
+
+    amount is signed integer cents (income positive) unless malformed_rate
+    is set, in which case every column is text as it would be in a CSV.
+    """
+    templates = templates or load_templates()
+    end = end or date.today()
+    start = end - timedelta(days=round(365 * years))
+    rng = np.random.default_rng(seed)
+
+    merchants = templates['merchants']
+    pool_description = np.array([m['description'] if store == 0 else f"{m['description']} #{store:04d}"
+                                 for m in merchants for store in range(STORES_PER_MERCHANT)])
+    pool_category = np.array([m['category'] for m in merchants for _ in range(STORES_PER_MERCHANT)])
+    pool_cents = np.array([m['cents'] for m in merchants for _ in range(STORES_PER_MERCHANT)], dtype=np.float64)
+    popularity = 1.0 / np.arange(1, len(pool_description) + 1) ** ZIPF_EXPONENT
+    popularity /= popularity.sum()
+
+    days = np.arange(np.datetime64(start), np.datetime64(end) + 1)
+    day_months = days.astype('datetime64[M]').astype(np.int64) % 12
+    weekend = (days.astype(np.int64) + 3) % 7 >= 5  # 1970-01-01 was a Thursday
+    expected = daily_spend * SEASONAL[day_months] * np.where(weekend, WEEKEND, 1.0)
+    months = pd.period_range(start, end, freq='M')
+
+    for user_id in users:
+        scale = rng.lognormal(0, 0.3)  # Higher earners pay more rent and spend more
+
+        # Discretionary spend: each user has their own favourite merchants
+        counts = rng.poisson(expected)
+        spend_days = np.repeat(np.arange(len(days)), counts)
+        picks = rng.permutation(len(pool_description))[rng.choice(len(pool_description), len(spend_days), p=popularity)]
+        spend_cents = np.maximum(50, np.round(
+            pool_cents[picks] * scale * rng.lognormal(0, 0.35, len(spend_days))
+            * np.sqrt(SEASONAL[day_months[spend_days]])))
+        dates = [days[spend_days]]
+        descriptions = [pool_description[picks]]
+        categories = [pool_category[picks]]
+        signed = [-spend_cents]
+        types = [np.full(len(spend_days), 'expense')]
+
+        # Recurring payments and occasional income, month by month
+        extra = []
+        for month in months:
+            for t in templates['recurring']:
+                day = date(month.year, month.month, min(t['day'], 28))
+                if not start <= day <= end:
+                    continue
+                if t['fixed']:
+                    cents = t['cents'] * (scale if t['category'] in ('Salary', 'Housing') else 1)
+                else:
+                    cents = t['cents'] * scale * UTILITY_SEASONAL[month.month - 1] * rng.lognormal(0, 0.1)
+                extra.append((day, t, round(cents, -2) if t['category'] in ('Salary', 'Housing') else round(cents)))
+            for t in templates['occasional']:
+                if rng.random() < 0.3:
+                    day = date(month.year, month.month, int(rng.integers(1, 29)))
+                    if start <= day <= end:
+                        extra.append((day, t, round(t['cents'] * rng.lognormal(0, 0.5))))
+        if extra:
+            dates.append(np.array([day for day, _, _ in extra], dtype='datetime64[D]'))
+            descriptions.append(np.array([t['description'] for _, t, _ in extra]))
+            categories.append(np.array([t['category'] for _, t, _ in extra]))
+            signed.append(np.array([cents if t['type'] == 'income' else -cents for _, t, cents in extra], dtype=np.float64))
+            types.append(np.array([t['type'] for _, t, _ in extra]))
+
+        frame = pd.DataFrame({
+            'date': np.concatenate(dates),
+            'description': np.concatenate(descriptions),
+            'amount': np.concatenate(signed).astype(np.int64),
+            'type': np.concatenate(types),
+            'category': np.concatenate(categories),
+            'user_id': user_id,
+        })
+        if duplicate_rate > 0:
+            # Exact copies, as when overlapping statement exports are both imported
+            frame = pd.concat([frame, frame.sample(frac=duplicate_rate, random_state=rng)], ignore_index=True)
+        frame = frame.sort_values('date', kind='stable', ignore_index=True)
+        frame['date'] = frame['date'].dt.strftime('%Y-%m-%d')
+        if malformed_rate > 0:
+            frame = _malform(frame, malformed_rate, rng)
+        yield frame
+
+
+def _malform(frame: pd.DataFrame, rate: float, rng: np.random.Generator) -> pd.DataFrame:
+    """Text columns with a share of rows corrupted the ways bank exports go wrong"""
+    frame['amount'] = np.char.mod('%.2f', frame['amount'].to_numpy() / 100)
+    frame = frame.astype(object)
+    rows = np.flatnonzero(rng.random(len(frame)) < rate)
+    for row, kind in zip(rows, rng.integers(0, 4, len(rows))):
+        if kind == 0:
+            frame.at[row, 'date'] = rng.choice(['2024-02-30', '13/45/2024', ''])
+        elif kind == 1:
+            frame.at[row, 'amount'] = rng.choice(['N/A', '', '12.34.56'])
+        elif kind == 2:
+            frame.at[row, 'description'] = ''
+            frame.at[row, 'category'] = ''
+        else:
+            frame.at[row, 'type'] = 'pending'
+    return frame
+
+
+def _for_file(frame: pd.DataFrame) -> pd.DataFrame:
+    if frame['amount'].dtype == object:
+        return frame  # Already text (malformed rows)
+    return frame.assign(amount=frame['amount'] / 100)
+
+
+def write_csv(frames: Iterator[pd.DataFrame], path: str) -> int:
+    total = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        for i, frame in enumerate(frames):
+            _for_file(frame).to_csv(f, index=False, header=i == 0, float_format='%.2f')
+            total += len(frame)
+    return total
+
+
+def write_parquet(frames: Iterator[pd.DataFrame], path: str) -> int:
+    if not PYARROW_AVAILABLE:
+        raise SystemExit("❌ Parquet output needs pyarrow (pip install pyarrow)")
+    total, writer = 0, None
+    try:
+        for frame in frames:
+            table = pyarrow.Table.from_pandas(_for_file(frame), preserve_index=False)
+            if writer is None:
+                writer = pyarrow.parquet.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+            total += len(frame)
+    finally:
+        if writer is not None:
+            writer.close()
+    return total
+
+
+def _db_rows(frame: pd.DataFrame) -> Iterator[tuple]:
+    amounts = np.char.mod('%.2f', np.abs(frame['amount'].to_numpy()) / 100)
+    return zip(frame['user_id'], amounts, frame['type'], frame['category'], frame['description'], frame['date'])
+
+
+def records(frame: pd.DataFrame) -> List[Dict]:
+    """transactions table rows (positive amount plus transaction_type) for one generated frame"""
+    return [dict(zip(DB_COLUMNS, row)) for row in _db_rows(frame)]
+
+
+def load_database(frames: Iterator[pd.DataFrame], dsn: str) -> int:
+    """COPY the rows into transactions over a direct Postgres connection, one transaction per user"""
+    if not PSYCOPG_AVAILABLE:
+        raise SystemExit("❌ Database loads need psycopg (pip install \"psycopg[binary]\")")
+    total = 0
+    with psycopg.connect(dsn) as conn:
+        for frame in frames:
+            with conn.cursor() as cur, cur.copy(f"COPY transactions ({', '.join(DB_COLUMNS)}) FROM STDIN") as copy:
+                for row in _db_rows(frame):
+                    copy.write_row(row)
+            conn.commit()
+            total += len(frame)
+    return total
+
+
+def load_supabase(frames: Iterator[pd.DataFrame], client, batch_size: int = 1000) -> int:
+    """Insert the rows through a Supabase client (PostgREST), batch_size rows per request"""
+    total = 0
+    for frame in frames:
+        rows = records(frame)
+        for i in range(0, len(rows), batch_size):
+            client.table('transactions').insert(rows[i:i + batch_size]).execute()
+        total += len(rows)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--user-id", action="append", default=[],
+                        help="generate for this existing user (repeatable; overrides --users)")
+    parser.add_argument("--years", type=float, default=3)
+    parser.add_argument("--end", type=date.fromisoformat, help="last day of history (default today)")
+    parser.add_argument("--daily-spend", type=float, default=1.5, help="average discretionary purchases per day")
+    parser.add_argument("--duplicate-rate", type=float, default=0.0, help="share of rows repeated exactly")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="share of rows corrupted (CSV only)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=['csv', 'parquet', 'db', 'supabase'], default='csv')
+    parser.add_argument("--out", default="synthetic_transactions.csv", help="output file for csv/parquet")
+    parser.add_argument("--dsn", default=Config.DATABASE_URL, help="Postgres connection string for --format db")
+    args = parser.parse_args()
+
+    if args.malformed_rate and args.format != 'csv':
+        raise SystemExit("❌ Malformed rows can only be written to CSV")
+    users = args.user_id or user_ids(args.users, args.seed)
+    frames = generate(users, args.years, args.end, args.daily_spend,
+                      args.duplicate_rate, args.malformed_rate, args.seed)
+
+    start = time.perf_counter()
+    if args.format == 'csv':
+        total = write_csv(frames, args.out)
+    elif args.format == 'parquet':
+        total = write_parquet(frames, args.out)
+    elif args.format == 'db':
+        if not args.dsn:
+            raise SystemExit("❌ Set DATABASE_URL or pass --dsn")
+        total = load_database(frames, args.dsn)
+    else:
+        from .client import create_supabase_client
+        client = create_supabase_client(service_role=True)
+        if client is None:
+            raise SystemExit("❌ Supabase not configured")
+        total = load_supabase(frames, client)
+
+    elapsed = time.perf_counter() - start
+    target = args.out if args.format in ('csv', 'parquet') else args.format
+    print(f"✅ {total:,} transactions for {len(users)} users -> {target} "
+          f"in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,24 @@
 """Transaction service for database operations"""
 
-from typing import List, Dict, Optional
-from datetime import datetime
+import base64
+import heapq
+import itertools
+import time
+from typing import List, Dict, Optional, Tuple
+from datetime import date, datetime
 from supabase import Client
 from ..utils.config import Config
+from ..utils.money import Cents, to_cents, from_cents, cents_to_decimal_str, split_income_expense
+from ..utils.metrics import DEDUPE_CHECKS, SUPABASE_QUERIES, SUPABASE_QUERY_SECONDS
+from ..utils.tracing import span, traced
+from ..utils.log import get_logger
+from ..services.api_models import TRANSACTION_COLUMNS
+from .cache import create_cache
+from .client import create_supabase_client
+from .change_feed import create_change_feed
+from .archive_job import archive_cutoff
+
+log = get_logger('transactions')
 
 
 class TransactionService:
@@ -12,112 +27,491 @@ class TransactionService:
     def __init__(self):
         """Initialize transaction service"""
         self.supabase: Optional[Client] = None
+        self.cache = create_cache()
+        self.changes = create_change_feed()
+        # Writes from other workers and jobs make this worker's cached reads stale too
+        self.changes.on_external_write = self.cache.invalidate_user
         self._initialize()
     
     def _initialize(self):
         """Initialize Supabase connection"""
-        if Config.is_configured():
-            from supabase import create_client
-            # Use service role key for backend operations to bypass RLS
-            service_key = Config.SUPABASE_SERVICE_KEY if hasattr(Config, 'SUPABASE_SERVICE_KEY') and Config.SUPABASE_SERVICE_KEY else Config.SUPABASE_KEY
-            self.supabase = create_client(Config.SUPABASE_URL, service_key)
-    
-    async def get_user_transactions(self, user_id: str, limit: int = 10) -> List[Dict]:
-        """Get recent transactions for a user"""
+        # Use service role key for backend operations to bypass RLS
+        self.supabase = create_supabase_client(service_role=True)
+    
+    def _execute(self, method: str, query):
+        """Run a PostgREST query, recording its count and latency under `method`"""
+        start = time.perf_counter()
+        status = 'error'
+        try:
+            with span(f"supabase {method}", kind='client', **{'db.system': 'postgrest'}):
+                response = query.execute()
+            status = 'ok'
+            return response
+        finally:
+            SUPABASE_QUERIES.labels(method=method, status=status).inc()
+            SUPABASE_QUERY_SECONDS.labels(method=method).observe(time.perf_counter() - start)
+    
+    @traced
+    async def get_user_transactions(self, user_id: str, limit: int = 10, 
+                                    account_id: Optional[str] = None, **filters) -> List[Dict]:
+        """Get recent transactions for a user, newest first
+        
+        Accepts the same filters as get_transaction_page.
+        """
+        page = await self.get_transaction_page(user_id, limit, account_id=account_id, **filters)
+        return page['transactions']
+    
+    @traced
+    async def get_transaction_page(self, user_id: str, limit: int = 10, cursor: Optional[str] = None, 
+                                   account_id: Optional[str] = None, 
+                                   start_date: Optional[date] = None, end_date: Optional[date] = None, 
+                                   categories: Optional[List[str]] = None, 
+                                   transaction_type: Optional[str] = None, 
+                                   min_amount_cents: Optional[int] = None, 
+                                   max_amount_cents: Optional[int] = None, 
+                                   merchant: Optional[str] = None) -> Dict:
+        """Get one page of a user's transactions, newest first, filtered in the database
+        
+        Args:
+            cursor: next_cursor from the previous page (None for the first page)
+            start_date / end_date: inclusive transaction_date bounds
+            categories: only these categories
+            transaction_type: 'income' or 'expense'
+            min_amount_cents / max_amount_cents: inclusive amount bounds
+            merchant: case-insensitive substring of the description
+        
+        Returns:
+            {'transactions': [...], 'next_cursor': str or None}
+        
+        Raises:
+            ValueError: if the cursor is malformed
+        """
         if not self.supabase:
-            return []
+            return {'transactions': [], 'next_cursor': None}
+        
+        after = self._decode_cursor(cursor, date.fromisoformat) if cursor else None
+        filters = {
+            'account_id': account_id,
+            'start_date': start_date,
+            'end_date': end_date,
+            'categories': sorted(categories) if categories else None,
+            'transaction_type': transaction_type,
+            'min_amount_cents': min_amount_cents,
+            'max_amount_cents': max_amount_cents,
+            'merchant': merchant,
+        }
         
         try:
-            response = self.supabase.table('transactions')\
-                .select('*')\
-                .eq('user_id', user_id)\
-                .order('transaction_date', desc=True)\
-                .limit(limit)\
-                .execute()
-            
-            return response.data if response.data else []
+            return await self.cache.get_or_load(
+                user_id, 'transactions', (limit, cursor, filters),
+                lambda: self._fetch_transaction_page(user_id, limit, after, filters)
+            )
         except Exception as e:
-            print(f"Error fetching transactions: {e}")
-            return []
+            log.error("Error fetching transactions", error=str(e))
+            return {'transactions': [], 'next_cursor': None}
+    
+    async def _fetch_transaction_page(self, user_id: str, limit: int, 
+                                      after: Optional[Tuple[str, str]], filters: Dict) -> Dict:
+        # One extra row tells us whether there is another page
+        rows = self._query_page('transactions', user_id, limit + 1, after, filters)
+        if self._reaches_archive(filters['start_date']) and not (
+                len(rows) > limit and
+                str(rows[-1]['transaction_date'])[:10] >= archive_cutoff().isoformat()):
+            # Archived rows are all older than the horizon, but a backdated insert
+            # can leave hot rows below it until the next archive run, so unless the
+            # page is already full of newer rows, merge both tiers by (date, id)
+            cold = self._query_page('transactions_cold', user_id, limit + 1, after, filters)
+            rows = heapq.merge(rows, cold, reverse=True,
+                               key=lambda row: (str(row['transaction_date'])[:10], row['id']))
+            rows = list(itertools.islice(rows, limit + 1))
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self._encode_cursor(str(rows[-1]['transaction_date'])[:10], rows[-1]['id'])
+        return {'transactions': rows, 'next_cursor': next_cursor}
+    
+    def _query_page(self, table: str, user_id: str, limit: int, 
+                    after: Optional[Tuple[str, str]], filters: Dict) -> List[Dict]:
+        query = self._apply_filters(
+            self.supabase.table(table).select(TRANSACTION_COLUMNS).eq('user_id', user_id),
+            **filters
+        )
+        if after:
+            # Keyset pagination: strictly after the last (date, id) of the previous page
+            last_date, last_id = after
+            query = query.or_(
+                f'transaction_date.lt.{last_date},'
+                f'and(transaction_date.eq.{last_date},id.lt.{last_id})'
+            )
+        
+        response = self._execute('get_transaction_page', query\
+            .order('transaction_date', desc=True)\
+            .order('id', desc=True)\
+            .limit(limit))
+        
+        return response.data if response.data else []
+    
+    def _reaches_archive(self, start: Optional[date]) -> bool:
+        """Whether a query starting at `start` (None = all history) can touch archived rows"""
+        horizon = archive_cutoff()
+        return horizon is not None and (start is None or start < horizon)
+    
+    def _source_table(self, start: Optional[date]) -> str:
+        """Hot table (partition-pruned by the date bound) or the hot+cold view"""
+        return 'transactions_all' if self._reaches_archive(start) else 'transactions'
+    
+    @staticmethod
+    def _apply_filters(query, account_id: Optional[str] = None, 
+                       start_date: Optional[date] = None, end_date: Optional[date] = None, 
+                       categories: Optional[List[str]] = None, transaction_type: Optional[str] = None, 
+                       min_amount_cents: Optional[int] = None, max_amount_cents: Optional[int] = None, 
+                       merchant: Optional[str] = None):
+        """Translate optional transaction filters into PostgREST predicates"""
+        if account_id:
+            query = query.eq('account_id', account_id)
+        if start_date:
+            query = query.gte('transaction_date', start_date.isoformat())
+        if end_date:
+            query = query.lte('transaction_date', end_date.isoformat())
+        if categories:
+            query = query.in_('category', list(categories))
+        if transaction_type:
+            query = query.eq('transaction_type', transaction_type)
+        if min_amount_cents is not None:
+            query = query.gte('amount_cents', min_amount_cents)
+        if max_amount_cents is not None:
+            query = query.lte('amount_cents', max_amount_cents)
+        if merchant:
+            # Escape LIKE wildcards so user input is matched literally
+            pattern = merchant.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            query = query.ilike('description', f'%{pattern}%')
+        return query
+    
+    @staticmethod
+    def _encode_cursor(sort_key: str, row_id: str) -> str:
+        """Opaque pagination cursor for the position after (sort key, id)"""
+        raw = f"{sort_key}|{row_id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+    
+    @staticmethod
+    def _decode_cursor(cursor: str, parse_key) -> Tuple[str, str]:
+        """Inverse of _encode_cursor; parse_key validates the sort key (raises ValueError)"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+            sort_key, row_id = raw.split('|', 1)
+            parse_key(sort_key)
+        except ValueError as e:
+            raise ValueError(f"Invalid cursor: {cursor!r}") from e
+        if not all(ch.isalnum() or ch == '-' for ch in row_id):
+            raise ValueError(f"Invalid cursor: {cursor!r}")
+        return sort_key, row_id
+    
+    @traced
+    async def search_transactions(self, user_id: str, query: str, limit: int = 20, 
+                                  cursor: Optional[str] = None) -> Dict:
+        """Ranked full-text / fuzzy search over descriptions
+        
+        Every word is prefix-matched ("starbucks cof" finds "Starbucks Coffee"), and
+        trigram similarity catches typos. Backed by the search_transactions
+        database function (migration 0007_transaction_search.sql).
+        
+        Returns:
+            {'transactions': [...], 'next_cursor': str or None}, best match first
+        
+        Raises:
+            ValueError: if the cursor is malformed
+        """
+        query = query.strip()
+        if not self.supabase or not query:
+            return {'transactions': [], 'next_cursor': None}
+        
+        after = self._decode_cursor(cursor, float) if cursor else None
+        
+        try:
+            return await self.cache.get_or_load(
+                user_id, 'search', (query.lower(), limit, cursor),
+                lambda: self._fetch_search_page(user_id, query, limit, after)
+            )
+        except Exception as e:
+            log.error("Error searching transactions", error=str(e))
+            return {'transactions': [], 'next_cursor': None}
     
-    async def get_monthly_summary(self, user_id: str, year: int, month: int) -> Dict:
-        """Get monthly income and expense summary"""
+    async def _fetch_search_page(self, user_id: str, query: str, limit: int, 
+                                 after: Optional[Tuple[str, str]]) -> Dict:
+        response = self._execute('search_transactions', self.supabase.rpc('search_transactions', {
+            'p_user_id': user_id,
+            'p_query': query,
+            # One extra row tells us whether there is another page
+            'p_limit': limit + 1,
+            'p_after_rank': float(after[0]) if after else None,
+            'p_after_id': after[1] if after else None,
+        }))
+        
+        rows = response.data if response.data else []
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self._encode_cursor(repr(float(rows[-1]['rank'])), rows[-1]['id'])
+        return {'transactions': rows, 'next_cursor': next_cursor}
+    
+    @traced
+    async def get_monthly_summary(self, user_id: str, year: int, month: int, 
+                                  account_id: Optional[str] = None) -> Dict:
+        """Get monthly income and expense summary, optionally for a single account"""
         if not self.supabase:
             return {'income': 0, 'expenses': 0, 'savings': 0, 'savings_rate': 0}
         
         try:
-            # Calculate next month for date range
-            if month == 12:
-                next_month = 1
-                next_year = year + 1
-            else:
-                next_month = month + 1
-                next_year = year
-            
-            # Get all transactions for the month
-            response = self.supabase.table('transactions')\
-                .select('amount, transaction_type, transaction_date')\
-                .eq('user_id', user_id)\
-                .gte('transaction_date', f'{year}-{month:02d}-01')\
-                .lt('transaction_date', f'{next_year}-{next_month:02d}-01')\
-                .execute()
-            
-            transactions = response.data if response.data else []
-            
-            print(f"📊 Found {len(transactions)} transactions for {year}-{month:02d}")
-            
-            income = sum(t['amount'] for t in transactions if t['transaction_type'] == 'income')
-            expenses = sum(t['amount'] for t in transactions if t['transaction_type'] == 'expense')
+            return await self.cache.get_or_load(
+                user_id, 'monthly_summary', (year, month, account_id),
+                lambda: self._compute_monthly_summary(user_id, year, month, account_id)
+            )
+        except Exception as e:
+            log.error("Error fetching monthly summary", error=str(e))
+            return {'income': 0, 'expenses': 0, 'savings': 0, 'savings_rate': 0}
+    
+    async def _compute_monthly_summary(self, user_id: str, year: int, month: int, 
+                                       account_id: Optional[str]) -> Dict:
+        totals = (await self._get_month_totals(user_id, [(year, month)], account_id))[(year, month)]
+        income = totals['income_cents']
+        expenses = totals['expenses_cents']
+        
+        # If no data for current month, get all-time data (flagged, so clients do not
+        # apply this month's changes on top of it)
+        all_time = income == 0 and expenses == 0
+        if all_time:
+            log.debug("No transactions this month, using all-time totals", month=f"{year}-{month:02d}")
+            all_query = self.supabase.table(self._source_table(None))\
+                .select('amount_cents, transaction_type')\
+                .eq('user_id', user_id)
+            if account_id:
+                all_query = all_query.eq('account_id', account_id)
             
-            # If no data for current month, get all-time data
-            if income == 0 and expenses == 0:
-                print(f"⚠️ No transactions in {year}-{month:02d}, fetching all-time data...")
-                all_response = self.supabase.table('transactions')\
-                    .select('amount, transaction_type')\
-                    .eq('user_id', user_id)\
-                    .execute()
-                
-                all_transactions = all_response.data if all_response.data else []
-                income = sum(t['amount'] for t in all_transactions if t['transaction_type'] == 'income')
-                expenses = sum(t['amount'] for t in all_transactions if t['transaction_type'] == 'expense')
-                print(f"📊 All-time: Income=${income}, Expenses=${expenses}")
+            all_response = self._execute('get_monthly_summary', all_query)
             
-            return {
-                'income': income,
-                'expenses': expenses,
-                'savings': income - expenses,
-                'savings_rate': (income - expenses) / income * 100 if income > 0 else 0
+            all_transactions = all_response.data if all_response.data else []
+            income, expenses = split_income_expense(all_transactions)
+        
+        return {**self._summarize(income, expenses), 'all_time': all_time}
+    
+    @traced
+    async def get_monthly_summaries(self, user_id: str, start: Tuple[int, int], end: Tuple[int, int], 
+                                    account_id: Optional[str] = None) -> List[Dict]:
+        """Get per-month summaries for an inclusive (year, month) range, oldest first"""
+        if not self.supabase:
+            return []
+        
+        months = self._months_between(start, end)
+        
+        async def load() -> List[Dict]:
+            # The summaries themselves are cached: the totals' (year, month) keys are not JSON
+            totals = await self._get_month_totals(user_id, months, account_id)
+            return [
+                {
+                    'year': year,
+                    'month': month,
+                    **self._summarize(totals[(year, month)]['income_cents'], totals[(year, month)]['expenses_cents'])
+                }
+                for year, month in months
+            ]
+        
+        try:
+            return await self.cache.get_or_load(user_id, 'monthly_summaries', (start, end, account_id), load)
+        except Exception as e:
+            log.error("Error fetching monthly summaries", error=str(e))
+            return []
+    
+    @traced
+    async def get_year_over_year(self, user_id: str, year: int, 
+                                 account_id: Optional[str] = None) -> List[Dict]:
+        """Compare each month of a year with the same month of the previous year"""
+        summaries = await self.get_monthly_summaries(user_id, (year - 1, 1), (year, 12), account_id)
+        if not summaries:
+            return []
+        
+        previous, current = summaries[:12], summaries[12:]
+        return [
+            {
+                'month': now['month'],
+                'income': now['income'],
+                'expenses': now['expenses'],
+                'previous_income': before['income'],
+                'previous_expenses': before['expenses'],
+                'expenses_change': now['expenses'] - before['expenses']
             }
+            for before, now in zip(previous, current)
+        ]
+    
+    @staticmethod
+    def _summarize(income_cents: int, expenses_cents: int) -> Dict:
+        """Exact cents in, dollars out (the API/UI boundary)"""
+        savings_cents = income_cents - expenses_cents
+        return {
+            'income': from_cents(income_cents),
+            'expenses': from_cents(expenses_cents),
+            'savings': from_cents(savings_cents),
+            'savings_rate': savings_cents / income_cents * 100 if income_cents > 0 else 0
+        }
+    
+    @staticmethod
+    def _next_month(year: int, month: int) -> Tuple[int, int]:
+        return (year + 1, 1) if month == 12 else (year, month + 1)
+    
+    @classmethod
+    def _months_between(cls, start: Tuple[int, int], end: Tuple[int, int]) -> List[Tuple[int, int]]:
+        months = []
+        current = tuple(start)
+        while current <= tuple(end):
+            months.append(current)
+            current = cls._next_month(*current)
+        return months
+    
+    @staticmethod
+    def _is_closed_month(year: int, month: int) -> bool:
+        """Past months can only change through a backdated write"""
+        now = datetime.now()
+        return (year, month) < (now.year, now.month)
+    
+    def _get_month_versions(self, user_id: str, 
+                            months: List[Tuple[int, int]]) -> Optional[Dict[Tuple[int, int], int]]:
+        """Write counters per (year, month); None (snapshots unused) without the 0011
+        migration or while its trigger is missing, since the counters would then never move
+        """
+        try:
+            response = self._execute('get_month_versions', self.supabase.rpc('get_transaction_month_versions', {
+                'p_user_id': user_id,
+                'p_from_year': months[0][0],
+                'p_to_year': months[-1][0],
+            }))
         except Exception as e:
-            print(f"Error fetching monthly summary: {e}")
-            return {'income': 0, 'expenses': 0, 'savings': 0, 'savings_rate': 0}
+            log.warning("⚠️ Month versions unavailable, computing summaries live", error=str(e))
+            return None
+        return {(row['year'], row['month']): row['version'] for row in response.data or []}
     
-    async def get_total_balance(self, user_id: str) -> float:
-        """Calculate total balance from all transactions"""
+    async def _get_month_totals(self, user_id: str, months: List[Tuple[int, int]], 
+                                account_id: Optional[str]) -> Dict[Tuple[int, int], Dict]:
+        """Income/expense totals per month, served from snapshots where possible
+        
+        Closed months are read from monthly_summaries; any closed month without a
+        current snapshot is computed from raw rows (one range query for all of
+        them) and snapshotted. The open month is always computed live.
+        
+        A snapshot is current while its source_version matches the month's
+        counter in transaction_month_versions, which a trigger bumps on every
+        write. The counters are read before the rows, so a snapshot computed
+        alongside a backdated write is stamped with the old counter and
+        ignored from then on, whichever of the two is saved last.
+        """
+        snapshot_key = account_id or ''
+        totals: Dict[Tuple[int, int], Dict] = {}
+        closed = [m for m in months if self._is_closed_month(*m)]
+        versions = self._get_month_versions(user_id, closed) if closed else None
+        
+        if versions is not None:
+            response = self._execute('get_month_snapshots', self.supabase.table('monthly_summaries')\
+                .select('year, month, income_cents, expenses_cents, transaction_count, source_version')\
+                .eq('user_id', user_id)\
+                .eq('account_id', snapshot_key)\
+                .gte('year', closed[0][0])\
+                .lte('year', closed[-1][0]))
+            wanted = set(closed)
+            for row in response.data or []:
+                key = (row['year'], row['month'])
+                if key in wanted and row.get('source_version') == versions.get(key, 0):
+                    totals[key] = {
+                        'income_cents': row['income_cents'],
+                        'expenses_cents': row['expenses_cents'],
+                        'count': row['transaction_count']
+                    }
+        
+        missing = [m for m in months if m not in totals]
+        if not missing:
+            return totals
+        
+        first = missing[0]
+        after_last = self._next_month(*missing[-1])
+        query = self.supabase.table(self._source_table(date(first[0], first[1], 1)))\
+            .select('amount_cents, transaction_type, transaction_date')\
+            .eq('user_id', user_id)
+        if account_id:
+            query = query.eq('account_id', account_id)
+        
+        response = self._execute('get_month_totals', query\
+            .gte('transaction_date', f'{first[0]}-{first[1]:02d}-01')\
+            .lt('transaction_date', f'{after_last[0]}-{after_last[1]:02d}-01'))
+        
+        transactions = response.data if response.data else []
+        log.debug("Computed month totals", rows=len(transactions), months=len(missing), start=f"{first[0]}-{first[1]:02d}")
+        
+        by_month: Dict[Tuple[int, int], List[Dict]] = {m: [] for m in missing}
+        for t in transactions:
+            txn_date = str(t['transaction_date'])
+            key = (int(txn_date[:4]), int(txn_date[5:7]))
+            if key in by_month:
+                by_month[key].append(t)
+        
+        computed = {}
+        for key, rows in by_month.items():
+            income, expenses = split_income_expense(rows)
+            computed[key] = {'income_cents': income, 'expenses_cents': expenses, 'count': len(rows)}
+        totals.update(computed)
+        
+        snapshots = [
+            {
+                'user_id': user_id,
+                'account_id': snapshot_key,
+                'year': year,
+                'month': month,
+                'income_cents': computed[(year, month)]['income_cents'],
+                'expenses_cents': computed[(year, month)]['expenses_cents'],
+                'transaction_count': computed[(year, month)]['count'],
+                'source_version': versions.get((year, month), 0),
+                'computed_at': datetime.now().isoformat()
+            }
+            for year, month in missing if versions is not None and self._is_closed_month(year, month)
+        ]
+        if snapshots:
+            try:
+                self._execute('save_month_snapshots', self.supabase.table('monthly_summaries')\
+                    .upsert(snapshots, on_conflict='user_id,account_id,year,month'))
+            except Exception as e:
+                # Snapshots are an optimization; the totals above are still correct
+                log.error("Error saving monthly snapshots", error=str(e))
+        
+        return totals
+    
+    @traced
+    async def get_total_balance(self, user_id: str, account_id: Optional[str] = None) -> float:
+        """Calculate total balance from all transactions, optionally for a single account"""
         if not self.supabase:
             return 0.0
         
         try:
-            response = self.supabase.table('transactions')\
-                .select('amount, transaction_type')\
-                .eq('user_id', user_id)\
-                .execute()
-            
-            transactions = response.data if response.data else []
-            
-            balance = 0
-            for t in transactions:
-                if t['transaction_type'] == 'income':
-                    balance += t['amount']
-                else:
-                    balance -= t['amount']
-            
-            return balance
+            return await self.cache.get_or_load(
+                user_id, 'total_balance', (account_id,),
+                lambda: self._compute_total_balance(user_id, account_id)
+            )
         except Exception as e:
-            print(f"Error calculating balance: {e}")
+            log.error("Error calculating balance", error=str(e))
             return 0.0
     
-    async def check_duplicate(self, user_id: str, amount: float, 
+    async def _compute_total_balance(self, user_id: str, account_id: Optional[str]) -> float:
+        query = self.supabase.table(self._source_table(None))\
+            .select('amount_cents, transaction_type')\
+            .eq('user_id', user_id)
+        if account_id:
+            query = query.eq('account_id', account_id)
+        
+        response = self._execute('get_total_balance', query)
+        
+        transactions = response.data if response.data else []
+        
+        income, expenses = split_income_expense(transactions)
+        return from_cents(income - expenses)
+    
+    @traced
+    async def check_duplicate(self, user_id: str, amount_cents: Cents, 
                             description: str, date: datetime) -> bool:
         """Check if a transaction already exists (to avoid duplicates)"""
         if not self.supabase:
@@ -125,49 +519,143 @@ class TransactionService:
         
         try:
             # Check for transaction with same user, amount, description, and date
-            response = self.supabase.table('transactions')\
+            # (integer cents, so equality is exact where a float dollar match is not)
+            response = self._execute('check_duplicate', self.supabase.table(self._source_table(date.date()))\
                 .select('id')\
                 .eq('user_id', user_id)\
-                .eq('amount', amount)\
+                .eq('amount_cents', amount_cents)\
                 .eq('description', description)\
-                .eq('transaction_date', date.isoformat())\
-                .execute()
+                .eq('transaction_date', date.isoformat()))
             
-            return len(response.data) > 0
+            is_duplicate = len(response.data) > 0
+            DEDUPE_CHECKS.labels(result='hit' if is_duplicate else 'miss').inc()
+            return is_duplicate
         except Exception as e:
-            print(f"Error checking duplicate: {e}")
+            log.error("Error checking duplicate", error=str(e))
             return False
     
+    @traced
     async def add_transaction(self, user_id: str, amount: float, 
                             transaction_type: str, category: str, 
-                            description: str, date: datetime) -> bool:
-        """Add a new transaction (with duplicate detection)"""
+                            description: str, date: datetime, 
+                            account_id: Optional[str] = None,
+                            amount_cents: Optional[Cents] = None) -> bool:
+        """Add a new transaction (with duplicate detection)
+        
+        Pass amount_cents when the caller already parsed it; otherwise amount
+        (dollars as str/float/Decimal) is converted here.
+        """
         if not self.supabase:
-            print("❌ Error: Supabase not configured")
+            log.error("❌ Supabase not configured")
             return False
         
         try:
+            if amount_cents is None:
+                amount_cents = to_cents(amount)
+            
             # Check for duplicates first
-            is_duplicate = await self.check_duplicate(user_id, amount, description, date)
+            is_duplicate = await self.check_duplicate(user_id, amount_cents, description, date)
             if is_duplicate:
-                print(f"⚠️ Duplicate skipped: {description[:30]}...")
+                log.debug("Duplicate skipped", sample=True, user=user_id[:8])
                 return False
             
             data = {
                 'user_id': user_id,
-                'amount': amount,
+                # Exact decimal string; amount_cents is generated from it by Postgres
+                'amount': cents_to_decimal_str(amount_cents),
                 'transaction_type': transaction_type,
                 'category': category,
                 'description': description,
                 'transaction_date': date.isoformat()
             }
+            if account_id:
+                data['account_id'] = account_id
+            
+            response = self._execute('add_transaction', self.supabase.table('transactions').insert(data))
+            # Bump the user's data version so cached reads are never stale
+            self.cache.invalidate_user(user_id)
+            inserted = response.data[0] if response.data else {**data, 'amount_cents': amount_cents}
+            self.changes.on_write(user_id, 'added', inserted)
+            log.debug("Transaction inserted", sample=True, user=user_id[:8], cents=amount_cents)
+            return True
+        except Exception as e:
+            log.exception("❌ Error adding transaction", error=str(e))
+            return False
+    
+    @traced
+    async def get_plaid_items(self, user_id: str) -> List[Dict]:
+        """Get all linked Plaid items (bank connections) for a user"""
+        if not self.supabase:
+            return []
+        
+        try:
+            response = self._execute('get_plaid_items', self.supabase.table('plaid_items')\
+                .select('item_id, access_token, institution_name, last_synced_at')\
+                .eq('user_id', user_id))
             
-            print(f"📤 Inserting transaction: {description[:30]}... for user {user_id[:8]}...")
-            response = self.supabase.table('transactions').insert(data).execute()
-            print(f"✅ Transaction inserted successfully!")
+            return response.data if response.data else []
+        except Exception as e:
+            log.error("Error fetching Plaid items", error=str(e))
+            return []
+    
+    @traced
+    async def mark_plaid_item_synced(self, item_id: str) -> bool:
+        """Record the time a Plaid item was last synced"""
+        if not self.supabase:
+            return False
+        
+        try:
+            self._execute('mark_plaid_item_synced', self.supabase.table('plaid_items')\
+                .update({'last_synced_at': datetime.now().isoformat()})\
+                .eq('item_id', item_id))
             return True
         except Exception as e:
-            print(f"❌ Error adding transaction: {e}")
-            import traceback
-            traceback.print_exc()
+            log.error("Error updating Plaid item", error=str(e))
             return False
+    
+    @traced
+    async def upsert_accounts(self, user_id: str, item_id: Optional[str], accounts: List[Dict]) -> int:
+        """Insert or refresh the accounts belonging to a Plaid item"""
+        if not self.supabase or not accounts:
+            return 0
+        
+        try:
+            now = datetime.now().isoformat()
+            rows = [
+                {
+                    'account_id': account['account_id'],
+                    'user_id': user_id,
+                    'item_id': item_id,
+                    'name': account.get('name'),
+                    'mask': account.get('mask'),
+                    'type': account.get('type'),
+                    'subtype': account.get('subtype'),
+                    'current_balance': account.get('current'),
+                    'available_balance': account.get('available'),
+                    'iso_currency_code': account.get('iso_currency_code'),
+                    'updated_at': now
+                }
+                for account in accounts
+            ]
+            self._execute('upsert_accounts', self.supabase.table('accounts').upsert(rows, on_conflict='account_id'))
+            return len(rows)
+        except Exception as e:
+            log.error("Error saving accounts", error=str(e))
+            return 0
+    
+    @traced
+    async def get_accounts(self, user_id: str) -> List[Dict]:
+        """Get the persisted bank accounts for a user"""
+        if not self.supabase:
+            return []
+        
+        try:
+            response = self._execute('get_accounts', self.supabase.table('accounts')\
+                .select('*')\
+                .eq('user_id', user_id)\
+                .order('name'))
+            
+            return response.data if response.data else []
+        except Exception as e:
+            log.error("Error fetching accounts", error=str(e))
+            return []
@@ -1,7 +1,12 @@
 """AI-powered insights using Claude or local LLM"""
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from src.utils.config import Config
+from src.utils.money import from_cents
+from src.utils import tracing
+from src.utils.transaction_frame import TransactionFrame
+
+Transactions = Union[TransactionFrame, List[Dict[str, Any]]]
 
 try:
     from anthropic import Anthropic
@@ -21,16 +26,17 @@ class AIInsightsService:
             except:
                 pass
     
-    def analyze_spending(self, transactions: List[Dict[str, Any]]) -> str:
+    def analyze_spending(self, transactions: Transactions) -> str:
         """
         Analyze spending patterns and provide insights
         
         Args:
-            transactions: List of transaction dictionaries
+            transactions: TransactionFrame or list of transaction dictionaries
             
         Returns:
             AI-generated insights as a string
         """
+        transactions = TransactionFrame.coerce(transactions)
         if not self.client:
             return self._generate_basic_insights(transactions)
         
@@ -38,12 +44,13 @@ class AIInsightsService:
             # Prepare transaction summary for AI
             summary = self._prepare_transaction_summary(transactions)
             
-            message = self.client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=1024,
-                messages=[{
-                    "role": "user",
-                    "content": f"""Analyze these financial transactions and provide helpful insights:
+            with tracing.span('anthropic messages.create', kind='client', model="claude-3-5-sonnet-20241022"):
+                message = self.client.messages.create(
+                    model="claude-3-5-sonnet-20241022",
+                    max_tokens=1024,
+                    messages=[{
+                        "role": "user",
+                        "content": f"""Analyze these financial transactions and provide helpful insights:
 
 {summary}
 
@@ -54,36 +61,27 @@ Please provide:
 4. Overall financial health assessment
 
 Keep it concise and actionable."""
-                }]
-            )
+                    }]
+                )
             
             return message.content[0].text
             
         except Exception as e:
             return f"AI analysis unavailable: {str(e)}"
     
-    def _prepare_transaction_summary(self, transactions: List[Dict[str, Any]]) -> str:
+    def _prepare_transaction_summary(self, transactions: TransactionFrame) -> str:
         """Prepare transaction data for AI analysis"""
-        if not transactions:
+        if not len(transactions):
             return "No transactions available"
         
-        # Group by category
-        by_category = {}
-        total_income = 0
-        total_expenses = 0
+        total_income = from_cents(transactions.income_cents())
+        total_expenses = from_cents(transactions.expense_cents())
         
-        for t in transactions:
-            category = t.get('category', 'Uncategorized')
-            amount = t.get('amount', 0)
-            
-            if amount > 0:
-                total_income += amount
-            else:
-                total_expenses += abs(amount)
-                
-            if category not in by_category:
-                by_category[category] = 0
-            by_category[category] += abs(amount)
+        # Group spending by category
+        by_category = {
+            category: from_cents(cents)
+            for category, cents in transactions.expenses().sum_by_category().items()
+        }
         
         summary = f"Total Income: ${total_income:.2f}\n"
         summary += f"Total Expenses: ${total_expenses:.2f}\n"
@@ -95,22 +93,21 @@ Keep it concise and actionable."""
         
         return summary
     
-    def _generate_basic_insights(self, transactions: List[Dict[str, Any]]) -> str:
+    def _generate_basic_insights(self, transactions: TransactionFrame) -> str:
         """Generate basic insights without AI"""
-        if not transactions:
+        if not len(transactions):
             return "No transaction data available for analysis."
         
         # Calculate basic stats
-        total_income = sum(t['amount'] for t in transactions if t['amount'] > 0)
-        total_expenses = sum(abs(t['amount']) for t in transactions if t['amount'] < 0)
+        total_income = from_cents(transactions.income_cents())
+        total_expenses = from_cents(transactions.expense_cents())
         net = total_income - total_expenses
         
-        # Group by category
-        by_category = {}
-        for t in transactions:
-            category = t.get('category', 'Uncategorized')
-            amount = abs(t.get('amount', 0))
-            by_category[category] = by_category.get(category, 0) + amount
+        # Group spending by category
+        by_category = {
+            category: from_cents(cents)
+            for category, cents in transactions.expenses().sum_by_category().items()
+        }
         
         # Find top spending category
         top_category = max(by_category.items(), key=lambda x: x[1]) if by_category else ('None', 0)
@@ -126,7 +123,7 @@ Keep it concise and actionable."""
 💡 Basic Insights:
 • Savings Rate: {(net / total_income * 100) if total_income > 0 else 0:.1f}%
 • Transaction Count: {len(transactions)}
-• Average Transaction: ${(total_expenses / len(transactions)) if transactions else 0:.2f}
+• Average Transaction: ${(total_expenses / len(transactions)) if len(transactions) else 0:.2f}
 
 ⚠️ Note: Enable Claude API in .env for AI-powered insights!
 """
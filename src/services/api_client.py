@@ -1,17 +1,79 @@
 """API Client for communicating with FastAPI backend"""
 
+import json
+import threading
+import httpx
 import requests
-from typing import Dict, List, Optional, BinaryIO
-from datetime import datetime
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Optional, BinaryIO, Tuple
+from datetime import date, datetime
+from urllib.parse import urlsplit
+from ..utils import tracing
+from ..utils.log import get_logger
+from ..utils.transaction_frame import TransactionFrame
+from .api_models import expand_rows
+
+
+log = get_logger('api_client')
+
+
+class _TracedSession(requests.Session):
+    """Session that sends every call as a client span, with a traceparent header for the API"""
+    
+    def request(self, method, url, **kwargs):
+        with tracing.span(f"{method} {urlsplit(url).path}", kind='client') as span:
+            kwargs['headers'] = tracing.inject(kwargs.get('headers'))
+            response = super().request(method, url, **kwargs)
+            if span is not None:
+                span.set_attribute('http.status_code', response.status_code)
+            return response
 
 
 class APIClient:
     """Client for Budget Buddy FastAPI backend"""
     
+    # Last body and ETag per read URL, shared by every page's client since
+    # pages are rebuilt (with a new client) on each navigation
+    ETAG_CACHE_ENTRIES = 64
+    _etag_cache: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+    _etag_lock = threading.Lock()
+    
     def __init__(self, base_url: str = "http://localhost:8000"):
         """Initialize API client"""
         self.base_url = base_url
-        self.session = requests.Session()
+        self.session = _TracedSession()
+    
+    def _get_json(self, path: str, params: Dict, timeout: float = 10) -> Optional[Dict]:
+        """
+        GET a read endpoint, revalidating the cached body with If-None-Match
+        
+        Returns the decoded body (the cached one on 304), or None for other statuses.
+        """
+        url = requests.Request('GET', f"{self.base_url}{path}", params=params).prepare().url
+        with self._etag_lock:
+            cached = self._etag_cache.get(url)
+        headers = {'If-None-Match': cached[0]} if cached else None
+        
+        response = self.session.get(url, headers=headers, timeout=timeout)
+        
+        if response.status_code == 304 and cached:
+            with self._etag_lock:
+                if url in self._etag_cache:
+                    self._etag_cache.move_to_end(url)
+            return json.loads(cached[1])
+        if response.status_code != 200:
+            return None
+        
+        etag = response.headers.get('ETag')
+        with self._etag_lock:
+            if etag:
+                self._etag_cache[url] = (etag, response.content)
+                self._etag_cache.move_to_end(url)
+                while len(self._etag_cache) > self.ETAG_CACHE_ENTRIES:
+                    self._etag_cache.popitem(last=False)
+            else:
+                self._etag_cache.pop(url, None)
+        return response.json()
     
     def health_check(self) -> bool:
         """Check if API is running"""
@@ -78,10 +140,10 @@ class APIClient:
                 data = response.json()
                 return data.get('link_token')
             else:
-                print(f"❌ Plaid API error: {response.status_code} - {response.text}")
+                log.error("❌ Plaid API error", status=response.status_code, body=response.text[:200])
                 return None
         except Exception as e:
-            print(f"❌ Plaid API exception: {e}")
+            log.error("❌ Plaid API failed", error=str(e))
             return None
     
     async def exchange_plaid_token(self, public_token: str) -> Optional[str]:
@@ -107,55 +169,288 @@ class APIClient:
             else:
                 return None
         except Exception as e:
-            print(f"❌ Token exchange error: {e}")
+            log.error("❌ Token exchange failed", error=str(e))
             return None
     
-    async def get_transactions(self, user_id: str, limit: int = 10) -> List[Dict]:
+    async def sync_bank_accounts(self, user_id: str) -> Dict:
         """
-        Get user transactions from API
+        Sync all linked bank connections for a user
         
         Args:
             user_id: User ID
-            limit: Number of transactions to fetch
             
         Returns:
-            List of transactions
+            Dict with items and synced counts
+        """
+        try:
+            response = self.session.post(
+                f"{self.base_url}/api/plaid/sync",
+                params={'user_id': user_id},
+                timeout=60
+            )
+            
+            if response.status_code == 200:
+                return response.json()
+            else:
+                return {"success": False, "error": f"API returned {response.status_code}: {response.text}"}
+        except Exception as e:
+            log.error("❌ Bank sync failed", error=str(e))
+            return {"success": False, "error": str(e)}
+    
+    async def get_account_balances(self, user_id: str) -> Dict:
+        """
+        Get account balances across all linked banks
+        
+        Args:
+            user_id: User ID
+            
+        Returns:
+            Dict with accounts list and total
         """
         try:
             response = self.session.get(
-                f"{self.base_url}/api/transactions",
-                params={'user_id': user_id, 'limit': limit},
+                f"{self.base_url}/api/accounts/balances",
+                params={'user_id': user_id},
                 timeout=10
             )
             
             if response.status_code == 200:
                 data = response.json()
-                return data.get('transactions', [])
+                return {
+                    'accounts': data.get('accounts', []),
+                    'total': data.get('total', 0)
+                }
             else:
-                return []
+                return {'accounts': [], 'total': 0}
         except Exception as e:
-            print(f"❌ Get transactions error: {e}")
-            return []
+            log.error("❌ Get balances failed", error=str(e))
+            return {'accounts': [], 'total': 0}
     
-    async def get_summary(self, user_id: str) -> Dict:
+    async def get_accounts(self, user_id: str) -> List[Dict]:
         """
-        Get balance and monthly summary from API
+        Get the user's persisted bank accounts
         
         Args:
             user_id: User ID
             
         Returns:
-            Dict with balance and summary
+            List of accounts
         """
         try:
             response = self.session.get(
-                f"{self.base_url}/api/summary",
+                f"{self.base_url}/api/accounts",
                 params={'user_id': user_id},
                 timeout=10
             )
             
             if response.status_code == 200:
-                data = response.json()
+                return response.json().get('accounts', [])
+            else:
+                return []
+        except Exception as e:
+            log.error("❌ Get accounts failed", error=str(e))
+            return []
+    
+    async def get_transactions(self, user_id: str, limit: int = 10, 
+                               account_id: Optional[str] = None, **filters) -> List[Dict]:
+        """
+        Get user transactions from API
+        
+        Args:
+            user_id: User ID
+            limit: Number of transactions to fetch
+            account_id: Only return transactions for this account
+            **filters: Filters accepted by get_transaction_page
+            
+        Returns:
+            List of transactions
+        """
+        page = await self.get_transaction_page(user_id, limit, account_id=account_id, **filters)
+        return page['transactions']
+    
+    async def get_transaction_page(self, user_id: str, limit: int = 10, cursor: Optional[str] = None, 
+                                   account_id: Optional[str] = None, 
+                                   start_date: Optional[date] = None, end_date: Optional[date] = None, 
+                                   categories: Optional[List[str]] = None, 
+                                   transaction_type: Optional[str] = None, 
+                                   min_amount: Optional[float] = None, max_amount: Optional[float] = None, 
+                                   merchant: Optional[str] = None) -> Dict:
+        """
+        Get one page of filtered transactions (filtering happens in the database)
+        
+        Args:
+            user_id: User ID
+            limit: Page size
+            cursor: next_cursor from the previous page
+            start_date / end_date: Inclusive date range
+            categories: Only these categories
+            transaction_type: 'income' or 'expense'
+            min_amount / max_amount: Inclusive amount range in dollars
+            merchant: Description substring
+            
+        Returns:
+            {'transactions': [...], 'next_cursor': str or None}
+        """
+        try:
+            params = {'user_id': user_id, 'limit': limit, 'format': 'compact'}
+            optional = {
+                'cursor': cursor,
+                'account_id': account_id,
+                'start_date': start_date.isoformat() if start_date else None,
+                'end_date': end_date.isoformat() if end_date else None,
+                'category': categories,
+                'type': transaction_type,
+                'min_amount': min_amount,
+                'max_amount': max_amount,
+                'merchant': merchant,
+            }
+            params.update({key: value for key, value in optional.items() if value is not None})
+            
+            data = self._get_json("/api/transactions", params)
+            
+            if data is not None:
+                return {
+                    'transactions': expand_rows(data),
+                    'next_cursor': data.get('next_cursor')
+                }
+            else:
+                return {'transactions': [], 'next_cursor': None}
+        except Exception as e:
+            log.error("❌ Get transactions failed", error=str(e))
+            return {'transactions': [], 'next_cursor': None}
+    
+    async def search_transactions(self, user_id: str, query: str, limit: int = 20, 
+                                  cursor: Optional[str] = None) -> Dict:
+        """
+        Search transaction descriptions, best match first
+        
+        Args:
+            user_id: User ID
+            query: Search text (words are prefix-matched)
+            limit: Page size
+            cursor: next_cursor from the previous page
+            
+        Returns:
+            {'transactions': [...], 'next_cursor': str or None}
+        """
+        try:
+            params = {'user_id': user_id, 'q': query, 'limit': limit, 'format': 'compact'}
+            if cursor:
+                params['cursor'] = cursor
+            
+            data = self._get_json("/api/transactions/search", params)
+            
+            if data is not None:
+                return {
+                    'transactions': expand_rows(data),
+                    'next_cursor': data.get('next_cursor')
+                }
+            else:
+                return {'transactions': [], 'next_cursor': None}
+        except Exception as e:
+            log.error("❌ Search transactions failed", error=str(e))
+            return {'transactions': [], 'next_cursor': None}
+    
+    async def get_transaction_frame(self, user_id: str, limit: int = 10, 
+                                    account_id: Optional[str] = None, **filters) -> TransactionFrame:
+        """Get user transactions as a columnar TransactionFrame (parsed once)"""
+        return TransactionFrame.from_records(await self.get_transactions(user_id, limit, account_id, **filters))
+    
+    async def add_transaction(self, user_id: str, description: str, amount: float, 
+                              category: str, transaction_type: str, date: datetime) -> bool:
+        """
+        Add a single transaction through the API
+        
+        Args:
+            user_id: User ID
+            description: Transaction description
+            amount: Positive amount
+            category: Category name
+            transaction_type: 'income' or 'expense'
+            date: Transaction date
+            
+        Returns:
+            True if the transaction was inserted
+        """
+        try:
+            response = self.session.post(
+                f"{self.base_url}/api/transactions",
+                json={
+                    'user_id': user_id,
+                    'description': description,
+                    'amount': amount,
+                    'category': category,
+                    'transaction_type': transaction_type,
+                    'date': date.strftime('%Y-%m-%d')
+                },
+                timeout=10
+            )
+            
+            if response.status_code == 200:
+                return response.json().get('success', False)
+            else:
+                return False
+        except Exception as e:
+            log.error("❌ Add transaction failed", error=str(e))
+            return False
+    
+    async def stream_changes(self, user_id: str, 
+                             last_event_id: Optional[str] = None) -> AsyncIterator[Tuple[Optional[str], Dict]]:
+        """
+        Follow the user's change feed (server-sent events from /api/changes)
+        
+        Args:
+            user_id: User ID
+            last_event_id: Id of the last event seen, to resume after a disconnect
+            
+        Yields:
+            (event_id, event) until the connection drops; connection errors are raised
+        """
+        headers = {'Accept': 'text/event-stream'}
+        if last_event_id:
+            headers['Last-Event-ID'] = last_event_id
+        # The server sends a heartbeat every 15s, so a silent minute means the stream is dead
+        timeout = httpx.Timeout(10, read=60)
+        
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            async with client.stream('GET', f"{self.base_url}/api/changes", 
+                                     params={'user_id': user_id}, headers=headers) as response:
+                response.raise_for_status()
+                event_id, data = last_event_id, []
+                async for line in response.aiter_lines():
+                    if not line:
+                        if data:
+                            yield event_id, json.loads('\n'.join(data))
+                        data = []
+                        continue
+                    if line.startswith(':'):
+                        continue  # Heartbeat comment
+                    field, _, value = line.partition(':')
+                    value = value[1:] if value.startswith(' ') else value
+                    if field == 'id':
+                        event_id = value
+                    elif field == 'data':
+                        data.append(value)
+    
+    async def get_summary(self, user_id: str, account_id: Optional[str] = None) -> Dict:
+        """
+        Get balance and monthly summary from API
+        
+        Args:
+            user_id: User ID
+            account_id: Only summarize this account
+            
+        Returns:
+            Dict with balance and summary
+        """
+        try:
+            params = {'user_id': user_id}
+            if account_id:
+                params['account_id'] = account_id
+            
+            data = self._get_json("/api/summary", params)
+            
+            if data is not None:
                 return {
                     'balance': data.get('balance', 0),
                     'summary': data.get('summary', {})
@@ -166,7 +461,7 @@ class APIClient:
                     'summary': {'income': 0, 'expenses': 0, 'savings': 0, 'savings_rate': 0}
                 }
         except Exception as e:
-            print(f"❌ Get summary error: {e}")
+            log.error("❌ Get summary failed", error=str(e))
             return {
                 'balance': 0,
                 'summary': {'income': 0, 'expenses': 0, 'savings': 0, 'savings_rate': 0}
@@ -0,0 +1,115 @@
+"""Response schemas for the API, shared by api.py and APIClient
+
+Transaction lists carry only the fields the views use (TRANSACTION_FIELDS).
+With format=compact they are sent as one array per row in that field order
+instead of one object per row, which halves the payload of a 1000-row page:
+
+    {"success": true, "fields": ["id", "transaction_date", ...],
+     "rows": [["8c0f...", "2025-10-03", "Grocery Store", ...], ...], "next_cursor": null}
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+from ..utils.money import from_cents
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+class Transaction(BaseModel):
+    id: str
+    transaction_date: str  # YYYY-MM-DD
+    description: Optional[str] = None
+    category: Optional[str] = None
+    transaction_type: str
+    amount_cents: int
+    account_id: Optional[str] = None
+
+
+TRANSACTION_FIELDS = tuple(Transaction.model_fields)
+TRANSACTION_COLUMNS = ', '.join(TRANSACTION_FIELDS)  # PostgREST select list
+
+
+class TransactionPage(BaseModel):
+    success: bool = True
+    transactions: List[Transaction]
+    next_cursor: Optional[str] = None
+
+
+class MonthlySummary(BaseModel):
+    income: float
+    expenses: float
+    savings: float
+    savings_rate: float
+
+
+class CurrentSummary(MonthlySummary):
+    all_time: bool = False  # The month has no transactions yet; totals are all-time
+
+
+class SummaryResponse(BaseModel):
+    success: bool = True
+    balance: float
+    summary: CurrentSummary
+
+
+class MonthSummary(MonthlySummary):
+    year: int
+    month: int
+
+
+class SummaryHistoryResponse(BaseModel):
+    success: bool = True
+    months: List[MonthSummary]
+
+
+class MonthComparison(BaseModel):
+    month: int
+    income: float
+    expenses: float
+    previous_income: float
+    previous_expenses: float
+    expenses_change: float
+
+
+class YearOverYearResponse(BaseModel):
+    success: bool = True
+    months: List[MonthComparison]
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when installed (compact separators otherwise)"""
+
+    def render(self, content: Any) -> bytes:
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(content)
+        return json.dumps(content, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def compact_page(rows: List[Dict], next_cursor: Optional[str],
+                 headers: Optional[Dict[str, str]] = None) -> FastJSONResponse:
+    """A transaction page as arrays in TRANSACTION_FIELDS order"""
+    return FastJSONResponse({
+        'success': True,
+        'fields': TRANSACTION_FIELDS,
+        'rows': [[row.get(field) for field in TRANSACTION_FIELDS] for row in rows],
+        'next_cursor': next_cursor,
+    }, headers=headers)
+
+
+def expand_rows(data: Dict) -> List[Dict]:
+    """Row dicts from a transaction page in either encoding, with `amount` in dollars for display"""
+    if 'rows' in data:
+        fields = data['fields']
+        rows = [dict(zip(fields, values)) for values in data['rows']]
+    else:
+        rows = data.get('transactions', [])
+    for row in rows:
+        if row.get('amount_cents') is not None:
+            row['amount'] = from_cents(row['amount_cents'])
+    return rows
@@ -0,0 +1,77 @@
+"""Map Plaid categories onto Budget Buddy's category taxonomy"""
+
+import json
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from ..utils.config import Config
+
+
+DEFAULT_CATEGORY = 'Other'
+LEGACY_SEPARATOR = ' > '
+
+
+class CategoryMapper:
+    """Precompiled Plaid -> budget category lookup
+
+    Resolution order, most specific first:
+      1. personal_finance_category.detailed (e.g. FOOD_AND_DRINK_GROCERIES)
+      2. personal_finance_category.primary (e.g. FOOD_AND_DRINK)
+      3. Legacy category hierarchy, longest matching prefix
+         (e.g. ["Shops", "Supermarkets and Groceries"] before ["Shops"])
+    """
+
+    def __init__(self, mapping: Dict[str, Dict[str, str]]):
+        self.pfc = {key.upper(): value for key, value in mapping.get('personal_finance_category', {}).items()}
+        # Legacy paths are compiled to lowercase tuples so lookups skip string joins
+        self.legacy = {
+            tuple(part.strip().lower() for part in key.split(LEGACY_SEPARATOR)): value
+            for key, value in mapping.get('legacy', {}).items()
+        }
+        self._memo: Dict[Tuple, str] = {}
+
+    @staticmethod
+    def _key(plaid_txn: Any) -> Tuple:
+        """Reduce a Plaid transaction to the fields that decide its category"""
+        pfc = plaid_txn.get('personal_finance_category') or {}
+        legacy = plaid_txn.get('category') or ()
+        return (
+            str(pfc.get('detailed') or '').upper(),
+            str(pfc.get('primary') or '').upper(),
+            tuple(str(part).lower() for part in legacy),
+        )
+
+    def _resolve(self, key: Tuple) -> str:
+        detailed, primary, legacy = key
+        if detailed in self.pfc:
+            return self.pfc[detailed]
+        if primary in self.pfc:
+            return self.pfc[primary]
+        for depth in range(len(legacy), 0, -1):
+            category = self.legacy.get(legacy[:depth])
+            if category:
+                return category
+        return DEFAULT_CATEGORY
+
+    def map(self, plaid_txn: Any) -> str:
+        """Category for a single Plaid transaction"""
+        key = self._key(plaid_txn)
+        category = self._memo.get(key)
+        if category is None:
+            category = self._memo[key] = self._resolve(key)
+        return category
+
+    def map_many(self, plaid_txns: Iterable[Any]) -> List[str]:
+        """Categories for a batch of Plaid transactions
+
+        Plaid histories reuse a few dozen category combinations, so each
+        distinct one is resolved once and the rest are dictionary hits.
+        """
+        return [self.map(txn) for txn in plaid_txns]
+
+
+@lru_cache(maxsize=1)
+def get_category_mapper(path: Optional[str] = None) -> CategoryMapper:
+    """Load the category map once per process"""
+    map_path = path or Config.ASSETS_DIR / 'data' / 'plaid_category_map.json'
+    with open(map_path, encoding='utf-8') as f:
+        return CategoryMapper(json.load(f))
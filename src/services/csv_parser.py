@@ -1,20 +1,25 @@
 """CSV parser for importing bank statements"""
 
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
+from ..utils.money import to_cents, from_cents, cents_array, split_income_expense
 
 
 class CSVParser:
     """Parse CSV files from various bank formats"""
     
     @staticmethod
-    def parse_generic_csv(file_path: str) -> List[Dict[str, Any]]:
+    def parse_generic_csv(file_path: str, errors: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
         Parse a generic CSV file with transactions
         
         Expected columns: date, description, amount, type, category, user_id (optional)
         
+        Rows with a missing or unparseable amount are dropped rather than failing
+        the whole file; pass a list as errors to collect a message for each.
+        
         Returns:
             List of transaction dictionaries
         """
@@ -42,22 +47,46 @@ class CSVParser:
             if 'date' not in standardized or 'amount' not in standardized:
                 raise ValueError("CSV must contain 'date' and 'amount' columns")
             
+            # Signed integer cents for the whole column at once; text columns
+            # ("$1,234.50", "(12.00)") go through the exact Decimal parser
+            amounts = df[standardized['amount']]
+            if pd.api.types.is_numeric_dtype(amounts):
+                valid = np.isfinite(amounts.to_numpy(dtype=np.float64))
+                signed_cents = np.zeros(len(amounts), dtype=np.int64)
+                signed_cents[valid] = cents_array(amounts[valid])
+            else:
+                valid = np.ones(len(amounts), dtype=bool)
+                signed_cents = np.zeros(len(amounts), dtype=np.int64)
+                for i, value in enumerate(amounts):
+                    try:
+                        signed_cents[i] = to_cents(value)
+                    except ValueError:
+                        valid[i] = False
+            
+            if errors is not None:
+                values = amounts.tolist()  # Python scalars, so NaN reads "nan" not "np.float64(nan)"
+                for i in np.flatnonzero(~valid):
+                    errors.append(f"Row {i + 2}: Invalid amount: {values[i]!r}")
+            
             # Parse transactions
             transactions = []
-            for _, row in df.iterrows():
-                amount = float(row[standardized['amount']])
+            for (_, row), cents, is_valid in zip(df.iterrows(), signed_cents, valid):
+                if not is_valid:
+                    continue
+                cents = int(cents)
                 
                 # Determine transaction type
                 if 'type' in standardized:
                     txn_type = str(row[standardized['type']]).lower()
                 else:
                     # Infer from amount
-                    txn_type = 'income' if amount > 0 else 'expense'
+                    txn_type = 'income' if cents > 0 else 'expense'
                 
                 transaction = {
                     'date': str(row[standardized['date']]),
                     'description': str(row[standardized.get('description', '')]) if 'description' in standardized else 'Unknown',
-                    'amount': abs(amount),  # Always positive
+                    'amount': from_cents(abs(cents)),  # Always positive
+                    'amount_cents': abs(cents),
                     'transaction_type': txn_type,
                     'category': str(row[standardized.get('category', '')]) if 'category' in standardized else 'Uncategorized',
                     'user_id': str(row[standardized.get('user_id', '')]) if 'user_id' in standardized else None
@@ -70,22 +99,27 @@ class CSVParser:
             raise ValueError(f"Failed to parse CSV: {str(e)}")
     
     @staticmethod
-    def get_summary(transactions: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Get summary statistics from transactions"""
+    def get_summary(transactions: List[Dict[str, Any]], skipped_rows: int = 0) -> Dict[str, Any]:
+        """Get summary statistics from transactions
+        
+        skipped_rows is the number of rows parse_generic_csv dropped (len(errors)).
+        """
         if not transactions:
             return {
                 'total_transactions': 0,
+                'skipped_rows': skipped_rows,
                 'total_income': 0,
                 'total_expenses': 0,
                 'net': 0
             }
         
-        total_income = sum(t['amount'] for t in transactions if t['amount'] > 0)
-        total_expenses = sum(abs(t['amount']) for t in transactions if t['amount'] < 0)
+        # Parsed amounts are always positive, so the type decides the direction
+        total_income, total_expenses = split_income_expense(transactions)
         
         return {
             'total_transactions': len(transactions),
-            'total_income': total_income,
-            'total_expenses': total_expenses,
-            'net': total_income - total_expenses
+            'skipped_rows': skipped_rows,
+            'total_income': from_cents(total_income),
+            'total_expenses': from_cents(total_expenses),
+            'net': from_cents(total_income - total_expenses)
         }
@@ -0,0 +1,308 @@
+"""Non-blocking wrapper around the synchronous plaid-python SDK"""
+
+import asyncio
+import json
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional
+from ..utils.config import Config
+from ..utils.metrics import PLAID_REQUEST_SECONDS, PLAID_RETRIES
+from ..utils.tracing import set_attribute, span
+from ..utils.log import get_logger
+
+
+log = get_logger('plaid')
+
+# Plaid error codes that are worth retrying (everything else fails fast)
+RETRYABLE_ERROR_CODES = {
+    'RATE_LIMIT_EXCEEDED',
+    'INTERNAL_SERVER_ERROR',
+    'PLANNED_MAINTENANCE',
+    'INSTITUTION_DOWN',
+    'INSTITUTION_NOT_RESPONDING',
+    'PRODUCT_NOT_READY',
+}
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class PlaidUnavailableError(Exception):
+    """Raised when the circuit breaker for a Plaid environment is open"""
+
+
+class CircuitBreaker:
+    """Simple consecutive-failure circuit breaker (closed -> open -> half-open)
+
+    While half-open, a single probe call goes through; everyone else is
+    rejected until it succeeds (closed) or fails (open again).
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current breaker state"""
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def acquire(self) -> Optional[str]:
+        """Admit a call: 'call' when closed, 'probe' for the one half-open probe, None if rejected"""
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return 'call'
+            if state == 'open' or self._probing:
+                return None
+            self._probing = True
+            return 'probe'
+
+    def release(self):
+        """Give up the probe slot without a verdict (the probe ended in a client error)"""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        """Close the breaker after a successful call"""
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        """Count a failure and open the breaker once the threshold is hit"""
+        with self._lock:
+            self._probing = False
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                # Re-opening from half-open restarts the cool-down window
+                self.opened_at = time.monotonic()
+
+
+# One breaker per Plaid environment, shared by every client in the process
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(environment: str) -> CircuitBreaker:
+    """Get (or create) the circuit breaker for a Plaid environment"""
+    with _breakers_lock:
+        if environment not in _breakers:
+            _breakers[environment] = CircuitBreaker(
+                Config.PLAID_BREAKER_THRESHOLD,
+                Config.PLAID_BREAKER_RESET
+            )
+        return _breakers[environment]
+
+
+def _load_models() -> SimpleNamespace:
+    """Import the plaid request model classes once"""
+    from plaid.model.link_token_create_request import LinkTokenCreateRequest
+    from plaid.model.link_token_create_request_user import LinkTokenCreateRequestUser
+    from plaid.model.products import Products
+    from plaid.model.country_code import CountryCode
+    from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
+    from plaid.model.transactions_get_request import TransactionsGetRequest
+    from plaid.model.transactions_get_request_options import TransactionsGetRequestOptions
+    from plaid.model.accounts_balance_get_request import AccountsBalanceGetRequest
+
+    return SimpleNamespace(
+        LinkTokenCreateRequest=LinkTokenCreateRequest,
+        LinkTokenCreateRequestUser=LinkTokenCreateRequestUser,
+        Products=Products,
+        CountryCode=CountryCode,
+        ItemPublicTokenExchangeRequest=ItemPublicTokenExchangeRequest,
+        TransactionsGetRequest=TransactionsGetRequest,
+        TransactionsGetRequestOptions=TransactionsGetRequestOptions,
+        AccountsBalanceGetRequest=AccountsBalanceGetRequest,
+    )
+
+
+def is_retryable(error: Exception) -> bool:
+    """Decide whether a Plaid call failure is transient"""
+    if isinstance(error, (ConnectionError, TimeoutError, asyncio.TimeoutError)):
+        return True
+
+    status = getattr(error, 'status', None)
+    if status is None:
+        # urllib3 raises its own connection/timeout errors outside ApiException
+        module = type(error).__module__ or ''
+        return module.startswith('urllib3')
+
+    if status in RETRYABLE_STATUS_CODES:
+        return True
+
+    try:
+        body = json.loads(getattr(error, 'body', None) or '{}')
+    except (TypeError, ValueError):
+        return False
+    return body.get('error_code') in RETRYABLE_ERROR_CODES
+
+
+class PlaidClient:
+    """Runs plaid-python calls off the event loop with retries and a circuit breaker"""
+
+    def __init__(self, api, environment: str, models: Optional[SimpleNamespace] = None):
+        """
+        Wrap a plaid_api.PlaidApi instance
+
+        Args:
+            api: Configured PlaidApi (or anything exposing the same methods)
+            environment: Plaid environment name, used to pick the circuit breaker
+            models: Request model classes (defaults to the plaid-python models)
+        """
+        self.api = api
+        self.environment = environment
+        self.models = models or _load_models()
+        self.breaker = get_circuit_breaker(environment)
+        self.max_retries = Config.PLAID_MAX_RETRIES
+        self.backoff_base = Config.PLAID_BACKOFF_BASE
+        self.timeout = Config.PLAID_TIMEOUT
+        self.max_workers = Config.PLAID_MAX_WORKERS
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix=f"plaid-{environment}"
+        )
+        # Timed-out calls whose thread is still blocked in the SDK
+        self._abandoned = 0
+        self._abandoned_lock = threading.Lock()
+
+    async def _call(self, method: Callable, request: Any) -> Any:
+        """Run a blocking SDK call in the Plaid executor, retrying transient errors"""
+        operation = getattr(method, '__name__', 'unknown')
+        start = time.perf_counter()
+        status = 'error'
+        try:
+            with span(f"plaid {operation}", kind='client', **{'plaid.environment': self.environment}):
+                response = await self._call_with_retries(method, request, operation)
+            status = 'ok'
+            return response
+        except PlaidUnavailableError:
+            status = 'circuit_open'
+            raise
+        finally:
+            PLAID_REQUEST_SECONDS.labels(operation=operation, status=status).observe(time.perf_counter() - start)
+
+    def _abandon(self, future: Future):
+        """Count a timed-out call against the executor until its thread returns"""
+        with self._abandoned_lock:
+            self._abandoned += 1
+
+        def finished(_):
+            with self._abandoned_lock:
+                self._abandoned -= 1
+
+        future.add_done_callback(finished)
+
+    async def _run(self, method: Callable, request: Any) -> Any:
+        """One SDK call in the executor, bounded by the timeout
+
+        A timed-out call cannot be interrupted, so its thread stays busy until
+        the SDK returns; once every worker is stuck like that, calls fail fast
+        instead of queueing behind them.
+        """
+        if self._abandoned >= self.max_workers:
+            raise PlaidUnavailableError(f"Plaid {self.environment} workers all blocked on timed-out calls")
+
+        future = self.executor.submit(method, request)
+        wrapped = asyncio.wrap_future(future)
+        try:
+            return await asyncio.wait_for(asyncio.shield(wrapped), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            # Nobody awaits the result any more; retrieve it so it is not logged as lost
+            wrapped.add_done_callback(lambda f: f.cancelled() or f.exception())
+            if not future.cancel():
+                self._abandon(future)
+            raise
+
+    async def _call_with_retries(self, method: Callable, request: Any, operation: str) -> Any:
+        attempt = 0
+
+        while True:
+            admitted = self.breaker.acquire()
+            if admitted is None:
+                raise PlaidUnavailableError(
+                    f"Plaid {self.environment} circuit open after {self.breaker.failures} failures"
+                )
+
+            try:
+                response = await self._run(method, request)
+            except Exception as e:
+                if not is_retryable(e):
+                    # Client errors (bad token, invalid request) say nothing about Plaid's health
+                    if admitted == 'probe':
+                        self.breaker.release()
+                    raise
+
+                self.breaker.record_failure()
+                if attempt >= self.max_retries:
+                    raise
+                if isinstance(e, asyncio.TimeoutError) and self._abandoned:
+                    # Retrying would only queue behind the call that is still blocked
+                    raise
+
+                # Exponential backoff with full jitter
+                delay = random.uniform(0, self.backoff_base * (2 ** attempt))
+                attempt += 1
+                PLAID_RETRIES.labels(operation=operation).inc()
+                set_attribute('plaid.retries', attempt)
+                log.warning("⚠️ Plaid call failed, retrying", operation=operation, error=e.__class__.__name__,
+                            attempt=attempt, max_retries=self.max_retries, delay=round(delay, 2))
+                await asyncio.sleep(delay)
+            except BaseException:
+                # Cancelled mid-call: don't leave the probe slot taken
+                if admitted == 'probe':
+                    self.breaker.release()
+                raise
+            else:
+                self.breaker.record_success()
+                return response
+
+    async def link_token_create(self, user_id: str, client_name: str) -> Any:
+        """Create a Link token for the given user"""
+        m = self.models
+        request = m.LinkTokenCreateRequest(
+            user=m.LinkTokenCreateRequestUser(client_user_id=user_id),
+            client_name=client_name,
+            products=[m.Products("transactions")],
+            country_codes=[m.CountryCode("US")],
+            language="en"
+        )
+        return await self._call(self.api.link_token_create, request)
+
+    async def item_public_token_exchange(self, public_token: str) -> Any:
+        """Exchange a Link public token for an access token"""
+        request = self.models.ItemPublicTokenExchangeRequest(public_token=public_token)
+        return await self._call(self.api.item_public_token_exchange, request)
+
+    async def transactions_get(self, access_token: str, start_date: date, end_date: date,
+                               count: int = 100, offset: int = 0) -> Any:
+        """Fetch one page of transactions for an item"""
+        m = self.models
+        request = m.TransactionsGetRequest(
+            access_token=access_token,
+            start_date=start_date,
+            end_date=end_date,
+            options=m.TransactionsGetRequestOptions(count=count, offset=offset)
+        )
+        return await self._call(self.api.transactions_get, request)
+
+    async def accounts_balance_get(self, access_token: str) -> Any:
+        """Fetch real-time balances for every account on an item"""
+        request = self.models.AccountsBalanceGetRequest(access_token=access_token)
+        return await self._call(self.api.accounts_balance_get, request)
+
+    def close(self):
+        """Shut down the executor"""
+        self.executor.shutdown(wait=False)
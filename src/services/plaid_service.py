@@ -1,46 +1,73 @@
 """Plaid service for bank integration"""
 
-from typing import Dict, List, Optional
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 from ..utils.config import Config
+from .plaid_client import PlaidClient
+from .category_mapping import get_category_mapper
+from ..utils.money import to_cents, from_cents, sum_cents
+from ..utils.tracing import traced
+from ..utils.log import get_logger
+
+
+log = get_logger('plaid')
 
 
 class PlaidService:
     """Service for Plaid bank integration"""
     
+    # Plaid's maximum page size for transactions/get
+    PAGE_SIZE = 500
+    
     def __init__(self):
         """Initialize Plaid service"""
         self.client = None
+        self.category_mapper = get_category_mapper()
+        # access_token -> (fetched_at, accounts), oldest first; bounded by PLAID_BALANCE_CACHE_SIZE
+        self._balance_cache: "OrderedDict[str, Tuple[float, List[Dict]]]" = OrderedDict()
         self._initialize()
     
     def _initialize(self):
         """Initialize Plaid client"""
+        if Config.PLAID_ENV.lower() == 'local' and not Config.PLAID_HOST:
+            # In-process stand-in, no credentials or network needed
+            from .plaid_standin import FakePlaid, request_models
+            self.client = PlaidClient(FakePlaid.from_config(), 'local', models=request_models())
+            log.info("✅ Plaid stand-in running in-process")
+            return
+        
         try:
             import plaid
             from plaid.api import plaid_api
             
-            if Config.PLAID_CLIENT_ID and Config.PLAID_SECRET:
+            if (Config.PLAID_CLIENT_ID and Config.PLAID_SECRET) or Config.PLAID_HOST:
                 configuration = plaid.Configuration(
                     host=self._get_plaid_host(),
                     api_key={
-                        'clientId': Config.PLAID_CLIENT_ID,
-                        'secret': Config.PLAID_SECRET,
+                        'clientId': Config.PLAID_CLIENT_ID or 'local',
+                        'secret': Config.PLAID_SECRET or 'local',
                     }
                 )
                 api_client = plaid.ApiClient(configuration)
-                self.client = plaid_api.PlaidApi(api_client)
-                print("✅ Plaid connected successfully!")
+                self.client = PlaidClient(plaid_api.PlaidApi(api_client), Config.PLAID_ENV.lower())
+                log.info("✅ Plaid connected", environment=Config.PLAID_ENV)
             else:
-                print("⚠️ Plaid credentials not configured")
+                log.warning("⚠️ Plaid credentials not configured")
         except ImportError:
-            print("⚠️ plaid-python not installed. Run: pip install plaid-python")
+            log.warning("⚠️ plaid-python not installed. Run: pip install plaid-python")
         except Exception as e:
-            print(f"⚠️ Plaid initialization error: {e}")
+            log.warning("⚠️ Plaid initialization error", error=str(e))
     
     def _get_plaid_host(self):
         """Get Plaid API host based on environment"""
         import plaid
         
+        if Config.PLAID_HOST:
+            return Config.PLAID_HOST
+        
         env = Config.PLAID_ENV.lower()
         if env == 'sandbox':
             return plaid.Environment.Sandbox
@@ -49,139 +76,266 @@ class PlaidService:
         else:
             return plaid.Environment.Production
     
+    @traced
     async def create_link_token(self, user_id: str) -> Optional[str]:
         """Create a Link token for Plaid Link UI"""
         if not self.client:
-            print("❌ Plaid client not initialized")
+            log.error("❌ Plaid client not initialized")
             return None
         
         try:
-            import plaid
-            from plaid.model.link_token_create_request import LinkTokenCreateRequest
-            from plaid.model.link_token_create_request_user import LinkTokenCreateRequestUser
-            from plaid.model.products import Products
-            from plaid.model.country_code import CountryCode
-            
-            request = LinkTokenCreateRequest(
-                user=LinkTokenCreateRequestUser(client_user_id=user_id),
-                client_name="Budget Buddy",
-                products=[Products("transactions")],
-                country_codes=[CountryCode("US")],
-                language="en"
-            )
-            
-            response = self.client.link_token_create(request)
-            print(f"✅ Link token created successfully")
+            response = await self.client.link_token_create(user_id, client_name="Budget Buddy")
+            log.info("✅ Link token created", user=user_id[:8])
             return response['link_token']
         except Exception as e:
-            print(f"❌ Error creating link token: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception("❌ Error creating link token", error=str(e))
             return None
     
+    @traced
     async def exchange_public_token(self, public_token: str) -> Optional[Dict]:
         """Exchange public token for access token and item_id"""
         if not self.client:
             return None
         
         try:
-            from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
-            
-            request = ItemPublicTokenExchangeRequest(public_token=public_token)
-            response = self.client.item_public_token_exchange(request)
+            response = await self.client.item_public_token_exchange(public_token)
             
             return {
                 'access_token': response['access_token'],
                 'item_id': response['item_id']
             }
         except Exception as e:
-            print(f"Error exchanging token: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception("Error exchanging token", error=str(e))
             return None
     
+    @traced
     async def get_transactions(self, access_token: str, start_date: datetime, 
                               end_date: datetime) -> List[Dict]:
-        """Fetch transactions from Plaid"""
+        """Fetch transactions from Plaid (all pages); [] on errors"""
         if not self.client:
             return []
         
         try:
-            from plaid.model.transactions_get_request import TransactionsGetRequest
-            
-            request = TransactionsGetRequest(
-                access_token=access_token,
-                start_date=start_date.date(),
-                end_date=end_date.date()
-            )
-            
-            response = self.client.transactions_get(request)
-            transactions = response['transactions']
-            
-            # Transform to our format
-            return [self._transform_transaction(txn) for txn in transactions]
+            return await self._fetch_transactions(access_token, start_date, end_date)
         except Exception as e:
-            print(f"Error fetching transactions: {e}")
+            log.error("Error fetching transactions", error=str(e))
             return []
     
-    def _transform_transaction(self, plaid_txn: Dict) -> Dict:
+    async def _fetch_transactions(self, access_token: str, start_date: datetime, 
+                                  end_date: datetime) -> List[Dict]:
+        """Fetch and transform every page of transactions, raising on Plaid errors"""
+        transactions = []
+        total = None
+        while total is None or len(transactions) < total:
+            response = await self.client.transactions_get(
+                access_token,
+                start_date.date(),
+                end_date.date(),
+                count=self.PAGE_SIZE,
+                offset=len(transactions)
+            )
+            page = response['transactions']
+            total = response['total_transactions']
+            if not page:
+                break
+            transactions.extend(page)
+        
+        # The response carries balances too, so prime the cache for free
+        if response['accounts']:
+            self._cache_balances(access_token, [self._transform_account(account) for account in response['accounts']])
+        
+        # Transform to our format, categorizing the whole batch in one pass
+        categories = self.category_mapper.map_many(transactions)
+        return [
+            self._transform_transaction(txn, category)
+            for txn, category in zip(transactions, categories)
+        ]
+    
+    def _transform_transaction(self, plaid_txn: Dict, category: Optional[str] = None) -> Dict:
         """Transform Plaid transaction to our format"""
         # Plaid: positive amount = money out (expense)
         # Our format: income vs expense type
-        amount = abs(plaid_txn['amount'])
-        transaction_type = 'expense' if plaid_txn['amount'] > 0 else 'income'
+        signed_cents = to_cents(plaid_txn['amount'])
+        amount_cents = abs(signed_cents)
+        transaction_type = 'expense' if signed_cents > 0 else 'income'
         
-        # Get category
-        categories = plaid_txn.get('category', [])
-        category = categories[0] if categories else 'Other'
+        # Map Plaid's category onto our budget categories (precomputed in bulk when batching)
+        if category is None:
+            category = self.category_mapper.map(plaid_txn)
         
         return {
             'description': plaid_txn['name'],
-            'amount': amount,
+            'amount': from_cents(amount_cents),
+            'amount_cents': amount_cents,
             'transaction_type': transaction_type,
             'category': category,
-            'transaction_date': plaid_txn['date'],
+            # The SDK returns a date, the JSON stand-in an ISO string
+            'transaction_date': str(plaid_txn['date']),
             'external_id': plaid_txn['transaction_id'],
+            'account_id': plaid_txn.get('account_id'),
             'pending': plaid_txn.get('pending', False)
         }
     
+    @traced
     async def sync_transactions(self, access_token: str, user_id: str, 
-                               transaction_service) -> int:
-        """Sync transactions from Plaid to database"""
+                               transaction_service, item_id: Optional[str] = None) -> int:
+        """
+        Sync transactions from Plaid to database
+        
+        Returns the number of new transactions. Plaid errors and failures to save
+        the item's accounts are raised, so callers only mark an item synced when
+        the whole window made it into the database.
+        """
         if not self.client:
             return 0
         
+        # Get last 30 days of transactions
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=30)
+        
         try:
-            # Get last 30 days of transactions
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=30)
+            plaid_transactions = await self._fetch_transactions(access_token, start_date, end_date)
+            
+            # Persist accounts first so transactions can reference them
+            # (the fetch just primed the balance cache, so this is not a Plaid call)
+            accounts = await self.get_balances(access_token)
+            if accounts and not await transaction_service.upsert_accounts(user_id, item_id, accounts):
+                raise RuntimeError("could not save accounts")
+        except Exception as e:
+            log.error("Error syncing transactions", item_id=item_id, error=str(e))
+            raise
+        
+        # Import to database
+        count = 0
+        for txn in plaid_transactions:
+            # Skip pending transactions
+            if txn.get('pending'):
+                continue
             
-            plaid_transactions = await self.get_transactions(
-                access_token, start_date, end_date
+            # Add to database (False for duplicates)
+            success = await transaction_service.add_transaction(
+                user_id=user_id,
+                amount=txn['amount'],
+                amount_cents=txn['amount_cents'],
+                transaction_type=txn['transaction_type'],
+                category=txn['category'],
+                description=txn['description'],
+                date=datetime.fromisoformat(txn['transaction_date']),
+                account_id=txn['account_id']
             )
             
-            # Import to database
-            count = 0
-            for txn in plaid_transactions:
-                # Skip pending transactions
-                if txn.get('pending'):
-                    continue
-                
-                # Add to database
-                success = await transaction_service.add_transaction(
-                    user_id=user_id,
-                    amount=txn['amount'],
-                    transaction_type=txn['transaction_type'],
-                    category=txn['category'],
-                    description=txn['description'],
-                    date=datetime.fromisoformat(txn['transaction_date'])
+            if success:
+                count += 1
+        
+        log.info("✅ Synced transactions from Plaid", item_id=item_id, count=count)
+        return count
+    
+    @traced
+    async def sync_user(self, user_id: str, transaction_service) -> Dict:
+        """Sync every linked item for a user concurrently"""
+        items = await transaction_service.get_plaid_items(user_id)
+        if not self.client or not items:
+            return {'items': len(items), 'synced': 0, 'failed': []}
+        
+        semaphore = asyncio.Semaphore(Config.PLAID_SYNC_CONCURRENCY)
+        
+        async def sync_item(item: Dict) -> int:
+            async with semaphore:
+                # Raises on failure, leaving last_synced_at where the last complete sync put it
+                count = await self.sync_transactions(
+                    item['access_token'], user_id, transaction_service, item_id=item['item_id']
                 )
-                
-                if success:
-                    count += 1
-            
-            print(f"✅ Synced {count} transactions from Plaid")
-            return count
+                await transaction_service.mark_plaid_item_synced(item['item_id'])
+                return count
+        
+        results = await asyncio.gather(
+            *(sync_item(item) for item in items),
+            return_exceptions=True
+        )
+        
+        synced = 0
+        failed = []
+        for item, result in zip(items, results):
+            if isinstance(result, Exception):
+                log.error("Error syncing item", item_id=item['item_id'], error=str(result))
+                failed.append(item['item_id'])
+            else:
+                synced += result
+        
+        log.info("✅ Synced user", user=user_id[:8], transactions=synced, items=len(items))
+        return {'items': len(items), 'synced': synced, 'failed': failed}
+    
+    def _transform_account(self, plaid_account: Dict) -> Dict:
+        """Transform a Plaid account to our format"""
+        balances = plaid_account['balances']
+        return {
+            'account_id': plaid_account['account_id'],
+            'name': plaid_account['name'],
+            'mask': plaid_account.get('mask'),
+            'type': str(plaid_account['type']),
+            'subtype': str(plaid_account.get('subtype') or ''),
+            'current': balances.get('current'),
+            'available': balances.get('available'),
+            'iso_currency_code': balances.get('iso_currency_code') or 'USD'
+        }
+    
+    @traced
+    async def get_balances(self, access_token: str, force_refresh: bool = False) -> List[Dict]:
+        """Get account balances for an item, served from cache within PLAID_BALANCE_TTL"""
+        cached = self._cached_balances(access_token)
+        if cached and not force_refresh and time.monotonic() - cached[0] < Config.PLAID_BALANCE_TTL:
+            return cached[1]
+        
+        if not self.client:
+            return []
+        
+        try:
+            response = await self.client.accounts_balance_get(access_token)
+            accounts = [self._transform_account(account) for account in response['accounts']]
+            self._cache_balances(access_token, accounts)
+            return accounts
         except Exception as e:
-            print(f"Error syncing transactions: {e}")
-            return 0
+            log.error("Error fetching balances", error=str(e))
+            # A stale balance beats no balance while Plaid is struggling
+            return cached[1] if cached else []
+    
+    def _cached_balances(self, access_token: str) -> Optional[Tuple[float, List[Dict]]]:
+        """The cached entry for an item, unless it is too old even to serve stale"""
+        cached = self._balance_cache.get(access_token)
+        if cached and time.monotonic() - cached[0] >= Config.PLAID_BALANCE_MAX_STALE:
+            del self._balance_cache[access_token]
+            return None
+        return cached
+    
+    def _cache_balances(self, access_token: str, accounts: List[Dict]):
+        """Store an item's balances, evicting expired entries and the oldest beyond the size limit"""
+        now = time.monotonic()
+        self._balance_cache[access_token] = (now, accounts)
+        self._balance_cache.move_to_end(access_token)
+        # Entries are kept in fetch order, so the expired ones are at the front
+        while self._balance_cache and (
+            len(self._balance_cache) > Config.PLAID_BALANCE_CACHE_SIZE
+            or now - next(iter(self._balance_cache.values()))[0] >= Config.PLAID_BALANCE_MAX_STALE
+        ):
+            self._balance_cache.popitem(last=False)
+    
+    @traced
+    async def get_user_balances(self, user_id: str, transaction_service, 
+                                force_refresh: bool = False) -> Dict:
+        """Get balances for every account across all of a user's items"""
+        items = await transaction_service.get_plaid_items(user_id)
+        per_item = await asyncio.gather(
+            *(self.get_balances(item['access_token'], force_refresh) for item in items)
+        )
+        
+        accounts = []
+        for item, item_accounts in zip(items, per_item):
+            for account in item_accounts:
+                accounts.append({**account, 'institution_name': item.get('institution_name')})
+        
+        # Credit and loan balances are money owed
+        total_cents = sum_cents([
+            to_cents(account['current'] or 0) * (-1 if account['type'] in ('credit', 'loan') else 1)
+            for account in accounts
+        ])
+        return {'accounts': accounts, 'total': from_cents(total_cents)}
@@ -0,0 +1,363 @@
+"""Local stand-in for the Plaid API (in-process or on localhost)
+
+Usage:
+    # In-process: set PLAID_ENV=local and PlaidService talks to FakePlaid directly
+    # Localhost:  python -m src.services.plaid_standin --port 8100
+    #             then set PLAID_HOST=http://127.0.0.1:8100
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+from ..utils.config import Config
+
+
+MERCHANTS = [
+    # (name, legacy category, personal_finance_category primary, detailed)
+    ('Starbucks', ['Food and Drink', 'Restaurants', 'Coffee Shop'], 'FOOD_AND_DRINK', 'FOOD_AND_DRINK_COFFEE'),
+    ('Chipotle', ['Food and Drink', 'Restaurants'], 'FOOD_AND_DRINK', 'FOOD_AND_DRINK_FAST_FOOD'),
+    ('Walmart', ['Shops', 'Supermarkets and Groceries'], 'GENERAL_MERCHANDISE', 'GENERAL_MERCHANDISE_SUPERSTORES'),
+    ('Whole Foods', ['Shops', 'Supermarkets and Groceries'], 'FOOD_AND_DRINK', 'FOOD_AND_DRINK_GROCERIES'),
+    ('Amazon', ['Shops', 'Digital Purchase'], 'GENERAL_MERCHANDISE', 'GENERAL_MERCHANDISE_ONLINE_MARKETPLACES'),
+    ('Target', ['Shops', 'Department Stores'], 'GENERAL_MERCHANDISE', 'GENERAL_MERCHANDISE_DEPARTMENT_STORES'),
+    ('Shell', ['Travel', 'Gas Stations'], 'TRANSPORTATION', 'TRANSPORTATION_GAS'),
+    ('Uber', ['Travel', 'Taxi'], 'TRANSPORTATION', 'TRANSPORTATION_TAXIS_AND_RIDE_SHARES'),
+    ('Netflix', ['Service', 'Subscription'], 'ENTERTAINMENT', 'ENTERTAINMENT_TV_AND_MOVIES'),
+    ('Spotify', ['Service', 'Subscription'], 'ENTERTAINMENT', 'ENTERTAINMENT_MUSIC_AND_AUDIO'),
+    ('Planet Fitness', ['Recreation', 'Gyms and Fitness Centers'], 'PERSONAL_CARE', 'PERSONAL_CARE_GYMS_AND_FITNESS_CENTERS'),
+    ('CVS Pharmacy', ['Healthcare', 'Pharmacies'], 'MEDICAL', 'MEDICAL_PHARMACIES_AND_SUPPLEMENTS'),
+    ('City Power & Light', ['Service', 'Utilities', 'Electric'], 'RENT_AND_UTILITIES', 'RENT_AND_UTILITIES_GAS_AND_ELECTRICITY'),
+    ('Delta Air Lines', ['Travel', 'Airlines and Aviation Services'], 'TRAVEL', 'TRAVEL_FLIGHTS'),
+    ('Payroll Deposit', ['Transfer', 'Payroll'], 'INCOME', 'INCOME_WAGES'),
+]
+
+class FakePlaidError(Exception):
+    """Injected Plaid error, shaped like plaid.ApiException (status + JSON body)"""
+
+    def __init__(self, status: int, error_code: str, error_type: str = 'API_ERROR'):
+        self.status = status
+        self.body = json.dumps({
+            'error_type': error_type,
+            'error_code': error_code,
+            'error_message': f"injected {error_code}",
+            'display_message': None,
+            'request_id': uuid.uuid4().hex[:16],
+        })
+        super().__init__(f"({status}) {error_code}")
+
+
+def request_models() -> SimpleNamespace:
+    """Request 'models' for PlaidClient that build plain dicts instead of plaid classes"""
+    return SimpleNamespace(
+        LinkTokenCreateRequest=dict,
+        LinkTokenCreateRequestUser=dict,
+        Products=str,
+        CountryCode=str,
+        ItemPublicTokenExchangeRequest=dict,
+        TransactionsGetRequest=dict,
+        TransactionsGetRequestOptions=dict,
+        AccountsBalanceGetRequest=dict,
+    )
+
+
+def _field(request: Any, name: str, default: Any = None) -> Any:
+    """Read a field from a dict or a plaid model instance"""
+    if isinstance(request, dict):
+        return request.get(name, default)
+    return getattr(request, name, default)
+
+
+class FakePlaid:
+    """In-memory Plaid API with configurable volume, latency, paging and errors
+
+    Exposes the same method names as plaid_api.PlaidApi, so it can be wrapped
+    by PlaidClient exactly like the real SDK.
+    """
+
+    MAX_PAGE_SIZE = 500
+
+    def __init__(self, transactions_per_item: int = 500, latency_ms: float = 0.0,
+                 error_rate: float = 0.0, error_code: str = 'RATE_LIMIT_EXCEEDED',
+                 history_days: int = 730, seed: int = 42):
+        """
+        Args:
+            transactions_per_item: Transactions generated for every linked item
+            latency_ms: Artificial delay added to every call
+            error_rate: Probability (0-1) that a call fails with error_code
+            error_code: Plaid error code to inject
+            history_days: How far back generated transactions go
+            seed: Seed for deterministic data
+        """
+        self.transactions_per_item = transactions_per_item
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self.history_days = history_days
+        self.seed = seed
+        self.items: Dict[str, Dict] = {}  # access_token -> item
+        self.calls: Dict[str, int] = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls) -> 'FakePlaid':
+        """Build a stand-in using the PLAID_FAKE_* settings"""
+        return cls(
+            transactions_per_item=Config.PLAID_FAKE_TRANSACTIONS,
+            latency_ms=Config.PLAID_FAKE_LATENCY_MS,
+            error_rate=Config.PLAID_FAKE_ERROR_RATE,
+            history_days=Config.PLAID_FAKE_HISTORY_DAYS,
+        )
+
+    def _begin(self, endpoint: str):
+        """Count the call, apply latency and maybe inject an error"""
+        with self._lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        if fail:
+            status = 429 if self.error_code == 'RATE_LIMIT_EXCEEDED' else 500
+            raise FakePlaidError(status, self.error_code)
+
+    def _item(self, access_token: str) -> Dict:
+        """Get (or lazily create) the item behind an access token"""
+        with self._lock:
+            item = self.items.get(access_token)
+            if item is None:
+                item = self._generate_item(access_token)
+                self.items[access_token] = item
+            return item
+
+    def _generate_item(self, access_token: str) -> Dict:
+        """Generate accounts and a transaction history for one item"""
+        item_seed = int(hashlib.md5(f"{self.seed}:{access_token}".encode()).hexdigest()[:8], 16)
+        rng = random.Random(item_seed)
+        item_id = f"item-{item_seed:08x}"
+
+        accounts = [
+            {
+                'account_id': f"{item_id}-chk",
+                'name': 'Plaid Checking',
+                'official_name': 'Plaid Gold Standard 0% Interest Checking',
+                'mask': '0000',
+                'type': 'depository',
+                'subtype': 'checking',
+                'balances': {
+                    'available': round(rng.uniform(500, 8000), 2),
+                    'current': round(rng.uniform(500, 8000), 2),
+                    'limit': None,
+                    'iso_currency_code': 'USD',
+                    'unofficial_currency_code': None,
+                },
+            },
+            {
+                'account_id': f"{item_id}-cc",
+                'name': 'Plaid Credit Card',
+                'official_name': 'Plaid Diamond 12.5% APR Interest Credit Card',
+                'mask': '3333',
+                'type': 'credit',
+                'subtype': 'credit card',
+                'balances': {
+                    'available': None,
+                    'current': round(rng.uniform(0, 2500), 2),
+                    'limit': 5000.0,
+                    'iso_currency_code': 'USD',
+                    'unofficial_currency_code': None,
+                },
+            },
+        ]
+
+        today = date.today()
+        transactions = []
+        for i in range(self.transactions_per_item):
+            name, category, pfc_primary, pfc_detailed = rng.choice(MERCHANTS)
+            if pfc_primary == 'INCOME':
+                amount = -round(rng.uniform(1500, 4500), 2)
+                account_id = accounts[0]['account_id']
+            else:
+                amount = round(rng.lognormvariate(3.2, 0.9), 2)
+                account_id = rng.choice(accounts)['account_id']
+            txn_date = today - timedelta(days=rng.randrange(self.history_days))
+            transactions.append(self._transaction(
+                f"{item_id}-txn-{i:07d}", account_id, name, amount, txn_date,
+                category, pfc_primary, pfc_detailed
+            ))
+
+        # Plaid returns newest first
+        transactions.sort(key=lambda t: t['date'], reverse=True)
+        return {
+            'item_id': item_id,
+            'access_token': access_token,
+            'accounts': accounts,
+            'transactions': transactions,
+        }
+
+    @staticmethod
+    def _transaction(transaction_id: str, account_id: str, name: str, amount: float,
+                     txn_date: date, category: List[str], pfc_primary: str,
+                     pfc_detailed: str) -> Dict:
+        """Build a transaction object with the fields the plaid SDK expects"""
+        return {
+            'transaction_id': transaction_id,
+            'account_id': account_id,
+            'amount': amount,
+            'iso_currency_code': 'USD',
+            'unofficial_currency_code': None,
+            'category': category,
+            'category_id': None,
+            'personal_finance_category': {
+                'primary': pfc_primary,
+                'detailed': pfc_detailed,
+                'confidence_level': 'HIGH',
+            },
+            'date': txn_date.isoformat(),
+            'authorized_date': txn_date.isoformat(),
+            'authorized_datetime': None,
+            'datetime': None,
+            'name': name,
+            'merchant_name': name,
+            'merchant_entity_id': None,
+            'logo_url': None,
+            'website': None,
+            'payment_channel': 'in store',
+            'pending': False,
+            'pending_transaction_id': None,
+            'account_owner': None,
+            'transaction_code': None,
+            'transaction_type': 'place',
+            'check_number': None,
+            'counterparties': [],
+            'location': {
+                'address': None, 'city': None, 'region': None, 'postal_code': None,
+                'country': None, 'lat': None, 'lon': None, 'store_number': None,
+            },
+            'payment_meta': {
+                'by_order_of': None, 'payee': None, 'payer': None, 'payment_method': None,
+                'payment_processor': None, 'ppd_id': None, 'reason': None, 'reference_number': None,
+            },
+        }
+
+    def _item_summary(self, item: Dict) -> Dict:
+        return {
+            'item_id': item['item_id'],
+            'institution_id': 'ins_local',
+            'webhook': None,
+            'error': None,
+            'available_products': [],
+            'billed_products': ['transactions'],
+            'consent_expiration_time': None,
+            'update_type': 'background',
+        }
+
+    # ------------------------------------------------------------------
+    # PlaidApi-compatible methods
+    # ------------------------------------------------------------------
+
+    def link_token_create(self, request: Any) -> Dict:
+        self._begin('link_token_create')
+        return {
+            'link_token': f"link-local-{uuid.uuid4()}",
+            'expiration': (date.today() + timedelta(days=1)).isoformat() + 'T00:00:00Z',
+            'request_id': uuid.uuid4().hex[:16],
+        }
+
+    def item_public_token_exchange(self, request: Any) -> Dict:
+        self._begin('item_public_token_exchange')
+        public_token = _field(request, 'public_token')
+        access_token = f"access-local-{hashlib.md5(str(public_token).encode()).hexdigest()}"
+        item = self._item(access_token)
+        return {
+            'access_token': access_token,
+            'item_id': item['item_id'],
+            'request_id': uuid.uuid4().hex[:16],
+        }
+
+    def transactions_get(self, request: Any) -> Dict:
+        self._begin('transactions_get')
+        item = self._item(_field(request, 'access_token'))
+        start = str(_field(request, 'start_date'))
+        end = str(_field(request, 'end_date'))
+        options = _field(request, 'options') or {}
+        count = min(int(_field(options, 'count', 100) or 100), self.MAX_PAGE_SIZE)
+        offset = int(_field(options, 'offset', 0) or 0)
+
+        in_range = [t for t in item['transactions'] if start <= t['date'] <= end]
+        return {
+            'accounts': item['accounts'],
+            'transactions': in_range[offset:offset + count],
+            'total_transactions': len(in_range),
+            'item': self._item_summary(item),
+            'request_id': uuid.uuid4().hex[:16],
+        }
+
+    def accounts_balance_get(self, request: Any) -> Dict:
+        self._begin('accounts_balance_get')
+        item = self._item(_field(request, 'access_token'))
+        return {
+            'accounts': item['accounts'],
+            'item': self._item_summary(item),
+            'request_id': uuid.uuid4().hex[:16],
+        }
+
+
+def create_app(fake: Optional[FakePlaid] = None):
+    """Expose a FakePlaid over HTTP with Plaid's JSON endpoints"""
+    import asyncio
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse
+
+    fake = fake or FakePlaid.from_config()
+    app = FastAPI(title="Plaid stand-in")
+    routes = {
+        '/link/token/create': fake.link_token_create,
+        '/item/public_token/exchange': fake.item_public_token_exchange,
+        '/transactions/get': fake.transactions_get,
+        '/accounts/balance/get': fake.accounts_balance_get,
+    }
+
+    def make_handler(method):
+        async def handler(request: Request):
+            body = await request.json()
+            try:
+                # Latency is a blocking sleep in FakePlaid, keep it off the loop
+                return await asyncio.to_thread(method, body)
+            except FakePlaidError as e:
+                return JSONResponse(json.loads(e.body), status_code=e.status)
+        return handler
+
+    for path, method in routes.items():
+        app.add_api_route(path, make_handler(method), methods=["POST"])
+
+    return app
+
+
+if __name__ == "__main__":
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the Plaid stand-in on localhost")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--transactions", type=int, default=Config.PLAID_FAKE_TRANSACTIONS)
+    parser.add_argument("--latency-ms", type=float, default=Config.PLAID_FAKE_LATENCY_MS)
+    parser.add_argument("--error-rate", type=float, default=Config.PLAID_FAKE_ERROR_RATE)
+    parser.add_argument("--error-code", default='RATE_LIMIT_EXCEEDED')
+    parser.add_argument("--history-days", type=int, default=Config.PLAID_FAKE_HISTORY_DAYS)
+    args = parser.parse_args()
+
+    stand_in = FakePlaid(
+        transactions_per_item=args.transactions,
+        latency_ms=args.latency_ms,
+        error_rate=args.error_rate,
+        error_code=args.error_code,
+        history_days=args.history_days,
+    )
+    print(f"Plaid stand-in at http://{args.host}:{args.port} (set PLAID_HOST to use it)")
+    uvicorn.run(create_app(stand_in), host=args.host, port=args.port)
@@ -0,0 +1,236 @@
+"""Client-side transaction state kept current by the API's change feed"""
+
+import asyncio
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from .api_client import APIClient
+from ..utils import tracing
+from ..utils.log import get_logger
+from ..utils.money import to_cents, from_cents
+
+log = get_logger('store')
+Listener = Callable[[List[Dict]], None]
+
+
+class TransactionStore:
+    """Balance, this month's totals and recent transactions for one user
+
+    start() loads everything once and then follows GET /api/changes, applying
+    'added'/'removed' events to the totals and the recent list instead of
+    refetching. It reloads after a 'reset' (events were missed), on
+    reconnecting without a resumable event id, when the month rolls over, and
+    on every change while the API reports all-time totals for an empty month
+    (those cannot be adjusted by this month's changes).
+    Listeners get the batch of events applied, at most every NOTIFY_DELAY
+    seconds; a batch containing {'type': 'reset'} means "rebuild from scratch".
+    """
+
+    NOTIFY_DELAY = 0.1
+    RETRY_DELAY = 1.0
+    MAX_RETRY_DELAY = 30.0
+
+    def __init__(self, api_client: APIClient, user_id: str, recent_limit: int = 10):
+        self.api_client = api_client
+        self.user_id = user_id
+        self.recent_limit = recent_limit
+
+        self.recent: List[Dict] = []  # Newest first, as the API returns them
+        self.accounts: List[Dict] = []
+        self.bank_total = 0.0
+        self.balance_cents = 0
+        self.income_cents = 0
+        self.expenses_cents = 0
+        self.month = (0, 0)
+        self.all_time = False  # income/expenses are the API's all-time fallback
+        self.loaded = False
+        self.live = False  # True while the change feed is connected
+
+        self._listeners: List[Listener] = []
+        self._pending: List[Dict] = []
+        self._notify_handle: Optional[asyncio.TimerHandle] = None
+        self._last_event_id: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._rollover_handle: Optional[asyncio.TimerHandle] = None
+        self._rollover_task: Optional[asyncio.Task] = None
+
+    @property
+    def balance(self) -> float:
+        """Linked bank balance when there are accounts, otherwise the ledger balance"""
+        return self.bank_total if self.accounts else from_cents(self.balance_cents)
+
+    @property
+    def monthly_summary(self) -> Dict:
+        """Same shape as /api/summary's 'summary'"""
+        savings_cents = self.income_cents - self.expenses_cents
+        return {
+            'income': from_cents(self.income_cents),
+            'expenses': from_cents(self.expenses_cents),
+            'savings': from_cents(savings_cents),
+            'savings_rate': savings_cents / self.income_cents * 100 if self.income_cents > 0 else 0
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def subscribe(self, listener: Listener) -> Callable[[], None]:
+        """Call listener(events) after changes; returns a function that unsubscribes"""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener) if listener in self._listeners else None
+
+    async def load(self):
+        """Fetch everything from the API (the only full refetch)"""
+        # One trace covering the three requests and everything the API does for them
+        with tracing.span('dashboard.load'):
+            summary = await self.api_client.get_summary(self.user_id)
+            balances = await self.api_client.get_account_balances(self.user_id)
+            recent = await self.api_client.get_transactions(self.user_id, self.recent_limit)
+
+        now = datetime.now()
+        self.month = (now.year, now.month)
+        self.balance_cents = to_cents(summary['balance'])
+        self.income_cents = to_cents(summary['summary'].get('income', 0))
+        self.expenses_cents = to_cents(summary['summary'].get('expenses', 0))
+        self.all_time = bool(summary['summary'].get('all_time', False))
+        self.accounts = balances['accounts']
+        self.bank_total = balances['total']
+        self.recent = recent
+        self.loaded = True
+        log.info("📊 Loaded dashboard data", user=self.user_id[:8], recent=len(self.recent))
+        self._schedule_notify({'type': 'reset'})
+        self._schedule_rollover(now)
+
+    def apply(self, event: Dict) -> bool:
+        """Apply one change event in place; False when it calls for a full reload"""
+        kind = event.get('type')
+        if kind == 'reset':
+            return False
+        if kind not in ('added', 'removed'):
+            return True
+        if self.all_time or self._month_changed():
+            # All-time totals or last month's: only a reload gives this month's
+            return False
+
+        row = dict(event['row'])
+        row['amount'] = from_cents(row.get('amount_cents') or 0)
+        sign = 1 if kind == 'added' else -1
+        cents = sign * (row.get('amount_cents') or 0)
+        transaction_type = row.get('transaction_type')
+
+        if transaction_type == 'income':
+            self.balance_cents += cents
+        elif transaction_type == 'expense':
+            self.balance_cents -= cents
+        if str(row.get('transaction_date'))[:7] == f"{self.month[0]}-{self.month[1]:02d}":
+            if transaction_type == 'income':
+                self.income_cents += cents
+            elif transaction_type == 'expense':
+                self.expenses_cents += cents
+
+        if kind == 'added':
+            self.recent = merge_rows(self.recent, [row], [], self.recent_limit)
+        else:
+            self.recent = merge_rows(self.recent, [], [row], self.recent_limit)
+        return True
+
+    def start(self):
+        """Begin following the change feed (call from the running event loop)"""
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(self.follow())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self._rollover_handle:
+            self._rollover_handle.cancel()
+            self._rollover_handle = None
+        self.live = False
+
+    async def follow(self):
+        """Apply change events until stopped, reconnecting with backoff"""
+        delay = self.RETRY_DELAY
+        while True:
+            resumed = self._last_event_id is not None
+            stale = False
+            try:
+                async for event_id, event in self.api_client.stream_changes(self.user_id, self._last_event_id):
+                    self._last_event_id = event_id
+                    kind = event.get('type')
+                    if kind == 'ready':
+                        self.live = True
+                        delay = self.RETRY_DELAY
+                        if stale or not resumed or not self.loaded or self._month_changed():
+                            await self.load()
+                            stale = False
+                    elif not self.live:
+                        # Replayed events before 'ready'; a reset here means reload on 'ready'
+                        stale = not self.apply(event) or stale
+                        self._schedule_notify(event)
+                    elif not self.apply(event):
+                        await self.load()
+                    else:
+                        self._schedule_notify(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("⚠️ Change feed disconnected", error=str(e), retry_in=delay)
+
+            self.live = False
+            if not self.loaded:
+                # No feed (API down or older API): still show what we can
+                try:
+                    await self.load()
+                except Exception as e:
+                    log.error("❌ Dashboard load error", error=str(e))
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.MAX_RETRY_DELAY)
+
+    def _month_changed(self) -> bool:
+        now = datetime.now()
+        return (now.year, now.month) != self.month
+
+    def _schedule_rollover(self, now: datetime):
+        """Reload when the month ends, even if no change arrives to notice it"""
+        if self._rollover_handle:
+            self._rollover_handle.cancel()
+        year, month = (now.year + 1, 1) if now.month == 12 else (now.year, now.month + 1)
+        delay = (datetime(year, month, 1) - now).total_seconds()
+        self._rollover_handle = asyncio.get_running_loop().call_later(delay, self._roll_over)
+
+    def _roll_over(self):
+        self._rollover_handle = None
+        self._rollover_task = asyncio.get_running_loop().create_task(self._reload_quietly())
+
+    async def _reload_quietly(self):
+        try:
+            await self.load()
+        except Exception as e:
+            log.error("❌ Dashboard load error", error=str(e))
+
+    def _schedule_notify(self, event: Dict):
+        self._pending.append(event)
+        if self._notify_handle is None:
+            self._notify_handle = asyncio.get_running_loop().call_later(self.NOTIFY_DELAY, self._notify)
+
+    def _notify(self):
+        events, self._pending, self._notify_handle = self._pending, [], None
+        for listener in list(self._listeners):
+            try:
+                listener(events)
+            except Exception as e:
+                log.warning("⚠️ Store listener error", error=str(e))
+
+
+def merge_rows(rows: List[Dict], added: List[Dict], removed: List[Dict], limit: int) -> List[Dict]:
+    """Newest-first rows with `added` merged in and `removed` dropped, capped at limit"""
+    removed_ids = {row.get('id') for row in removed}
+    kept = {row.get('id'): row for row in rows if row.get('id') not in removed_ids}
+    for row in added:
+        kept[row.get('id')] = row
+    ordered = sorted(
+        kept.values(),
+        key=lambda row: (str(row.get('transaction_date'))[:10], str(row.get('id'))),
+        reverse=True
+    )
+    return ordered[:limit]
@@ -1,9 +1,10 @@
 """Budget page - View spending by category"""
 
 import flet as ft
-from datetime import datetime
-from collections import defaultdict
+from datetime import date, datetime
 from ...services.api_client import APIClient
+from ...utils.transaction_frame import TransactionFrame
+from ...utils.money import from_cents
 from ..theme import Theme
 
 
@@ -15,7 +16,7 @@ class BudgetsPage(ft.Container):
         self.page = page
         self.auth_service = auth_service
         self.api_client = APIClient()
-        self.transactions = []
+        self.transactions = TransactionFrame.from_records([])
         self.category_totals = {}
         self.category_budgets = {}  # Store budget goals for each category
         
@@ -151,26 +152,18 @@ class BudgetsPage(ft.Container):
                     else:
                         user_id = str(self.auth_service.current_user)
             
-            # Get all transactions
-            self.transactions = await self.api_client.get_transactions(user_id, 1000)
-            
-            # Get current year for filtering
-            now = datetime.now()
-            current_year = now.year
-            
-            # Calculate totals by category (expenses from current year)
-            category_totals = defaultdict(float)
-            for txn in self.transactions:
-                if txn['transaction_type'] == 'expense':
-                    # Parse transaction date
-                    txn_date = datetime.fromisoformat(txn['transaction_date']) if isinstance(txn['transaction_date'], str) else txn['transaction_date']
-                    
-                    # Only include current year transactions
-                    if txn_date.year == current_year:
-                        category = txn.get('category', 'Other')
-                        category_totals[category] += txn['amount']
+            # Get this year's expenses (filtered by the database)
+            self.transactions = await self.api_client.get_transaction_frame(
+                user_id, 1000,
+                start_date=date(datetime.now().year, 1, 1),
+                transaction_type='expense'
+            )
             
-            self.category_totals = dict(category_totals)
+            # Calculate totals by category
+            self.category_totals = {
+                category: from_cents(cents)
+                for category, cents in self.transactions.sum_by_category().items()
+            }
             # Only update if the control is attached to the page
             if self.budget_content.page:
                 self.update_budget_display()
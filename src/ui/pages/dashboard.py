@@ -10,6 +10,7 @@ from src.ui.pages.leaderboard import InsightsPage
 from src.ui.pages.profile import ProfilePage
 from src.ui.pages.settings import SettingsPage
 from ...services.api_client import APIClient
+from ...services.transaction_store import TransactionStore
 from ..theme import Theme
 
 
@@ -29,8 +30,10 @@ class DashboardPage(ft.Container):
         
         # Data storage
         self.balance = 0.0
+        self.accounts = []
         self.monthly_summary = {}
         self.transactions = []
+        self.store = None  # TransactionStore, kept current by the API's change feed
         
         # Build UI
         self.content = self.build_ui()
@@ -242,7 +245,7 @@ class DashboardPage(ft.Container):
         )
     
     def load_dashboard_data(self):
-        """Load dashboard data from API"""
+        """Load dashboard data from API, then follow the change feed for updates"""
         async def load_data():
             user_id = 'demo'
             if self.auth_service.supabase and hasattr(self.auth_service, 'current_user'):
@@ -251,18 +254,35 @@ class DashboardPage(ft.Container):
                 else:
                     user_id = str(self.auth_service.current_user)
             
+            if self.store and self.store.user_id != user_id:
+                self.store.stop()
+                self.store = None
+            if self.store is None:
+                self.store = TransactionStore(self.api_client, user_id)
+                self.store.subscribe(self.on_store_change)
+            
             print(f"📊 Loading dashboard data for user: {user_id}")
-            summary_data = await self.api_client.get_summary(user_id)
-            print(f"📊 Summary data: {summary_data}")
-            self.balance = summary_data['balance']
-            self.monthly_summary = summary_data['summary']
-            print(f"📊 Balance: ${self.balance}, Monthly: {self.monthly_summary}")
-            self.transactions = await self.api_client.get_transactions(user_id, 10)
-            print(f"📊 Loaded {len(self.transactions)} transactions")
-            self.update_overview_data()
+            if self.store.running:
+                await self.store.load()
+            else:
+                # The first load happens once the feed is connected
+                self.store.start()
         
         self.page.run_task(load_data)
     
+    def refresh_after_write(self):
+        """New transactions arrive over the change feed; refetch only when it is down"""
+        if not (self.store and self.store.live):
+            self.load_dashboard_data()
+    
+    def on_store_change(self, events):
+        """Copy the store's current state and re-render the overview"""
+        self.balance = self.store.balance
+        self.accounts = self.store.accounts
+        self.monthly_summary = self.store.monthly_summary
+        self.transactions = self.store.recent
+        self.update_overview_data()
+    
     def update_overview_data(self):
         """Update overview UI with loaded data"""
         if hasattr(self, 'content_area') and self.current_view == "overview":
@@ -279,7 +299,7 @@ class DashboardPage(ft.Container):
         
         # Summary cards with theme-aware colors
         balance_card = self.create_stat_card(
-            "Total Balance",
+            f"Bank Balance ({len(self.accounts)} accounts)" if self.accounts else "Total Balance",
             f"${self.balance:,.2f}",
             ft.Icons.ACCOUNT_BALANCE_WALLET,
             Theme.WASABI if is_dark else Theme.EARTH
@@ -581,7 +601,7 @@ class DashboardPage(ft.Container):
                     imported = result.get('imported', 0)
                     print(f"✅ Loaded {imported} sample transactions")
                     
-                    self.load_dashboard_data()
+                    self.refresh_after_write()
                     
                     self.page.snack_bar = ft.SnackBar(
                         content=ft.Text(f"✅ Loaded {imported} sample transactions!"),
@@ -676,7 +696,7 @@ class DashboardPage(ft.Container):
                     
                     print(f"✅ API imported {imported} transactions")
                     
-                    self.load_dashboard_data()
+                    self.refresh_after_write()
                     
                     # Show alert dialog if all transactions were duplicates
                     if imported == 0 and skipped > 0:
@@ -906,5 +926,7 @@ class DashboardPage(ft.Container):
     
     async def handle_logout(self, e):
         """Handle logout"""
+        if self.store:
+            self.store.stop()
         await self.auth_service.sign_out()
         self.page.go("/")
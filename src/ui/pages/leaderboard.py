@@ -2,8 +2,9 @@
 
 import flet as ft
 from datetime import datetime
-from collections import defaultdict
 from ...services.api_client import APIClient
+from ...utils.transaction_frame import TransactionFrame
+from ...utils.money import from_cents
 from ..theme import Theme
 
 
@@ -15,7 +16,7 @@ class InsightsPage(ft.Container):
         self.page = page
         self.auth_service = auth_service
         self.api_client = APIClient()
-        self.transactions = []
+        self.transactions = TransactionFrame.from_records([])
         self.brand_totals = {}
         
         # Build UI
@@ -102,18 +103,16 @@ class InsightsPage(ft.Container):
                     else:
                         user_id = str(self.auth_service.current_user)
             
-            # Get all transactions
-            self.transactions = await self.api_client.get_transactions(user_id, 1000)
+            # Get expenses (filtered by the database)
+            self.transactions = await self.api_client.get_transaction_frame(
+                user_id, 1000, transaction_type='expense'
+            )
             
             # Calculate totals by brand (use description as brand name)
-            brand_totals = defaultdict(lambda: {'total': 0, 'count': 0})
-            for txn in self.transactions:
-                if txn['transaction_type'] == 'expense':
-                    brand = txn.get('description', 'Unknown')
-                    brand_totals[brand]['total'] += txn['amount']
-                    brand_totals[brand]['count'] += 1
-            
-            self.brand_totals = dict(brand_totals)
+            self.brand_totals = {
+                brand: {'total': from_cents(cents), 'count': count}
+                for brand, (cents, count) in self.transactions.group_by_merchant().items()
+            }
             self.update_leaderboard_display()
         
         self.page.run_task(fetch_data)
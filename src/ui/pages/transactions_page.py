@@ -1,21 +1,32 @@
 """Transactions page - View all transactions"""
 
+import asyncio
 import flet as ft
 from datetime import datetime
 from ...services.api_client import APIClient
+from ...services.transaction_store import merge_rows
+from ...utils.transaction_frame import TransactionFrame
 from ..theme import Theme
 
 
 class TransactionsPage(ft.Container):
     """Full transactions view page"""
     
+    # Seconds to wait after the last keystroke before searching
+    SEARCH_DEBOUNCE = 0.3
+    PAGE_SIZE = 100
+    
     def __init__(self, page: ft.Page, auth_service, dashboard=None):
         super().__init__()
         self.page = page
         self.auth_service = auth_service
         self.api_client = APIClient()
-        self.transactions = []
+        self.records = []  # Rows behind self.transactions, kept to apply change events
+        self.transactions = TransactionFrame.from_records([])
         self.dashboard = dashboard  # Reference to dashboard for refreshing overview
+        self._unsubscribe = None
+        self.search_query = ''
+        self._search_generation = 0  # Bumped per keystroke; stale searches compare and bail
         
         # Build UI
         self.content = self.build_ui()
@@ -29,6 +40,29 @@ class TransactionsPage(ft.Container):
         # Load transactions
         self.load_transactions()
     
+    def did_mount(self):
+        """Follow the dashboard's change feed while this page is shown"""
+        if self.dashboard and self.dashboard.store:
+            self._unsubscribe = self.dashboard.store.subscribe(self.on_changes)
+    
+    def will_unmount(self):
+        if self._unsubscribe:
+            self._unsubscribe()
+            self._unsubscribe = None
+    
+    def on_changes(self, events):
+        """Apply added/removed rows in place; search results and resets are refetched"""
+        if self.search_query or any(event['type'] == 'reset' for event in events):
+            self.load_transactions()
+            return
+        added = [event['row'] for event in events if event['type'] == 'added']
+        removed = [event['row'] for event in events if event['type'] == 'removed']
+        if not added and not removed:
+            return
+        self.records = merge_rows(self.records, added, removed, self.PAGE_SIZE)
+        self.transactions = TransactionFrame.from_records(self.records)
+        self.update_transactions_list()
+    
     def build_ui(self):
         """Build the transactions page UI"""
         is_dark = self.page.is_dark_mode if hasattr(self.page, 'is_dark_mode') else False
@@ -43,6 +77,15 @@ class TransactionsPage(ft.Container):
             expand=True
         )
         
+        self.search_field = ft.TextField(
+            hint_text="Search transactions",
+            prefix_icon=ft.Icons.SEARCH,
+            on_change=self.on_search_change,
+            dense=True,
+            border_radius=8,
+            color=text_color
+        )
+        
         return ft.Column(
             controls=[
                 # Header
@@ -74,6 +117,7 @@ class TransactionsPage(ft.Container):
                     ],
                     alignment=ft.MainAxisAlignment.SPACE_BETWEEN
                 ),
+                self.search_field,
                 ft.Divider(color=Theme.DARK_PRIMARY if is_dark else Theme.LIGHT_EMERALD),
                 # Transactions list
                 ft.Container(
@@ -101,25 +145,71 @@ class TransactionsPage(ft.Container):
         self.page.run_task(fetch_transactions)
     
     async def reload_transactions_async(self, user_id):
-        """Async method to reload transactions"""
-        self.transactions = await self.api_client.get_transactions(user_id, 100)
+        """Async method to reload transactions (search results while a query is active)"""
+        if self.search_query:
+            page = await self.api_client.search_transactions(user_id, self.search_query, 50)
+            self.records = page['transactions']
+        else:
+            self.records = await self.api_client.get_transactions(user_id, self.PAGE_SIZE)
+        self.transactions = TransactionFrame.from_records(self.records)
         self.update_transactions_list()
         self.page.update()
     
+    def on_search_change(self, e):
+        """Debounced search: only the last keystroke within SEARCH_DEBOUNCE hits the API"""
+        self._search_generation += 1
+        generation = self._search_generation
+        query = (e.control.value or '').strip()
+        
+        async def run_search():
+            await asyncio.sleep(self.SEARCH_DEBOUNCE)
+            if generation != self._search_generation:
+                return  # Superseded by a newer keystroke
+            
+            user_id = 'demo'
+            if self.auth_service.supabase and hasattr(self.auth_service, 'current_user'):
+                if self.auth_service.current_user:
+                    if hasattr(self.auth_service.current_user, 'id'):
+                        user_id = self.auth_service.current_user.id
+                    else:
+                        user_id = str(self.auth_service.current_user)
+            
+            if query:
+                page = await self.api_client.search_transactions(user_id, query, 50)
+                records = page['transactions']
+            else:
+                records = await self.api_client.get_transactions(user_id, self.PAGE_SIZE)
+            if generation != self._search_generation:
+                return  # A newer search started while this one was in flight
+            
+            self.search_query = query
+            self.records = records
+            self.transactions = TransactionFrame.from_records(records)
+            self.update_transactions_list()
+            self.page.update()
+        
+        self.page.run_task(run_search)
+    
     def update_transactions_list(self):
         """Update the transactions list UI"""
         is_dark = self.page.is_dark_mode if hasattr(self.page, 'is_dark_mode') else False
         text_color = Theme.DARK_TEXT if is_dark else Theme.NOIR
         card_bg = Theme.DARK_SURFACE if is_dark else Theme.LIGHT_WASABI_BG
         
-        if not self.transactions:
+        if not len(self.transactions):
             self.transactions_column.controls = [
                 ft.Container(
                     content=ft.Column(
                         controls=[
                             ft.Icon(ft.Icons.RECEIPT_LONG_OUTLINED, size=100, color=Theme.DARK_TEXT if is_dark else ft.Colors.GREY_400),
-                            ft.Text("No transactions yet", size=20, color=text_color),
-                            ft.Text("Import CSV or connect your bank to get started", size=14, color=Theme.DARK_TEXT if is_dark else ft.Colors.GREY_500)
+                            ft.Text(
+                                f'No transactions match "{self.search_query}"' if self.search_query else "No transactions yet",
+                                size=20, color=text_color
+                            ),
+                            ft.Text(
+                                "Try a shorter or different search" if self.search_query else "Import CSV or connect your bank to get started",
+                                size=14, color=Theme.DARK_TEXT if is_dark else ft.Colors.GREY_500
+                            )
                         ],
                         horizontal_alignment=ft.CrossAxisAlignment.CENTER,
                         spacing=20
@@ -131,13 +221,11 @@ class TransactionsPage(ft.Container):
             ]
         else:
             transaction_items = []
-            for txn in self.transactions:
-                amount_str = f"+${txn['amount']:,.2f}" if txn['transaction_type'] == 'income' else f"-${txn['amount']:,.2f}"
-                is_income = txn['transaction_type'] == 'income'
+            # Dates were parsed once when the frame was built
+            for txn_date, description, category, amount, is_income in self.transactions.rows():
+                amount_str = f"+${amount:,.2f}" if is_income else f"-${amount:,.2f}"
                 color = Theme.WASABI if is_income else Theme.MAPLE
                 
-                txn_date = datetime.fromisoformat(txn['transaction_date']) if isinstance(txn['transaction_date'], str) else txn['transaction_date']
-                
                 transaction_items.append(
                     ft.Container(
                         content=ft.Row(
@@ -149,10 +237,10 @@ class TransactionsPage(ft.Container):
                                 ),
                                 ft.Column(
                                     controls=[
-                                        ft.Text(txn['description'], weight=ft.FontWeight.BOLD, size=16, color=text_color),
+                                        ft.Text(description, weight=ft.FontWeight.BOLD, size=16, color=text_color),
                                         ft.Row(
                                             controls=[
-                                                ft.Text(txn['category'], size=12, color=Theme.DARK_TEXT if is_dark else ft.Colors.GREY_600),
+                                                ft.Text(category, size=12, color=Theme.DARK_TEXT if is_dark else ft.Colors.GREY_600),
                                                 ft.Text("•", size=12, color=Theme.DARK_TEXT if is_dark else ft.Colors.GREY_400),
                                                 ft.Text(txn_date.strftime("%b %d, %Y"), size=12, color=Theme.DARK_TEXT if is_dark else ft.Colors.GREY_600)
                                             ],
@@ -262,14 +350,11 @@ class TransactionsPage(ft.Container):
                                 else:
                                     user_id = str(self.auth_service.current_user)
                         
-                        # Insert directly to Supabase
-                        from src.database.transaction_service import TransactionService
-                        transaction_service = TransactionService()
-                        
                         # Parse the date string
                         transaction_date = datetime.strptime(date_input.value, "%Y-%m-%d")
                         
-                        success = await transaction_service.add_transaction(
+                        # Go through the API so its cache is invalidated with the write
+                        success = await self.api_client.add_transaction(
                             user_id=user_id,
                             description=description_input.value,
                             amount=amount,
@@ -291,12 +376,12 @@ class TransactionsPage(ft.Container):
                             self.page.snack_bar.open = True
                             self.page.update()
                             
-                            # Reload transactions to show the new one
-                            await self.reload_transactions_async(user_id)
-                            
-                            # Refresh the dashboard overview if we have a reference
-                            if self.dashboard:
-                                self.dashboard.load_dashboard_data()
+                            # With the change feed connected the new row arrives as an event
+                            # (here and on the dashboard); otherwise refetch
+                            if not (self.dashboard and self.dashboard.store and self.dashboard.store.live):
+                                await self.reload_transactions_async(user_id)
+                                if self.dashboard:
+                                    self.dashboard.load_dashboard_data()
                         else:
                             self.page.snack_bar = ft.SnackBar(
                                 content=ft.Text("❌ Failed to add transaction"),
@@ -19,6 +19,41 @@ class Config:
     SUPABASE_URL = os.getenv("SUPABASE_URL", "")
     SUPABASE_KEY = os.getenv("SUPABASE_KEY", "")
     SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY", "")
+    SUPABASE_BACKEND = os.getenv("SUPABASE_BACKEND", "remote")  # remote, or memory for the in-process stand-in
+    
+    # In-memory Supabase stand-in (SUPABASE_BACKEND=memory); each process has its own copy
+    SUPABASE_FAKE_LATENCY_MS = float(os.getenv("SUPABASE_FAKE_LATENCY_MS", "0"))  # Added to every request
+    SUPABASE_FAKE_TRANSACTIONS = int(os.getenv("SUPABASE_FAKE_TRANSACTIONS", "500"))  # Seeded for the demo account
+    SUPABASE_FAKE_USERS = int(os.getenv("SUPABASE_FAKE_USERS", "0"))  # Synthetic users (src.database.synthetic ids, seed 0)
+    SUPABASE_FAKE_YEARS = float(os.getenv("SUPABASE_FAKE_YEARS", "2"))  # History per synthetic user
+    
+    # Direct Postgres connection for schema migrations (session mode, not the transaction pooler)
+    DATABASE_URL = os.getenv("DATABASE_URL", "")
+    MIGRATION_LOCK_TIMEOUT = os.getenv("MIGRATION_LOCK_TIMEOUT", "5s")  # Give up instead of queueing behind long transactions
+    
+    # Caching (memory, redis or none)
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_TTL = float(os.getenv("CACHE_TTL", "300"))
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "2048"))
+    REDIS_URL = os.getenv("REDIS_URL", "")
+    
+    # Realtime change feed (memory: this API process's writes; postgres: LISTEN/NOTIFY over DATABASE_URL, every writer)
+    CHANGE_FEED_BACKEND = os.getenv("CHANGE_FEED_BACKEND", "memory")
+    CHANGE_FEED_BACKLOG = int(os.getenv("CHANGE_FEED_BACKLOG", "256"))  # Events kept per user for reconnecting clients
+    
+    # Logging (LOG_FORMAT text or json); per-row events are DEBUG and sampled at LOG_SAMPLE_RATE
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+    LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.01"))
+    
+    # Tracing (none, file or otlp); file writes OTLP/JSON lines, otlp POSTs to an OTLP/HTTP collector
+    TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none")
+    TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+    TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318")
+    TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))  # Share of traces recorded (decided at the root)
+    
+    # Archival: years of history kept in the hot transactions table (0 = never archive)
+    TRANSACTION_ARCHIVE_YEARS = int(os.getenv("TRANSACTION_ARCHIVE_YEARS", "0"))
     
     # AI Services
     CLAUDE_API_KEY = os.getenv("CLAUDE_API_KEY", "")
@@ -27,15 +62,34 @@ class Config:
     # Plaid (Optional)
     PLAID_CLIENT_ID = os.getenv("PLAID_CLIENT_ID", "")
     PLAID_SECRET = os.getenv("PLAID_SECRET", "")
-    PLAID_ENV = os.getenv("PLAID_ENV", "sandbox")
+    PLAID_ENV = os.getenv("PLAID_ENV", "sandbox")  # sandbox, development, production or local
+    PLAID_HOST = os.getenv("PLAID_HOST", "")  # Overrides the environment URL (e.g. the local stand-in)
+    PLAID_MAX_WORKERS = int(os.getenv("PLAID_MAX_WORKERS", "4"))
+    PLAID_TIMEOUT = float(os.getenv("PLAID_TIMEOUT", "30"))
+    PLAID_MAX_RETRIES = int(os.getenv("PLAID_MAX_RETRIES", "3"))
+    PLAID_BACKOFF_BASE = float(os.getenv("PLAID_BACKOFF_BASE", "0.5"))
+    PLAID_BREAKER_THRESHOLD = int(os.getenv("PLAID_BREAKER_THRESHOLD", "5"))
+    PLAID_BREAKER_RESET = float(os.getenv("PLAID_BREAKER_RESET", "30"))
+    PLAID_SYNC_CONCURRENCY = int(os.getenv("PLAID_SYNC_CONCURRENCY", "4"))  # Items synced in parallel per user
+    PLAID_BALANCE_TTL = float(os.getenv("PLAID_BALANCE_TTL", "300"))  # Seconds to cache account balances
+    PLAID_BALANCE_MAX_STALE = float(os.getenv("PLAID_BALANCE_MAX_STALE", "3600"))  # Oldest balance served when Plaid fails
+    PLAID_BALANCE_CACHE_SIZE = int(os.getenv("PLAID_BALANCE_CACHE_SIZE", "1024"))  # Items whose balances are cached
+    
+    # Local Plaid stand-in (PLAID_ENV=local)
+    PLAID_FAKE_TRANSACTIONS = int(os.getenv("PLAID_FAKE_TRANSACTIONS", "500"))
+    PLAID_FAKE_LATENCY_MS = float(os.getenv("PLAID_FAKE_LATENCY_MS", "0"))
+    PLAID_FAKE_ERROR_RATE = float(os.getenv("PLAID_FAKE_ERROR_RATE", "0"))
+    PLAID_FAKE_HISTORY_DAYS = int(os.getenv("PLAID_FAKE_HISTORY_DAYS", "730"))
     
     # Paths
-    BASE_DIR = Path(__file__).parent.parent
+    BASE_DIR = Path(__file__).resolve().parent.parent.parent
     ASSETS_DIR = BASE_DIR / "assets"
     
     @classmethod
     def is_configured(cls) -> bool:
         """Check if essential configuration is set"""
+        if cls.SUPABASE_BACKEND.lower() == 'memory':
+            return True
         return bool(cls.SUPABASE_URL and cls.SUPABASE_KEY)
     
     @classmethod
@@ -0,0 +1,157 @@
+"""Structured, queued logging for the API and services
+
+    log = get_logger('api')
+    log.info("📊 Import complete", imported=120, skipped=3, seconds=0.8)
+    log.debug("CSV row", sample=True, row=17, result='imported')
+
+Fields are kept as data: LOG_FORMAT=text renders them as key=value after the
+message, LOG_FORMAT=json as one JSON object per line (with the trace id when
+a span is active). Records are put on a queue and formatted and written by a
+background thread, so a hot loop never blocks on stdout.
+
+Per-item events (one per CSV row, one per inserted transaction) are DEBUG and
+pass sample=True: they are dropped before any work unless LOG_LEVEL=DEBUG,
+and then only one in 1/LOG_SAMPLE_RATE of each message is kept.
+"""
+
+import atexit
+import itertools
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from .config import Config
+from . import tracing
+
+ROOT = 'budget_buddy'
+
+_setup_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class _Sampler:
+    """Keeps the first and then every Nth occurrence of each message"""
+
+    def __init__(self, rate: float):
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._counters: Dict[str, 'itertools.count'] = {}
+
+    def keep(self, message: str) -> bool:
+        if self.every == 0:
+            return False
+        counter = self._counters.get(message)
+        if counter is None:
+            counter = self._counters.setdefault(message, itertools.count())
+        return next(counter) % self.every == 0
+
+
+class StructuredLogger:
+    """logging.Logger wrapper taking a message plus keyword fields"""
+
+    def __init__(self, logger: logging.Logger, sampler: _Sampler):
+        self._logger = logger
+        self._sampler = sampler
+
+    def is_enabled(self, level: int) -> bool:
+        return self._logger.isEnabledFor(level)
+
+    def debug(self, message: str, sample: bool = False, **fields):
+        self._log(logging.DEBUG, message, fields, sample)
+
+    def info(self, message: str, sample: bool = False, **fields):
+        self._log(logging.INFO, message, fields, sample)
+
+    def warning(self, message: str, sample: bool = False, **fields):
+        self._log(logging.WARNING, message, fields, sample)
+
+    def error(self, message: str, exc_info: bool = False, **fields):
+        self._log(logging.ERROR, message, fields, False, exc_info)
+
+    def exception(self, message: str, **fields):
+        """ERROR with the current exception's traceback"""
+        self._log(logging.ERROR, message, fields, False, True)
+
+    def _log(self, level: int, message: str, fields: Dict[str, Any], sample: bool, exc_info: bool = False):
+        if not self._logger.isEnabledFor(level):
+            return
+        if sample and not self._sampler.keep(message):
+            return
+        span = tracing.current_span()
+        if span is not None:
+            fields['trace_id'] = span.trace_id
+        self._logger.log(level, message, exc_info=exc_info, extra={'fields': fields}, stacklevel=3)
+
+
+class TextFormatter(logging.Formatter):
+    """`2025-01-31 12:00:00 INFO  api 📊 Import complete imported=120 skipped=3`"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)-5s %(name)s %(message)s', '%Y-%m-%d %H:%M:%S')
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = getattr(record, 'fields', None)
+        if fields:
+            extra = ' '.join(f"{key}={value!r}" if isinstance(value, str) and ' ' in value else f"{key}={value}"
+                             for key, value in fields.items())
+            head, sep, tail = line.partition('\n')  # Keep fields on the message line, before a traceback
+            line = f"{head} {extra}{sep}{tail}"
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, message, fields..."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'message': record.getMessage(),
+            **getattr(record, 'fields', {}),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting happens in the listener thread, not the caller's
+        return record
+
+
+def setup_logging():
+    """Route budget_buddy.* loggers through a queue to stdout (idempotent)"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return
+        output = logging.StreamHandler(sys.stdout)
+        output.setFormatter(JsonFormatter() if Config.LOG_FORMAT.lower() == 'json' else TextFormatter())
+
+        records: 'queue.SimpleQueue[logging.LogRecord]' = queue.SimpleQueue()
+        root = logging.getLogger(ROOT)
+        root.setLevel(Config.LOG_LEVEL.upper())
+        root.addHandler(_QueueHandler(records))
+        root.propagate = False  # Don't also go through uvicorn's/the root logger's handlers
+
+        _listener = logging.handlers.QueueListener(records, output)
+        _listener.start()
+        atexit.register(_listener.stop)  # Drains the queue before exit
+
+
+_sampler: Optional[_Sampler] = None
+
+
+def get_logger(name: str) -> StructuredLogger:
+    """Logger for one component, e.g. get_logger('plaid')"""
+    global _sampler
+    setup_logging()
+    if _sampler is None:
+        _sampler = _Sampler(Config.LOG_SAMPLE_RATE)
+    return StructuredLogger(logging.getLogger(f"{ROOT}.{name}"), _sampler)
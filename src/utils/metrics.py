@@ -0,0 +1,332 @@
+"""In-process metrics in the Prometheus text format (served by GET /metrics)
+
+A small dependency-free subset of prometheus_client: counters, histograms and
+gauges with labels. Usage mirrors prometheus_client, so the module-level
+metrics below could move to it unchanged:
+
+    SUPABASE_QUERY_SECONDS.labels(method='check_duplicate').observe(0.012)
+
+Metrics are per process; with several API workers, scrape each one.
+"""
+
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers cache hits (sub-millisecond) through slow Plaid calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class Registry:
+    """Ordered collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: List['Metric'] = []
+
+    def register(self, metric: 'Metric'):
+        if any(existing.name == metric.name for existing in self._metrics):
+            raise ValueError(f"Duplicate metric: {metric.name}")
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class Metric(ABC):
+    """Base class: one child per combination of label values"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional[Registry] = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def labels(self, **labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self):
+        """The unlabelled child (metrics declared without labelnames)"""
+        if self.labelnames:
+            raise ValueError(f"{self.name} needs labels {self.labelnames}")
+        return self.labels()
+
+    @abstractmethod
+    def _new_child(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class _CounterChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        if amount < 0:
+            raise ValueError("Counters only go up")
+        with self._lock:
+            self.value += amount
+
+
+class Counter(Metric):
+    """Monotonically increasing total (name should end in _total)"""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+    def value(self, **labels) -> float:
+        """Current total for one label combination (0 if never incremented)"""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        return child.value if child else 0.0
+
+    def samples(self) -> Iterator[str]:
+        for key, child in list(self._children.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+
+
+class _GaugeChild:
+    def __init__(self):
+        self.value = 0.0
+        self.function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float):
+        self.value = float(value)
+
+    def set_function(self, function: Callable[[], float]):
+        """Compute the value when scraped instead of storing it"""
+        self.function = function
+
+    def get(self) -> float:
+        return float(self.function()) if self.function else self.value
+
+
+class Gauge(Metric):
+    """A value that can go up and down, or be computed at scrape time"""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._default().set(value)
+
+    def set_function(self, function: Callable[[], float]):
+        self._default().set_function(function)
+
+    def samples(self) -> Iterator[str]:
+        for key, child in list(self._children.items()):
+            try:
+                value = child.get()
+            except Exception:
+                continue  # A broken callback must not break the scrape
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class _HistogramChild:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self.sum += value
+            self.count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+    @contextmanager
+    def time(self):
+        """Observe the duration of the with-block in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Histogram(Metric):
+    """Distribution of observations (latencies) in cumulative buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS, registry: Optional[Registry] = REGISTRY):
+        bounds = sorted(float(b) for b in buckets)
+        if not bounds or bounds[-1] != math.inf:
+            bounds.append(math.inf)
+        self.buckets = tuple(bounds)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+    def samples(self) -> Iterator[str]:
+        names = self.labelnames + ("le",)
+        for key, child in list(self._children.items()):
+            with child._lock:
+                counts, total, count = list(child.counts), child.sum, child.count
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(names, key + (_format_value(bound),))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+def ratio(hits: float, misses: float) -> float:
+    """hits / (hits + misses), 0 before anything was counted"""
+    total = hits + misses
+    return hits / total if total else 0.0
+
+
+# --- Metrics shared by the API and the data layer ---
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "API request latency by route template (time to response headers)",
+    ("method", "route", "status")
+)
+
+SUPABASE_QUERIES = Counter(
+    "supabase_queries_total",
+    "PostgREST queries sent, by TransactionService method",
+    ("method", "status")
+)
+SUPABASE_QUERY_SECONDS = Histogram(
+    "supabase_query_duration_seconds",
+    "PostgREST query latency by TransactionService method",
+    ("method",)
+)
+
+PLAID_REQUEST_SECONDS = Histogram(
+    "plaid_request_duration_seconds",
+    "Plaid API call latency including retries",
+    ("operation", "status")
+)
+PLAID_RETRIES = Counter(
+    "plaid_retries_total",
+    "Plaid calls retried after a transient error",
+    ("operation",)
+)
+
+CSV_IMPORT_ROWS = Counter(
+    "csv_import_rows_total",
+    "CSV upload rows by outcome (imported, duplicate within the file, skipped by add_transaction, error)",
+    ("result",)
+)
+CSV_IMPORT_SECONDS = Counter(
+    "csv_import_seconds_total",
+    "Time spent processing CSV uploads; rate(rows) / rate(seconds) is rows/sec"
+)
+CSV_IMPORT_ROWS_PER_SECOND = Gauge(
+    "csv_import_last_rows_per_second",
+    "Rows per second of the most recent CSV upload"
+)
+
+DEDUPE_CHECKS = Counter(
+    "transaction_dedupe_checks_total",
+    "Duplicate checks before inserting a transaction (hit = duplicate found)",
+    ("result",)
+)
+DEDUPE_HIT_RATIO = Gauge(
+    "transaction_dedupe_hit_ratio",
+    "Share of duplicate checks that found a duplicate since the process started"
+)
+DEDUPE_HIT_RATIO.set_function(
+    lambda: ratio(DEDUPE_CHECKS.value(result="hit"), DEDUPE_CHECKS.value(result="miss"))
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Read-through cache lookups by query name",
+    ("query", "result")
+)
+CACHE_HIT_RATIO = Gauge(
+    "cache_hit_ratio",
+    "Share of read-through cache lookups served from the cache since the process started"
+)
+
+
+def _cache_hit_ratio() -> float:
+    hits = misses = 0.0
+    for (_, result), child in list(CACHE_REQUESTS._children.items()):
+        if result == "hit":
+            hits += child.value
+        else:
+            misses += child.value
+    return ratio(hits, misses)
+
+
+CACHE_HIT_RATIO.set_function(_cache_hit_ratio)
+
+
+def render() -> str:
+    """Every registered metric in the Prometheus text exposition format"""
+    return REGISTRY.render()
@@ -0,0 +1,116 @@
+"""Integer-cents money helpers
+
+Amounts are carried as whole cents (Python int / NumPy int64) from parsing
+through storage, duplicate matching and aggregation, and only turned back
+into dollars at the display/API boundary. Integer sums are exact and
+integer equality is safe, unlike float dollars.
+"""
+
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import Any, Iterable, NewType, Sequence, Tuple
+import numpy as np
+
+Cents = NewType('Cents', int)
+
+_CENT = Decimal('0.01')
+
+
+def to_cents(value: Any) -> Cents:
+    """Convert a dollar amount (str, int, float, Decimal or NumPy scalar) to integer cents
+
+    Strings may carry a currency symbol, thousands separators or accounting
+    parentheses, e.g. "$1,234.50" or "(12.00)". Anything that is not an
+    amount raises ValueError.
+    """
+    if isinstance(value, (bool, np.bool_)) or value is None:
+        raise ValueError(f"Invalid amount: {value!r}")
+
+    # NumPy 2 scalars repr as "np.float64(2.5)", which Decimal cannot parse
+    if isinstance(value, np.floating):
+        value = float(value)
+    elif isinstance(value, np.integer):
+        value = int(value)
+
+    try:
+        if isinstance(value, str):
+            text = value.strip().replace('$', '').replace(',', '')
+            negative = text.startswith('(') and text.endswith(')')
+            if negative:
+                text = text[1:-1]
+            amount = Decimal(text)
+            if negative:
+                amount = -amount
+        elif isinstance(value, float):
+            # repr() gives the shortest string that round-trips, so 0.1 -> Decimal('0.1')
+            amount = Decimal(repr(value))
+        else:
+            amount = Decimal(value)
+
+        if not amount.is_finite():
+            raise ValueError(f"Invalid amount: {value!r}")
+        return Cents(int((amount.quantize(_CENT, rounding=ROUND_HALF_UP) * 100)))
+    except (InvalidOperation, TypeError, ValueError):
+        raise ValueError(f"Invalid amount: {value!r}")
+
+
+def from_cents(cents: int) -> float:
+    """Dollars as a float, for JSON responses and charts"""
+    return int(cents) / 100
+
+
+def cents_to_decimal_str(cents: int) -> str:
+    """Exact decimal string ("-12.30") for NUMERIC columns"""
+    cents = int(cents)
+    sign = '-' if cents < 0 else ''
+    whole, frac = divmod(abs(cents), 100)
+    return f"{sign}{whole}.{frac:02d}"
+
+
+def format_cents(cents: int) -> str:
+    """Human readable dollars, e.g. "$1,234.50" or "-$12.00" """
+    cents = int(cents)
+    sign = '-' if cents < 0 else ''
+    whole, frac = divmod(abs(cents), 100)
+    return f"{sign}${whole:,}.{frac:02d}"
+
+
+def cents_array(values: Iterable[Any]) -> np.ndarray:
+    """Vectorized dollars -> int64 cents for numeric columns (e.g. a pandas Series)
+
+    Gives the same cents as to_cents for every value. Floats like 1.005 sit
+    just below the half cent in binary (1.00499...), so amounts within
+    rounding error of a half cent are converted one by one with to_cents;
+    every other amount is rounded on the float.
+    """
+    dollars = np.asarray(values, dtype=np.float64)
+    if not np.all(np.isfinite(dollars)):
+        raise ValueError("Amount column contains missing or non-numeric values")
+    scaled = np.abs(dollars) * 100
+    cents = np.sign(dollars) * np.floor(scaled + 0.5)
+
+    # Float error in `scaled` is a few ulps; anything farther from .5 rounds the same either way
+    distance = np.abs(scaled - np.floor(scaled) - 0.5)
+    ambiguous = np.flatnonzero(distance <= scaled * 1e-12 + 1e-9)
+    if ambiguous.size:
+        cents[ambiguous] = [to_cents(float(dollars[i])) for i in ambiguous]
+    return cents.astype(np.int64)
+
+
+def sum_cents(values: Sequence[int]) -> Cents:
+    """Exact int64 sum"""
+    if not len(values):
+        return Cents(0)
+    return Cents(int(np.sum(np.asarray(values, dtype=np.int64))))
+
+
+def split_income_expense(rows: Sequence[dict], amount_key: str = 'amount_cents',
+                         type_key: str = 'transaction_type') -> Tuple[Cents, Cents]:
+    """Sum income and expense cents for a list of transaction rows in one vectorized pass"""
+    if not rows:
+        return Cents(0), Cents(0)
+
+    amounts = np.fromiter((row[amount_key] for row in rows), dtype=np.int64, count=len(rows))
+    types = np.array([row[type_key] for row in rows])
+    income = int(amounts[types == 'income'].sum())
+    expenses = int(amounts[types == 'expense'].sum())
+    return Cents(income), Cents(expenses)
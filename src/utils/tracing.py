@@ -0,0 +1,354 @@
+"""Lightweight request tracing (W3C traceparent, OTLP/JSON export)
+
+A span per API request, per service method and per external call
+(Supabase, Plaid, Anthropic). The Flet APIClient sends a `traceparent`
+header, so a dashboard load in the UI and the requests it makes share one
+trace id:
+
+    with tracing.span('dashboard.load'):
+        ...
+
+    @tracing.traced
+    async def get_monthly_summary(self, ...):
+        ...
+
+TRACE_EXPORTER selects where finished spans go:
+    none  tracing off (the default; span() costs one contextvar lookup)
+    file  OTLP/JSON lines appended to TRACE_FILE (the OpenTelemetry
+          Collector's otlpjsonfile receiver reads this format)
+    otlp  POSTed to an OTLP/HTTP collector at TRACE_OTLP_ENDPOINT/v1/traces
+
+Print a trace tree from the file:
+
+    python -m src.utils.tracing traces.jsonl [trace_id]
+"""
+
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from .config import Config
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+
+# OTLP span kinds
+KINDS = {'internal': 1, 'server': 2, 'client': 3}
+
+_current: contextvars.ContextVar[Optional['Span']] = contextvars.ContextVar('current_span', default=None)
+
+
+class Span:
+    """One timed operation; finished spans are handed to the exporter"""
+
+    __slots__ = ('name', 'kind', 'trace_id', 'span_id', 'parent_id', 'sampled',
+                 'start_ns', 'end_ns', 'attributes', 'error')
+
+    def __init__(self, name: str, kind: str, trace_id: str, parent_id: Optional[str], sampled: bool):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = format(random.getrandbits(64), '016x')
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def to_otlp(self) -> Dict:
+        span = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': KINDS.get(self.kind, 1),
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns),
+            'attributes': [{'key': k, 'value': _otlp_value(v)} for k, v in self.attributes.items()],
+            'status': {'code': 2, 'message': self.error} if self.error else {'code': 1},
+        }
+        if self.parent_id:
+            span['parentSpanId'] = self.parent_id
+        return span
+
+
+def _otlp_value(value: Any) -> Dict:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Dict]:
+    """{'trace_id', 'span_id', 'sampled'} from a W3C traceparent header, or None if invalid"""
+    if not header:
+        return None
+    parts = header.strip().split('-')
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16), int(parts[3], 16)
+    except ValueError:
+        return None
+    if parts[1] == '0' * 32 or parts[2] == '0' * 16:
+        return None
+    return {'trace_id': parts[1], 'span_id': parts[2], 'sampled': bool(int(parts[3], 16) & 1)}
+
+
+class SpanExporter:
+    """Batches finished spans and exports them from a background thread"""
+
+    def __init__(self, service_name: str, export: Callable[[Dict], None],
+                 interval: float = 2.0, max_batch: int = 512, max_queue: int = 10000):
+        self.service_name = service_name
+        self.export = export
+        self.interval = interval
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+        self.dropped = 0
+        self._spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='trace-exporter', daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def submit(self, span: Span):
+        with self._lock:
+            if len(self._spans) >= self.max_queue:
+                self.dropped += 1  # Collector down or too slow: never grow without bound
+                return
+            self._spans.append(span)
+            full = len(self._spans) >= self.max_batch
+        if full:
+            self._wake.set()
+
+    def flush(self):
+        while True:
+            with self._lock:
+                batch, self._spans = self._spans[:self.max_batch], self._spans[self.max_batch:]
+            if not batch:
+                return
+            try:
+                self.export(self._payload(batch))
+            except Exception as e:
+                print(f"⚠️ Trace export failed, dropped {len(batch)} spans: {e}")
+                return
+
+    def _payload(self, batch: List[Span]) -> Dict:
+        return {'resourceSpans': [{
+            'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': self.service_name}}]},
+            'scopeSpans': [{
+                'scope': {'name': 'budget-buddy'},
+                'spans': [span.to_otlp() for span in batch],
+            }],
+        }]}
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+
+def _file_export(path: str) -> Callable[[Dict], None]:
+    lock = threading.Lock()
+
+    def export(payload: Dict):
+        line = json.dumps(payload, separators=(',', ':')) + '\n'
+        with lock, open(path, 'a', encoding='utf-8') as f:
+            f.write(line)
+    return export
+
+
+def _otlp_export(endpoint: str) -> Callable[[Dict], None]:
+    client = httpx.Client(timeout=5)
+    url = endpoint.rstrip('/') + '/v1/traces'
+
+    def export(payload: Dict):
+        client.post(url, json=payload).raise_for_status()
+    return export
+
+
+_service_name = 'budget-buddy'
+_exporter: Optional[SpanExporter] = None
+_exporter_ready = False
+_exporter_lock = threading.Lock()
+
+
+def configure(service_name: str):
+    """Name this process in exported spans (call once at startup, before any span)"""
+    global _service_name
+    _service_name = service_name
+
+
+def create_exporter() -> Optional[SpanExporter]:
+    """Build the exporter selected by TRACE_EXPORTER (None = tracing off)"""
+    backend = Config.TRACE_EXPORTER.lower()
+    if backend == 'file':
+        return SpanExporter(_service_name, _file_export(Config.TRACE_FILE))
+    if backend == 'otlp':
+        if not HTTPX_AVAILABLE:
+            print("⚠️ OTLP trace export requested but httpx unavailable, tracing disabled")
+            return None
+        return SpanExporter(_service_name, _otlp_export(Config.TRACE_OTLP_ENDPOINT))
+    return None
+
+
+def _get_exporter() -> Optional[SpanExporter]:
+    global _exporter, _exporter_ready
+    if not _exporter_ready:
+        with _exporter_lock:
+            if not _exporter_ready:
+                _exporter = create_exporter()
+                _exporter_ready = True
+    return _exporter
+
+
+def enabled() -> bool:
+    return _get_exporter() is not None
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def set_attribute(key: str, value: Any):
+    """Annotate the current span, if any"""
+    span = _current.get()
+    if span is not None:
+        span.set_attribute(key, value)
+
+
+@contextmanager
+def span(name: str, kind: str = 'internal', parent: Optional[str] = None,
+         **attributes) -> Iterator[Optional[Span]]:
+    """Time the with-block as a child of the current span (or of `parent`, a traceparent header)
+
+    Yields None when tracing is off.
+    """
+    exporter = _get_exporter()
+    if exporter is None:
+        yield None
+        return
+
+    remote = parse_traceparent(parent) if parent else None
+    outer = _current.get()
+    if remote:
+        current = Span(name, kind, remote['trace_id'], remote['span_id'], remote['sampled'])
+    elif outer:
+        current = Span(name, kind, outer.trace_id, outer.span_id, outer.sampled)
+    else:
+        # Root span: the sampling decision is made once per trace
+        current = Span(name, kind, format(random.getrandbits(128), '032x'), None,
+                       random.random() < Config.TRACE_SAMPLE_RATE)
+    current.attributes.update(attributes)
+
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{e.__class__.__name__}: {e}"
+        raise
+    finally:
+        _current.reset(token)
+        current.end_ns = time.time_ns()
+        if current.sampled:
+            exporter.submit(current)
+
+
+def traced(func: Callable = None, *, name: Optional[str] = None, kind: str = 'internal'):
+    """Decorator: a span around each call, named Class.method by default"""
+    if func is None:
+        return lambda f: traced(f, name=name, kind=kind)
+    span_name = name or func.__qualname__
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with span(span_name, kind):
+                return await func(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with span(span_name, kind):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def inject(headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Add the current span's traceparent to outgoing request headers"""
+    headers = dict(headers or {})
+    current = _current.get()
+    if current is not None:
+        headers['traceparent'] = current.traceparent
+    return headers
+
+
+def _print_tree(path: str, trace_id: Optional[str]):
+    """Indented span tree with durations for one trace (default: the slowest root span)"""
+    spans = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            for resource in json.loads(line)['resourceSpans']:
+                service = resource['resource']['attributes'][0]['value']['stringValue']
+                for scope in resource['scopeSpans']:
+                    for s in scope['spans']:
+                        s['service'] = service
+                        s['ms'] = (int(s['endTimeUnixNano']) - int(s['startTimeUnixNano'])) / 1e6
+                        spans.append(s)
+    if not spans:
+        raise SystemExit(f"No spans in {path}")
+
+    if trace_id is None:
+        ids = {s['spanId'] for s in spans}
+        roots = [s for s in spans if s.get('parentSpanId') not in ids]
+        trace_id = max(roots, key=lambda s: s['ms'])['traceId']
+    trace = sorted((s for s in spans if s['traceId'] == trace_id), key=lambda s: int(s['startTimeUnixNano']))
+    if not trace:
+        raise SystemExit(f"Trace {trace_id} not found")
+
+    children: Dict[Optional[str], List[Dict]] = {}
+    ids = {s['spanId'] for s in trace}
+    for s in trace:
+        parent = s.get('parentSpanId')
+        children.setdefault(parent if parent in ids else None, []).append(s)
+    start = int(trace[0]['startTimeUnixNano'])
+
+    print(f"trace {trace_id}")
+
+    def walk(parent: Optional[str], depth: int):
+        for s in children.get(parent, []):
+            offset = (int(s['startTimeUnixNano']) - start) / 1e6
+            failed = ' ❌' if s.get('status', {}).get('code') == 2 else ''
+            print(f"{offset:>9.1f}ms {s['ms']:>9.1f}ms  {'  ' * depth}{s['name']} [{s['service']}]{failed}")
+            walk(s['spanId'], depth + 1)
+    walk(None, 0)
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) < 2:
+        raise SystemExit("Usage: python -m src.utils.tracing traces.jsonl [trace_id]")
+    _print_tree(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
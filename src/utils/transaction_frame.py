@@ -0,0 +1,148 @@
+"""Columnar in-memory transaction model
+
+Transactions arrive from the API as lists of dicts. TransactionFrame parses
+them once into parallel NumPy columns so views can filter, group and sum
+without re-parsing dates or walking dicts on every render:
+
+    dates          datetime64[D]
+    amount_cents   int64, always positive
+    is_income      bool mask (everything else counts as an expense)
+    category_codes int32 codes into `categories`
+    merchant_codes int32 codes into `merchants` (the description)
+"""
+
+from datetime import date
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from .money import to_cents, from_cents
+
+
+def _encode(values: Iterable[str]) -> Tuple[np.ndarray, List[str]]:
+    """Dictionary-encode strings as int32 codes plus the list of distinct labels"""
+    index: Dict[str, int] = {}
+    labels: List[str] = []
+    codes = []
+    for value in values:
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(labels)
+            labels.append(value)
+        codes.append(code)
+    return np.array(codes, dtype=np.int32), labels
+
+
+class TransactionFrame:
+    """Immutable columnar view over a batch of transactions"""
+
+    __slots__ = ('dates', 'amount_cents', 'is_income', 'category_codes', 'categories',
+                 'merchant_codes', 'merchants')
+
+    def __init__(self, dates: np.ndarray, amount_cents: np.ndarray, is_income: np.ndarray,
+                 category_codes: np.ndarray, categories: List[str],
+                 merchant_codes: np.ndarray, merchants: List[str]):
+        self.dates = dates
+        self.amount_cents = amount_cents
+        self.is_income = is_income
+        self.category_codes = category_codes
+        self.categories = categories
+        self.merchant_codes = merchant_codes
+        self.merchants = merchants
+
+    @classmethod
+    def from_records(cls, records: Sequence[Dict[str, Any]]) -> 'TransactionFrame':
+        """Build from API / PostgREST rows (one pass per column)"""
+        dates = np.array(
+            [str(r['transaction_date'])[:10] for r in records], dtype='datetime64[D]'
+        ) if records else np.array([], dtype='datetime64[D]')
+        amount_cents = np.fromiter(
+            (abs(r['amount_cents']) if r.get('amount_cents') is not None else abs(to_cents(r.get('amount', 0)))
+             for r in records),
+            dtype=np.int64, count=len(records)
+        )
+        is_income = np.fromiter(
+            (r.get('transaction_type') == 'income' for r in records), dtype=bool, count=len(records)
+        )
+        category_codes, categories = _encode(r.get('category') or 'Other' for r in records)
+        merchant_codes, merchants = _encode(r.get('description') or 'Unknown' for r in records)
+        return cls(dates, amount_cents, is_income, category_codes, categories, merchant_codes, merchants)
+
+    @classmethod
+    def coerce(cls, transactions: Union['TransactionFrame', Sequence[Dict[str, Any]]]) -> 'TransactionFrame':
+        """Accept either a frame or a list of row dicts"""
+        return transactions if isinstance(transactions, cls) else cls.from_records(transactions)
+
+    def __len__(self) -> int:
+        return len(self.amount_cents)
+
+    # -- filtering -----------------------------------------------------------
+
+    def filter(self, mask: np.ndarray) -> 'TransactionFrame':
+        """Rows where mask is true; the category/merchant dictionaries are shared"""
+        return TransactionFrame(
+            self.dates[mask], self.amount_cents[mask], self.is_income[mask],
+            self.category_codes[mask], self.categories,
+            self.merchant_codes[mask], self.merchants
+        )
+
+    def income(self) -> 'TransactionFrame':
+        return self.filter(self.is_income)
+
+    def expenses(self) -> 'TransactionFrame':
+        return self.filter(~self.is_income)
+
+    def between(self, start: Optional[date] = None, end: Optional[date] = None) -> 'TransactionFrame':
+        """Rows with start <= date < end (either bound optional)"""
+        mask = np.ones(len(self), dtype=bool)
+        if start is not None:
+            mask &= self.dates >= np.datetime64(start, 'D')
+        if end is not None:
+            mask &= self.dates < np.datetime64(end, 'D')
+        return self.filter(mask)
+
+    def in_year(self, year: int) -> 'TransactionFrame':
+        return self.between(date(year, 1, 1), date(year + 1, 1, 1))
+
+    def with_category(self, category: str) -> 'TransactionFrame':
+        if category not in self.categories:
+            return self.filter(np.zeros(len(self), dtype=bool))
+        return self.filter(self.category_codes == self.categories.index(category))
+
+    # -- aggregation ---------------------------------------------------------
+
+    def total_cents(self) -> int:
+        return int(self.amount_cents.sum())
+
+    def income_cents(self) -> int:
+        return int(self.amount_cents[self.is_income].sum())
+
+    def expense_cents(self) -> int:
+        return int(self.amount_cents[~self.is_income].sum())
+
+    @staticmethod
+    def _group(codes: np.ndarray, labels: List[str], cents: np.ndarray) -> Dict[str, Tuple[int, int]]:
+        """label -> (total cents, row count) for labels that occur"""
+        totals = np.zeros(len(labels), dtype=np.int64)
+        np.add.at(totals, codes, cents)
+        counts = np.bincount(codes, minlength=len(labels))
+        return {
+            labels[code]: (int(totals[code]), int(counts[code]))
+            for code in np.flatnonzero(counts)
+        }
+
+    def sum_by_category(self) -> Dict[str, int]:
+        """category -> total cents"""
+        return {k: total for k, (total, _) in self._group(self.category_codes, self.categories, self.amount_cents).items()}
+
+    def group_by_merchant(self) -> Dict[str, Tuple[int, int]]:
+        """merchant -> (total cents, transaction count)"""
+        return self._group(self.merchant_codes, self.merchants, self.amount_cents)
+
+    # -- row access ----------------------------------------------------------
+
+    def rows(self) -> Iterator[Tuple[date, str, str, float, bool]]:
+        """(date, merchant, category, amount in dollars, is_income) per row, for rendering"""
+        for day, merchant, category, cents, income in zip(
+            self.dates.astype(object), self.merchant_codes, self.category_codes,
+            self.amount_cents.tolist(), self.is_income.tolist()
+        ):
+            yield day, self.merchants[merchant], self.categories[category], from_cents(cents), income